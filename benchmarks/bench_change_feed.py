@@ -0,0 +1,80 @@
+"""
+Cost of following a busy venue: a churn workload of Cancel and Reserve
+commands run with no feed, with a ChangeFeed and with a coalescing one, the
+subscriber polling after every batch. For comparison, one PrintReservations
+dump, the alternative a downstream reader has to diff, is timed as well.
+
+Usage: python benchmarks/bench_change_feed.py [seats] [batch]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import ChangeFeed, CommandProcessor, GatorTicketMaster
+
+COMMANDS = 200000
+
+
+def venue(seats):
+    # A sold-out venue with a waitlist behind it
+    gtm = GatorTicketMaster()
+    gtm.initialize(seats)
+    for user_id in range(1, seats + seats // 10 + 1):
+        gtm.reserve(user_id, user_id % 7)
+    return gtm
+
+
+def workload(rnd, seats):
+    # Users cancelling (negative ids) or new users joining; every user holds a seat when they cancel
+    users, holders, next_user = [], list(range(1, seats + 1)), seats * 2
+    for _ in range(COMMANDS):
+        if holders and rnd.random() < 0.5:
+            users.append(-holders.pop(rnd.randrange(len(holders))))
+        else:
+            users.append(next_user)
+            next_user += 1
+    return users
+
+
+def run(seats, batch, feed):
+    # Commands/sec with the subscriber polling after each batch, and the events it read
+    gtm = venue(seats)
+    users = workload(random.Random(3), seats)
+    subscription = None
+    if feed is not None:
+        feed.attach(gtm)
+        subscription = feed.subscribe()
+    execute, search = CommandProcessor(gtm).execute, gtm.reservations.search
+    events = 0
+    start = time.perf_counter()
+    for i in range(0, len(users), batch):
+        for user_id in users[i:i + batch]:
+            if user_id < 0:
+                execute(f"Cancel({search(-user_id)}, {-user_id})")
+            else:
+                execute(f"Reserve({user_id}, {user_id % 9 + 1})")
+        if subscription is not None:
+            events += len(subscription.poll())
+    elapsed = time.perf_counter() - start
+    return COMMANDS / elapsed, events, subscription.missed if subscription else 0
+
+
+def main():
+    seats = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 5
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    print(f"{seats} seats, {COMMANDS} commands, subscriber polls every {batch}")
+    print(f"{'feed':>10} {'commands/s':>12} {'events read':>12} {'missed':>8}")
+    for name, feed in (("none", None), ("plain", ChangeFeed()), ("coalesce", ChangeFeed(coalesce=True))):
+        rate, events, missed = run(seats, batch, feed)
+        print(f"{name:>10} {rate:>12,.0f} {events:>12} {missed:>8}")
+    gtm = venue(seats)
+    start = time.perf_counter()
+    lines = list(gtm.print_reservations())
+    print(f"one PrintReservations dump: {(time.perf_counter() - start) * 1e3:.1f} ms for {len(lines)} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Multi-event throughput as worker processes are added.
+
+Usage: python benchmarks/bench_events.py [events] [commands_per_event]
+"""
+import itertools
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+
+from gatorMultiEvent import process_events
+from workload import generate
+
+
+def write_log(path, events, size):
+    # Interleave one "mixed" workload per event, tagging every command with its event id
+    streams = []
+    for event in range(events):
+        event_id = f"evt{event}"
+        streams.append(f"{line.partition('(')[0]}({event_id}, {line.partition('(')[2]}"
+                       for line in generate("mixed", size, seed=event))
+    count = 0
+    with open(path, "w") as f:
+        for group in itertools.zip_longest(*streams):
+            for line in group:
+                if line is not None:
+                    f.write(line.replace(", )", ")") + "\n")
+                    count += 1
+        f.write("Quit()\n")
+    return count
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    cores = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, "events.txt")
+        count = write_log(log, events, size)
+        print(f"{events} events, {count} commands, {cores} cores")
+        workers = 1
+        while workers <= max(cores, 1):
+            start = time.perf_counter()
+            process_events(log, os.path.join(tmp, "out.txt"), workers)
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>3} workers: {count / elapsed:>12,.0f} commands/s")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Mass hold expiry: N holds placed during an on-sale all lapse on the same tick.
+Compares the batched expiry against cancelling the same holds one by one.
+
+Usage: python benchmarks/bench_holds.py [holds]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import GatorTicketMaster, HeapqWaitlist, SeatRangePool
+
+TTL = 1000
+
+
+def on_sale(holds):
+    # A sold-out venue: every seat held, and half as many users again on the waitlist
+    gtm = GatorTicketMaster(seat_pool=SeatRangePool, waitlist=HeapqWaitlist)
+    gtm.initialize(holds)
+    start = time.perf_counter()
+    for user_id in range(1, holds + 1):
+        gtm.hold(user_id, 1, TTL)
+    hold_rate = holds / (time.perf_counter() - start)
+    for user_id in range(holds + 1, holds + holds // 2 + 1):
+        gtm.reserve(user_id, user_id % 7)
+    return gtm, hold_rate
+
+
+def main():
+    holds = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    gtm, hold_rate = on_sale(holds)
+    for _ in range(TTL):
+        gtm.tick()
+    start = time.perf_counter()
+    lines = gtm.tick()
+    batch_s = time.perf_counter() - start
+
+    gtm, _ = on_sale(holds)
+    start = time.perf_counter()
+    for user_id in range(1, holds + 1):
+        gtm.cancel(gtm.reservations.search(user_id), user_id)
+    single_s = time.perf_counter() - start
+
+    print(f"{holds} holds, {holds // 2} waitlisted: Hold {hold_rate:,.0f}/s, {len(lines)} expiry lines")
+    print(f"batched expiry: {batch_s:.2f} s ({holds / batch_s:,.0f} holds/s)")
+    print(f"one Cancel per hold: {single_s:.2f} s ({holds / single_s:,.0f} holds/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Cost of writing results for a long replay: the same input file of N
+Reserve, Cancel, UpdatePriority and Available commands, ending with a
+PrintReservations dump, run through process_input with text output, and with
+binary result records written plain, gzip- or lzma-compressed. Rendering the
+gzip stream back to the text file with gatorDecode is timed as well.
+
+Usage: python benchmarks/bench_output.py [commands]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorDecode import decode_results
+from gatorTicketMaster import GatorTicketMaster, process_input
+
+
+def replay(path, commands, rnd):
+    # Book a venue of commands // 4 seats with 10% more users, churn on it, then dump it
+    seats = commands // 4
+    users = seats + seats // 10
+    lines = [f"Initialize({seats})"]
+    lines += [f"Reserve({user_id}, {user_id % 9 + 1})" for user_id in range(1, users + 1)]
+    while len(lines) < commands - 1:
+        r = rnd.random()
+        if r < 0.5:
+            seat_id = rnd.randint(1, seats)
+            lines.append(f"Cancel({seat_id}, {seat_id})")  # Mostly misses once seats change hands
+        elif r < 0.9:
+            lines.append(f"UpdatePriority({rnd.randint(seats, users)}, {rnd.randint(1, 9)})")
+        else:
+            lines.append("Available()")
+    lines.append("PrintReservations()")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def run(input_file, output_file, records, compression=None):
+    # Seconds for the whole process_input call, and the output size
+    start = time.perf_counter()
+    process_input(input_file, output_file, GatorTicketMaster(records=records), compression=compression)
+    return time.perf_counter() - start, os.path.getsize(output_file)
+
+
+def main():
+    commands = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, "replay.txt")
+        replay(input_file, commands, random.Random(7))
+        print(f"{commands} commands")
+        print(f"{'output':>10} {'seconds':>8} {'commands/s':>12} {'MB':>8}")
+        for name, records, compression, suffix in (("text", False, None, ".txt"), ("binary", True, None, ".bin"),
+                                                   ("gzip", True, "gzip", ".bin.gz"), ("lzma", True, "lzma", ".bin.xz")):
+            elapsed, size = run(input_file, os.path.join(tmp, "output" + suffix), records, compression)
+            print(f"{name:>10} {elapsed:>8.2f} {commands / elapsed:>12,.0f} {size / 1e6:>8.1f}")
+        start = time.perf_counter()
+        lines = decode_results(os.path.join(tmp, "output.bin.gz"), os.path.join(tmp, "decoded.txt"))
+        print(f"decoding the gzip stream to text: {time.perf_counter() - start:.2f} s for {lines} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Commands/sec of the original line-by-line parser versus process_input.
+
+Usage: python benchmarks/bench_parser.py [lines]
+"""
+import filecmp
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import GatorTicketMaster, process_input
+
+
+def legacy_process_input(input_file, output_file):
+    # The parser and if/elif dispatch process_input used before the command table
+    gator_tm = GatorTicketMaster()
+    with open(input_file, 'r') as f, open(output_file, 'w') as out:
+        for line in f:
+            command = line.strip().split('(')
+            func_name = command[0]
+            args = command[1].rstrip(')').split(',') if len(command) > 1 else []
+            if func_name == 'Initialize':
+                result = gator_tm.initialize(int(args[0]))
+            elif func_name == 'Available':
+                result = gator_tm.available()
+            elif func_name == 'Reserve':
+                result = gator_tm.reserve(int(args[0]), int(args[1]))
+            elif func_name == 'Cancel':
+                result = gator_tm.cancel(int(args[0]), int(args[1]))
+            elif func_name == 'PrintReservations':
+                result = gator_tm.print_reservations()
+            elif func_name == 'AddSeats':
+                result = gator_tm.add_seats(int(args[0]))
+            elif func_name == 'UpdatePriority':
+                result = gator_tm.update_priority(int(args[0]), int(args[1]))
+            elif func_name == 'ExitWaitlist':
+                result = gator_tm.exit_waitlist(int(args[0]))
+            elif func_name == 'ReleaseSeats':
+                result = gator_tm.release_seats(int(args[0]), int(args[1]))
+            elif func_name == 'SeatOwner':
+                result = gator_tm.seat_owner(int(args[0]))
+            elif func_name == 'Quit':
+                out.write("Program Terminated!!\n")
+                break
+            else:
+                result = "Unknown command"
+            if isinstance(result, str):
+                out.write(result + '\n')
+            else:
+                out.write('\n'.join(result) + '\n')
+
+
+def write_log(path, lines):
+    # Cheap commands only, so parsing and dispatch dominate; state stays bounded
+    with open(path, 'w') as f:
+        f.write("Initialize(1000)\n")
+        for i in range((lines - 2) // 5):
+            user_id = i + 1
+            f.write(f"Reserve({user_id}, {i % 7})\nUpdatePriority({user_id}, {i % 5})\n"
+                    f"ExitWaitlist({user_id})\nAvailable()\nSeatOwner({i % 1000 + 1})\n")
+        f.write("Quit()\n")
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 7
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, "commands.txt")
+        write_log(log, lines)
+        outputs = []
+        for name, run in (("legacy", legacy_process_input), ("process_input", process_input)):
+            output = os.path.join(tmp, name + ".out")
+            gc.collect()
+            start = time.perf_counter()
+            run(log, output)
+            elapsed = time.perf_counter() - start
+            outputs.append(output)
+            print(f"{name:>14}: {lines / elapsed:>12,.0f} commands/s ({elapsed:.2f} s)")
+        print("outputs identical:", filecmp.cmp(*outputs, shallow=False))
+
+
+if __name__ == "__main__":
+    main()
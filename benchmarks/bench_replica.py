@@ -0,0 +1,99 @@
+"""
+Read-only command throughput from the shared-memory seat map as reader
+processes are added, against answering the same commands in-process through
+CommandProcessor. Also reports the cost of publishing a batch of changes.
+
+Usage: python benchmarks/bench_replica.py [seats] [max_readers]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import CommandProcessor, GatorTicketMaster, HeapqWaitlist
+from gatorReplica import ReaderPool, SeatMapPublisher
+
+QUERIES = 200000
+BATCH = 2000
+
+
+def venue(seats):
+    # Every seat reserved, a few blocks among them, and a waitlist behind them
+    gtm = GatorTicketMaster(waitlist=HeapqWaitlist)
+    gtm.initialize(seats)
+    for user_id in range(1, seats // 2 + 1):
+        gtm.reserve(user_id, 1)
+    user_id = seats // 2 + 1
+    while len(gtm.available_seats) >= 4:
+        gtm.reserve_block(user_id, 1, 4)
+        user_id += 1
+    for user_id in range(user_id, user_id + seats // 10):
+        gtm.reserve(user_id, user_id % 7)
+    return gtm, user_id
+
+
+def queries(seats, users, rnd):
+    # A read mix dominated by point lookups
+    lines = []
+    for _ in range(QUERIES):
+        r = rnd.random()
+        if r < 0.45:
+            lines.append(f"SeatOwner({rnd.randint(1, seats)})")
+        elif r < 0.9:
+            lines.append(f"ReservationOf({rnd.randint(1, users)})")
+        else:
+            lines.append("Available()")
+    return [lines[i:i + BATCH] for i in range(0, len(lines), BATCH)]
+
+
+def main():
+    seats = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 5
+    max_readers = int(sys.argv[2]) if len(sys.argv) > 2 else max(os.cpu_count() or 1, 4)
+    gtm, users = venue(seats)
+    batches = queries(seats, users, random.Random(42))
+
+    execute = CommandProcessor(gtm).execute
+    start = time.perf_counter()
+    for batch in batches:
+        for line in batch:
+            execute(line)
+    in_process = QUERIES / (time.perf_counter() - start)
+
+    publisher = SeatMapPublisher(gtm, f"gtm_bench_{os.getpid()}")
+    start = time.perf_counter()
+    publisher.publish()
+    first_publish = time.perf_counter() - start
+    rnd = random.Random(7)
+    for _ in range(1000):
+        user_id = rnd.randint(1, seats // 2)
+        seat_id = gtm.reservations.search(user_id)
+        if seat_id is not None:
+            gtm.cancel(seat_id, user_id)
+    start = time.perf_counter()
+    changed = publisher.publish()
+    batch_publish = time.perf_counter() - start
+
+    print(f"{seats} seats, {os.cpu_count()} CPUs, {QUERIES} queries in batches of {BATCH}")
+    print(f"first publish: {first_publish * 1e3:.1f} ms; publish after 1000 Cancels "
+          f"({changed} seats changed): {batch_publish * 1e3:.2f} ms")
+    print(f"{'readers':>8} {'queries/s':>12} {'vs in-process':>14}")
+    print(f"{'writer':>8} {in_process:>12,.0f} {1:>13.2f}x")
+    try:
+        readers = 1
+        while readers <= max_readers:
+            pool = ReaderPool(publisher.name, readers)
+            pool.run(batches[:readers])  # Warm up every worker
+            start = time.perf_counter()
+            pool.run(batches)
+            qps = QUERIES / (time.perf_counter() - start)
+            pool.close()
+            print(f"{readers:>8} {qps:>12,.0f} {qps / in_process:>13.2f}x")
+            readers *= 2
+    finally:
+        publisher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Bytes per reservation and ops/sec of RedBlackTree, ArrayRedBlackTree and
+DenseReservationStore, for dense user ids and for ids spread over 10x and 100x
+their count (the last is sparse enough to put DenseReservationStore in tree mode).
+
+Usage: python benchmarks/bench_reservation_store.py [reservations]
+"""
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import ArrayRedBlackTree, DenseReservationStore, RedBlackTree
+
+
+def rate(count, seconds):
+    return count / seconds if seconds else float("inf")
+
+
+def build(store_class, users):
+    tree = store_class()
+    for seat, user_id in enumerate(users, 1):
+        tree.insert(user_id, seat)
+    return tree
+
+
+def measure(store_class, users):
+    tracemalloc.start()
+    tree = build(store_class, users)
+    gc.collect()  # Drop structures a store discarded while migrating
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tree
+
+    start = time.perf_counter()
+    tree = build(store_class, users)
+    insert_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for user_id in users:
+        tree.search(user_id)
+    search_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for user_id in users:
+        tree.delete(user_id)
+    delete_s = time.perf_counter() - start
+    n = len(users)
+    return memory / n, rate(n, insert_s), rate(n, search_s), rate(n, delete_s)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    rnd = random.Random(11)
+    for spread in (1, 10, 100):
+        users = rnd.sample(range(1, spread * count + 1), count)
+        print(f"{count} reservations, user ids in 1..{spread * count}")
+        print(f"{'store':>22} {'bytes/resv':>11} {'insert/s':>10} {'search/s':>10} {'delete/s':>10}")
+        for store_class in (RedBlackTree, ArrayRedBlackTree, DenseReservationStore):
+            per_resv, ins, srch, dele = measure(store_class, users)
+            print(f"{store_class.__name__:>22} {per_resv:>11.1f} {ins:>10.0f} {srch:>10.0f} {dele:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
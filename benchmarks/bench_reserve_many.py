@@ -0,0 +1,46 @@
+"""
+On-sale burst: N users reserve against a venue with N / 2 seats, sent as N
+Reserve commands or as ReserveMany commands of increasing batch size, each
+through CommandProcessor so parsing and dispatch are included.
+
+Usage: python benchmarks/bench_reserve_many.py [users]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import CommandProcessor, GatorTicketMaster, RESERVATION_STORES, SEAT_POOLS
+
+
+def burst(users, batch, seat_pool, reservation_store):
+    # Users/sec for the whole burst; batch 1 sends plain Reserve commands
+    gtm = GatorTicketMaster(seat_pool=seat_pool, reservation_store=reservation_store)
+    execute = CommandProcessor(gtm).execute
+    execute(f"Initialize({users // 2})")
+    if batch == 1:
+        lines = [f"Reserve({user_id}, {user_id % 5 + 1})" for user_id in range(1, users + 1)]
+    else:
+        lines = [f"ReserveMany({lo}, {min(lo + batch - 1, users)}, {lo % 5 + 1})" for lo in range(1, users + 1, batch)]
+    start = time.perf_counter()
+    for line in lines:
+        result = execute(line)
+    elapsed = time.perf_counter() - start
+    assert len(gtm.reservations) == users // 2 and result
+    return users / elapsed
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    batches = (1, 10, 100, 1000, 10000)
+    print(f"{users} users, {users // 2} seats; users/sec by command batch size (1 = Reserve)")
+    print(f"{'seat pool':>10} {'store':>6}" + ''.join(f"{batch:>12}" for batch in batches))
+    for pool_name in ("heap", "ranges", "segment"):
+        for store_name in ("tree", "dense"):
+            rates = [burst(users, batch, SEAT_POOLS[pool_name], RESERVATION_STORES[store_name]) for batch in batches]
+            print(f"{pool_name:>10} {store_name:>6}" + ''.join(f"{rate:>12,.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
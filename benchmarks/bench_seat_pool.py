@@ -0,0 +1,76 @@
+"""
+Memory and latency of the free-seat stores: MinHeap, SeatRangePool and
+SegmentTreeSeatPool, plus ReserveBlock latency on a fragmented venue.
+
+Usage: python benchmarks/bench_seat_pool.py [seat_count] [block_venue_seats]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import MinHeap, SeatRangePool, SegmentTreeSeatPool
+
+CHURN = 100000
+BLOCKS = 200
+BLOCK_SIZE = 4
+
+
+def measure(pool_class, seat_count, churn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    pool = pool_class()
+    pool.insert_range(1, seat_count)
+    init_s = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Reserve a block of seats, then return random ones and take the lowest again
+    rnd = random.Random(7)
+    taken = [pool.extract_min() for _ in range(churn)]
+    rnd.shuffle(taken)
+    start = time.perf_counter()
+    for seat in taken:
+        pool.insert(seat)
+        pool.extract_min()
+    churn_us = (time.perf_counter() - start) / churn * 1e6
+    return init_s, memory, churn_us
+
+
+def measure_blocks(pool_class, seat_count):
+    # Free seats come in runs of 1-3 except in the last tenth of the venue, so blocks are found late
+    rnd = random.Random(11)
+    pool = pool_class()
+    seat = 1
+    while seat < seat_count * 9 // 10:
+        length = rnd.randint(1, BLOCK_SIZE - 1)
+        pool.insert_range(seat, seat + length - 1)
+        seat += length + 1
+    pool.insert_range(seat, seat_count)
+    start = time.perf_counter()
+    for _ in range(BLOCKS):
+        pool.take_block(BLOCK_SIZE)
+    return (time.perf_counter() - start) / BLOCKS * 1e6
+
+
+def main():
+    seat_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 7
+    block_seats = int(sys.argv[2]) if len(sys.argv) > 2 else 10 ** 5
+    pools = (MinHeap, SeatRangePool, SegmentTreeSeatPool)
+    churn = min(CHURN, seat_count)  # Only seats that were taken can be returned
+    print(f"{seat_count} seats, {churn} return+extract pairs")
+    print(f"{'store':>19} {'Initialize s':>13} {'memory MB':>10} {'return+extract us':>18}")
+    for pool_class in pools:
+        init_s, memory, churn_us = measure(pool_class, seat_count, churn)
+        print(f"{pool_class.__name__:>19} {init_s:>13.3f} {memory / 2 ** 20:>10.1f} {churn_us:>18.2f}")
+    print(f"\n{block_seats} fragmented seats, {BLOCKS} blocks of {BLOCK_SIZE}")
+    print(f"{'store':>19} {'ReserveBlock us':>16}")
+    for pool_class in pools:
+        print(f"{pool_class.__name__:>19} {measure_blocks(pool_class, block_seats):>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Reservation cost in a sectioned venue as the number of sections grows. The
+venue has S sections of equal size spread over 8 price tiers; users book with
+ReserveBest, ReserveTier and ReserveSection until it is nearly sold out, and
+the flat Reserve on a single-section venue is the baseline. Then every
+tenth booking is cancelled so that section and tier waitlists are promoted.
+
+Usage: python benchmarks/bench_sections.py [seats]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import CommandProcessor, GatorTicketMaster, SEAT_POOLS
+
+TIERS = 8
+
+
+def venue(seats, sections, seat_pool):
+    # Sections of equal size, tier by section number
+    gtm = GatorTicketMaster(seat_pool=seat_pool)
+    execute = CommandProcessor(gtm).execute
+    for section in range(1, sections + 1):
+        execute(f"InitializeSection({section}, {seats // sections}, {section % TIERS + 1})")
+    return gtm, execute
+
+
+def bookings(seats, sections, rnd):
+    # Command lines for a mix of booking policies, 5% more users than seats
+    lines = []
+    for user_id in range(1, seats + seats // 20 + 1):
+        r = rnd.random()
+        if r < 0.4:
+            lines.append(f"ReserveBest({user_id}, {rnd.randint(1, 5)})")
+        elif r < 0.8:
+            lines.append(f"ReserveTier({user_id}, {rnd.randint(1, TIERS)}, {rnd.randint(1, 5)})")
+        else:
+            lines.append(f"ReserveSection({user_id}, {rnd.randint(1, sections)}, {rnd.randint(1, 5)})")
+    return lines
+
+
+def run(seats, sections, seat_pool):
+    # Bookings/sec, then Cancels/sec with the freed seats going to section and tier waitlists
+    gtm, execute = venue(seats, sections, seat_pool)
+    rnd = random.Random(sections)
+    lines = bookings(seats, sections, rnd)
+    start = time.perf_counter()
+    for line in lines:
+        execute(line)
+    book = len(lines) / (time.perf_counter() - start)
+    users = [user_id for user_id in range(1, len(lines) + 1, 10) if gtm.reservations.search(user_id) is not None]
+    start = time.perf_counter()
+    for user_id in users:
+        execute(f"Cancel({gtm.reservations.search(user_id)}, {user_id})")
+    return book, len(users) / (time.perf_counter() - start)
+
+
+def flat(seats, seat_pool):
+    # Reserve/sec on a venue without sections, the baseline
+    gtm = GatorTicketMaster(seat_pool=seat_pool)
+    execute = CommandProcessor(gtm).execute
+    execute(f"Initialize({seats})")
+    lines = [f"Reserve({user_id}, 1)" for user_id in range(1, seats + 1)]
+    start = time.perf_counter()
+    for line in lines:
+        execute(line)
+    return seats / (time.perf_counter() - start)
+
+
+def main():
+    seats = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    print(f"{seats} seats, {TIERS} tiers")
+    print(f"{'seat pool':>10} {'sections':>9} {'bookings/s':>12} {'cancels/s':>10}")
+    for pool_name in ("heap", "ranges", "segment"):
+        seat_pool = SEAT_POOLS[pool_name]
+        print(f"{pool_name:>10} {'flat':>9} {flat(seats, seat_pool):>12,.0f} {'':>10}")
+        for sections in (1, 10, 100, 1000):
+            book, cancel = run(seats, sections, seat_pool)
+            print(f"{pool_name:>10} {sections:>9} {book:>12,.0f} {cancel:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
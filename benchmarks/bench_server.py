@@ -0,0 +1,120 @@
+"""
+Load generator for gatorServer.py: sustained requests/sec and tail latency.
+
+Usage:
+    python benchmarks/bench_server.py [--connections 8] [--pipeline 32] [--seconds 5]
+                                      [--port PORT | --unix PATH]
+
+Without --port/--unix it starts a server on a temporary Unix socket itself.
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+async def read_reply(reader):
+    # Read one framed reply: a line count, then that many lines
+    count = int(await reader.readline())
+    return [(await reader.readline()).decode().rstrip("\n") for _ in range(count)]
+
+
+async def connect(options):
+    if options.unix:
+        return await asyncio.open_unix_connection(options.unix)
+    return await asyncio.open_connection(options.host, options.port)
+
+
+async def client(options, client_id, deadline, latencies):
+    # Keep `pipeline` requests in flight and record the latency of each one
+    reader, writer = await connect(options)
+    rnd = random.Random(client_id)
+    sent = []
+    next_user = client_id * 10 ** 9
+
+    def request():
+        nonlocal next_user
+        r = rnd.random()
+        if r < 0.5:
+            next_user += 1
+            return f"Reserve({next_user}, {rnd.randint(1, 10)})"
+        if r < 0.8:
+            return f"SeatOwner({rnd.randint(1, options.seats)})"
+        if r < 0.9:
+            return f"ExitWaitlist({next_user})"
+        return "Available()"
+
+    async def pump():
+        while time.perf_counter() < deadline:
+            while len(sent) < options.pipeline:
+                sent.append(time.perf_counter())
+                writer.write((request() + "\n").encode())
+            await writer.drain()
+            await asyncio.sleep(0)
+
+    pumping = asyncio.create_task(pump())
+    while time.perf_counter() < deadline or sent:
+        if not sent:
+            await asyncio.sleep(0)
+            continue
+        await read_reply(reader)
+        latencies.append(time.perf_counter() - sent.pop(0))
+    await pumping
+    writer.close()
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run(options):
+    reader, writer = await connect(options)
+    writer.write(f"Initialize({options.seats})\n".encode())
+    await read_reply(reader)
+    writer.close()
+    latencies = []
+    start = time.perf_counter()
+    deadline = start + options.seconds
+    await asyncio.gather(*(client(options, i + 1, deadline, latencies)
+                           for i in range(options.connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"{options.connections} connections x {options.pipeline} pipelined: "
+          f"{len(latencies) / elapsed:,.0f} requests/s")
+    for label, fraction in (("p50", 0.5), ("p99", 0.99), ("p99.9", 0.999)):
+        print(f"  {label:>6} {percentile(latencies, fraction) * 1e3:8.3f} ms")
+    print(f"  {'max':>6} {latencies[-1] * 1e3:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="gatorServer load generator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--unix")
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--pipeline", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--seats", type=int, default=100000)
+    options = parser.parse_args()
+    server = None
+    if options.port is None and options.unix is None:
+        options.unix = os.path.join(tempfile.mkdtemp(), "gator.sock")
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, "gatorServer.py"), "--unix", options.unix])
+        while not os.path.exists(options.unix):
+            time.sleep(0.05)
+    try:
+        asyncio.run(run(options))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Snapshot save and load time for a venue with N reservations.
+
+Usage: python benchmarks/bench_snapshot.py [reservations] [tree|array]
+"""
+import os
+import sys
+import tempfile
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import GatorTicketMaster, RESERVATION_STORES, SeatIndex
+
+
+def sold_out(count, reservation_store):
+    # Build a sold-out venue directly: user i holds seat i, 1% more users wait
+    gator_tm = GatorTicketMaster(reservation_store=reservation_store)
+    gator_tm.last_seat_number = count
+    gator_tm.reservations.build_from_sorted(range(1, count + 1), range(1, count + 1))
+    gator_tm.seat_index.owner = array("q", [SeatIndex.NO_USER]) + array("q", range(1, count + 1))
+    gator_tm.seat_index.count = count
+    for user_id in range(count + 1, count + count // 100 + 1):
+        gator_tm.reserve(user_id, user_id % 10)
+    return gator_tm
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 7
+    store = sys.argv[2] if len(sys.argv) > 2 else "array"
+    reservation_store = RESERVATION_STORES[store]
+    gator_tm = sold_out(count, reservation_store)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.snap")
+        start = time.perf_counter()
+        gator_tm.save_snapshot(path)
+        save_s = time.perf_counter() - start
+        del gator_tm
+        start = time.perf_counter()
+        restored, _ = GatorTicketMaster.load_snapshot(path, reservation_store=reservation_store)
+        load_s = time.perf_counter() - start
+        size = os.path.getsize(path)
+    print(f"{count} reservations ({store}): snapshot {size / 2 ** 20:.1f} MB, "
+          f"save {save_s:.2f} s, load {load_s:.2f} s")
+    print(restored.available())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Rollback cost on a sold-out venue with N reservations. Each transaction
+cancels k reservations (the seats go to waitlisted users) and books k new
+users onto the waitlist, then is rolled back. For comparison, restoring the
+whole state from a binary snapshot is timed once.
+
+Usage: python benchmarks/bench_transactions.py [reservations] [tree|array|dense]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import GatorTicketMaster, RESERVATION_STORES, SeatIndex, SeatRangePool
+
+
+def sold_out(count, reservation_store):
+    # Build a sold-out venue directly: user i holds seat i, 1% more users wait
+    gator_tm = GatorTicketMaster(seat_pool=SeatRangePool, reservation_store=reservation_store)
+    gator_tm.last_seat_number = count
+    gator_tm.reservations.build_from_sorted(range(1, count + 1), range(1, count + 1))
+    gator_tm.seat_index.owner = array("q", [SeatIndex.NO_USER]) + array("q", range(1, count + 1))
+    gator_tm.seat_index.count = count
+    for user_id in range(count + 1, count + count // 100 + 1):
+        gator_tm.reserve(user_id, user_id % 10)
+    return gator_tm
+
+
+def transaction(gator_tm, k, rnd, next_user):
+    # Time Begin plus the transaction body, and then Rollback
+    users = rnd.sample(range(1, gator_tm.last_seat_number + 1), k)
+    start = time.perf_counter()
+    gator_tm.begin()
+    for user_id in users:
+        seat_id = gator_tm.reservations.search(user_id)
+        if seat_id is not None:
+            gator_tm.cancel(seat_id, user_id)
+    for user_id in range(next_user, next_user + k):
+        gator_tm.reserve(user_id, 5)
+    body = time.perf_counter() - start
+    start = time.perf_counter()
+    gator_tm.rollback()
+    return body, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 7
+    store = sys.argv[2] if len(sys.argv) > 2 else "array"
+    gator_tm = sold_out(count, RESERVATION_STORES[store])
+    rnd = random.Random(5)
+    print(f"{count} reservations, {len(gator_tm.waitlist)} waitlisted, {store} store")
+    print(f"{'k':>8} {'Begin + body ms':>16} {'Rollback ms':>12} {'Rollback us/op':>15}")
+    for k in sorted({min(k, count) for k in (10, 100, 1000, 10000, 100000)}):  # Cancels sample the reservations
+        body, rollback = transaction(gator_tm, k, rnd, 2 * count)
+        print(f"{k:>8} {body * 1e3:>16.2f} {rollback * 1e3:>12.2f} {rollback / (2 * k) * 1e6:>15.2f}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.snap")
+        gator_tm.save_snapshot(path)
+        start = time.perf_counter()
+        GatorTicketMaster.load_snapshot(path, seat_pool=SeatRangePool, reservation_store=RESERVATION_STORES[store])
+        print(f"restoring the whole state from a snapshot instead: {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Per-operation latency of each waitlist class as the waitlist grows, including
+WaitlistPosition rank queries, plus Reserve-to-waitlist and extract_max throughput
+and the cost of one priority-aging tick.
+
+Usage: python benchmarks/bench_waitlist.py [max_size]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import GatorTicketMaster, WAITLISTS
+
+OPS = 2000
+
+
+def build(size, rnd, waitlist):
+    # Create a system with no free seats and `size` users on the waitlist
+    gtm = GatorTicketMaster(waitlist=waitlist)
+    for user_id in range(1, size + 1):
+        gtm.waitlist.insert((rnd.randint(1, 100), user_id, user_id))
+    gtm.next_sequence = size + 1
+    return gtm
+
+
+def per_op_us(fn, args):
+    start = time.perf_counter()
+    for a in args:
+        fn(*a)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+
+def throughput(size, rnd, waitlist):
+    # Ops/sec of Reserve onto a sold-out venue, then of draining the waitlist
+    gtm = GatorTicketMaster(waitlist=waitlist)
+    requests = [(user_id, rnd.randint(1, 100)) for user_id in range(1, size + 1)]
+    start = time.perf_counter()
+    for user_id, priority in requests:
+        gtm.reserve(user_id, priority)
+    reserve = size / (time.perf_counter() - start)
+    extract_max = gtm.waitlist.extract_max
+    start = time.perf_counter()
+    for _ in range(size):
+        extract_max()
+    return reserve, size / (time.perf_counter() - start)
+
+
+def aging_tick(size, rnd, waitlist):
+    # Raise every waitlisted user's priority by one: rewrite each entry, or let the lazy clock offset do it
+    gtm = build(size, rnd, waitlist)
+    start = time.perf_counter()
+    for priority, _, user_id in gtm.waitlist.items():
+        gtm.update_priority(user_id, priority + 1)
+    eager = time.perf_counter() - start
+    gtm = GatorTicketMaster(waitlist=waitlist, aging_interval=1)
+    for user_id in range(1, size + 1):
+        gtm.reserve(user_id, rnd.randint(1, 100))
+    start = time.perf_counter()
+    gtm.tick()
+    return eager, time.perf_counter() - start
+
+
+def main():
+    max_size = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    for name, waitlist in sorted(WAITLISTS.items()):
+        rnd = random.Random(42)
+        print(f"waitlist={name}")
+        print(f"{'waitlist':>10} {'UpdatePriority us':>18} {'ExitWaitlist us':>16} {'contains us':>12}"
+              f" {'position us':>12} {'Reserve ops/s':>14} {'extract_max ops/s':>18}")
+        size = 1000
+        while size <= max_size:
+            gtm = build(size, rnd, waitlist)
+            users = [rnd.randint(1, size) for _ in range(OPS)]
+            update = per_op_us(gtm.update_priority, [(u, rnd.randint(1, 100)) for u in users])
+            lookup = per_op_us(gtm.waitlist.contains, [(u,) for u in users])
+            gtm.waitlist_position(1)  # Builds the rank tree once
+            position = per_op_us(gtm.waitlist_position, [(u,) for u in users])
+            exit_ = per_op_us(gtm.exit_waitlist, [(u,) for u in set(users)])
+            del gtm
+            reserve, extract = throughput(size, rnd, waitlist)
+            print(f"{size:>10} {update:>18.2f} {exit_:>16.2f} {lookup:>12.3f} {position:>12.2f}"
+                  f" {reserve:>14.0f} {extract:>18.0f}")
+            size *= 10
+        print(f"{'waitlist':>10} {'eager aging tick ms':>20} {'lazy aging tick us':>19}")
+        size = 1000
+        while size <= max_size:
+            eager, lazy = aging_tick(size, rnd, waitlist)
+            print(f"{size:>10} {eager * 1e3:>20.1f} {lazy * 1e6:>19.2f}")
+            size *= 10
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Times every GatorTicketMaster command separately across workload sizes and
+saves the scaling curves as JSON.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--min-size 1000] [--max-size 10000000]
+                                        [--scenario NAME ...] [-o results.json]
+                                        [--compare previous.json]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+
+from gatorTicketMaster import CommandProcessor, GatorTicketMaster, SEAT_POOLS, RESERVATION_STORES, WAITLISTS
+from workload import SCENARIOS, generate
+
+
+def time_commands(lines, gator_tm):
+    """
+    Run command lines and time each one.
+    Returns {command name: [calls, total seconds, max seconds]}
+    """
+    execute = CommandProcessor(gator_tm).execute
+    clock = time.perf_counter
+    timings = defaultdict(lambda: [0, 0.0, 0.0])
+    for line in lines:
+        name = line.partition("(")[0]
+        start = clock()
+        result = execute(line)
+        if result is not None and not isinstance(result, str):
+            for _ in result:  # Streamed results do their work while being consumed
+                pass
+        elapsed = clock() - start
+        entry = timings[name]
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+    return timings
+
+
+def git_version():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def sizes_between(lo, hi):
+    size = lo
+    while size <= hi:
+        yield size
+        size *= 10
+
+
+def compare(previous, current):
+    # Print the mean latency ratio for every (scenario, size, command) in both reports
+    old = {(r["scenario"], r["size"], r["command"]): r["mean_us"] for r in previous["results"]}
+    print(f"\nvs {previous['version']}:")
+    for r in current["results"]:
+        key = (r["scenario"], r["size"], r["command"])
+        if key in old and old[key]:
+            ratio = r["mean_us"] / old[key]
+            flag = "  <-- slower" if ratio > 1.2 else ""
+            print(f"  {key[0]:>15} {key[1]:>9} {key[2]:>18} {ratio:6.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--min-size", type=int, default=10 ** 3)
+    parser.add_argument("--max-size", type=int, default=10 ** 7)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--seat-pool", choices=sorted(SEAT_POOLS), default="heap")
+    parser.add_argument("--reservations", choices=sorted(RESERVATION_STORES), default="tree")
+    parser.add_argument("--waitlist", choices=sorted(WAITLISTS), default="heap")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    options = parser.parse_args()
+
+    report = {
+        "version": git_version(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seat_pool": options.seat_pool,
+        "reservations": options.reservations,
+        "waitlist": options.waitlist,
+        "seed": options.seed,
+        "results": [],
+    }
+    for scenario in options.scenario or sorted(SCENARIOS):
+        for size in sizes_between(options.min_size, options.max_size):
+            gator_tm = GatorTicketMaster(seat_pool=SEAT_POOLS[options.seat_pool],
+                                         reservation_store=RESERVATION_STORES[options.reservations],
+                                         waitlist=WAITLISTS[options.waitlist])
+            gc.collect()
+            start = time.perf_counter()
+            timings = time_commands(generate(scenario, size, options.seed), gator_tm)
+            wall = time.perf_counter() - start
+            print(f"{scenario:>15} {size:>9}: {wall:8.2f} s")
+            for command, (calls, total, worst) in sorted(timings.items()):
+                report["results"].append({
+                    "scenario": scenario,
+                    "size": size,
+                    "command": command,
+                    "calls": calls,
+                    "total_s": total,
+                    "mean_us": total / calls * 1e6,
+                    "max_us": worst * 1e6,
+                })
+                print(f"{'':>27}{command:>18} {calls:>9} calls {total / calls * 1e6:10.2f} us/op")
+
+    with open(options.output, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"Saved {options.output}")
+    if options.compare:
+        with open(options.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
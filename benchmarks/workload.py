@@ -0,0 +1,135 @@
+"""
+Seeded generator of realistic GatorTicketMaster command mixes.
+
+Usage: python benchmarks/workload.py <scenario> <size> [--seed N] [-o FILE]
+
+Scenarios:
+    onsale          Initialize(size), then an on-sale burst of Reserve that
+                    overflows 20% into the waitlist
+    waitlist_churn  A small venue with a long waitlist and heavy UpdatePriority,
+                    ExitWaitlist and re-Reserve churn
+    mass_release    A sold-out venue released in large ReleaseSeats ranges
+    stepwise_add    A waitlist drained by repeated AddSeats steps with cancellations
+    mixed           All of the above command types interleaved
+"""
+import argparse
+import random
+import sys
+
+
+def onsale(size, rnd):
+    yield f"Initialize({size})"
+    for user_id in range(1, size + size // 5 + 1):
+        yield f"Reserve({user_id}, {rnd.randint(1, 10)})"
+        if user_id % 1000 == 0:
+            yield "Available()"
+
+
+def waitlist_churn(size, rnd):
+    seats = max(1, size // 100)
+    yield f"Initialize({seats})"
+    for user_id in range(1, size + 1):
+        yield f"Reserve({user_id}, {rnd.randint(1, 100)})"
+    waiting = list(range(seats + 1, size + 1))
+    next_user = size + 1
+    for _ in range(size):
+        r = rnd.random() if waiting else 1.0
+        i = rnd.randrange(len(waiting)) if waiting else 0
+        if r < 0.6:
+            yield f"UpdatePriority({waiting[i]}, {rnd.randint(1, 100)})"
+        elif r < 0.8:
+            # Swap-remove keeps the bookkeeping O(1)
+            yield f"ExitWaitlist({waiting[i]})"
+            waiting[i] = waiting[-1]
+            waiting.pop()
+        else:
+            yield f"Reserve({next_user}, {rnd.randint(1, 100)})"
+            waiting.append(next_user)
+            next_user += 1
+    yield "Available()"
+
+
+def mass_release(size, rnd):
+    yield f"Initialize({size})"
+    total = size + size // 2
+    for user_id in range(1, total + 1):
+        yield f"Reserve({user_id}, {rnd.randint(1, 10)})"
+    chunk = max(1, size // 10)
+    for lo in range(1, total + 1, chunk):
+        yield f"ReleaseSeats({lo}, {lo + chunk - 1})"
+        yield "Available()"
+    yield "PrintReservations()"
+
+
+def stepwise_add(size, rnd):
+    step = max(1, size // 10)
+    yield f"Initialize({step})"
+    for user_id in range(1, size + 1):
+        yield f"Reserve({user_id}, {rnd.randint(1, 10)})"
+    for _ in range(9):
+        yield f"AddSeats({step})"
+        # User i holds seat i for the first Initialize block
+        for _ in range(max(1, step // 100)):
+            user_id = rnd.randint(1, step)
+            yield f"Cancel({user_id}, {user_id})"
+        yield "Available()"
+
+
+def mixed(size, rnd):
+    yield f"Initialize({size})"
+    for user_id in range(1, 2 * size + 1):
+        r = rnd.random()
+        yield f"Reserve({user_id}, {rnd.randint(1, 10)})"
+        if r < 0.2:
+            yield f"UpdatePriority({rnd.randint(1, user_id)}, {rnd.randint(1, 10)})"
+        elif r < 0.3:
+            yield f"ExitWaitlist({rnd.randint(1, user_id)})"
+        elif r < 0.35:
+            yield f"SeatOwner({rnd.randint(1, size)})"
+        elif r < 0.36:
+            yield f"AddSeats({rnd.randint(1, 100)})"
+        elif r < 0.365:
+            lo = rnd.randint(1, user_id)
+            yield f"ReleaseSeats({lo}, {lo + rnd.randint(0, 100)})"
+    yield "Available()"
+
+
+SCENARIOS = {
+    "onsale": onsale,
+    "waitlist_churn": waitlist_churn,
+    "mass_release": mass_release,
+    "stepwise_add": stepwise_add,
+    "mixed": mixed,
+}
+
+
+def generate(scenario, size, seed=0):
+    """
+    Yield the command lines of a scenario, without the final Quit().
+    Args:
+        scenario (str): One of SCENARIOS
+        size (int): Seat or waitlist scale of the workload
+        seed (int): Random seed, so the same arguments give the same commands
+    """
+    return SCENARIOS[scenario](size, random.Random(seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a GatorTicketMaster command file")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("size", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    options = parser.parse_args()
+    out = open(options.output, "w") if options.output else sys.stdout
+    try:
+        for line in generate(options.scenario, options.size, options.seed):
+            out.write(line + "\n")
+        out.write("Quit()\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import argparse
+import itertools
+
+from gatorTicketMaster import OUTPUT_BATCH, read_results, render_result
+
+# Renders a binary result stream, written with --output-format binary, as the
+# text output file the same run would have written: one line per record.
+
+
+def decode_results(results_file, output_file):
+    """
+    Write the text form of a binary result stream.
+    Args:
+        results_file (str): Result stream, plain or compressed
+        output_file (str): Path of the text file to write
+    Returns: int: Number of lines written
+    """
+    count = 0
+    records = read_results(results_file)
+    with open(output_file, 'w') as out:
+        while True:
+            lines = [render_result(record) for record in itertools.islice(records, OUTPUT_BATCH)]
+            if not lines:
+                break
+            out.write('\n'.join(lines) + '\n')
+            count += len(lines)
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(usage="python gatorDecode.py <results_file> [output_file]")
+    parser.add_argument("results_file")
+    parser.add_argument("output_file", nargs="?",
+                        help="text file to write (default: <input>_output_file.txt next to the results)")
+    options = parser.parse_args()
+    # input1_output_file.bin.gz -> input1_output_file.txt, the name text mode uses
+    output_file = options.output_file or options.results_file.split('.')[0] + ".txt"
+    decode_results(options.results_file, output_file)
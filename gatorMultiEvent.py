@@ -0,0 +1,191 @@
+import argparse
+import multiprocessing
+import os
+import traceback
+import zlib
+
+from gatorTicketMaster import (CommandProcessor, GatorTicketMaster, RESERVATION_STORES, SEAT_POOLS, WAITLISTS,
+                               read_lines)
+
+BATCH_SIZE = 1 << 14  # Commands routed to the workers per round trip
+
+
+def split_event(line):
+    """
+    Split a multi-event command into its event id and the single-event command.
+    Args:
+        line (str): A command such as "Reserve(evt7, 3, 1)"
+    Returns: tuple: ("evt7", "Reserve(3, 1)")
+    """
+    name, _, rest = line.strip().partition('(')
+    event_id, _, args = rest.rstrip(')').partition(',')
+    return event_id.strip(), f"{name}({args})"
+
+
+def shard_of(event_id, shards):
+    # Pick the worker that owns an event; crc32 is stable across processes and runs
+    return zlib.crc32(event_id.encode()) % shards
+
+
+def _worker(conn, options):
+    """
+    Worker process loop. Owns one GatorTicketMaster per event routed to it and
+    answers each batch with the result text of every command, in batch order.
+    Args:
+        conn: Pipe connection to the front end
+        options (dict): GatorTicketMaster constructor arguments
+    """
+    events = {}
+    while True:
+        batch = conn.recv()
+        if batch is None:
+            break
+        results = []
+        for event_id, line in batch:
+            processor = events.get(event_id)
+            if processor is None:
+                processor = events[event_id] = CommandProcessor(GatorTicketMaster(**options))
+            try:
+                result = processor.execute(line)
+                if result is None:
+                    # Quit; the front end stops routing at the first one, so only a direct caller gets here
+                    result = "Program Terminated!!"
+                elif not isinstance(result, str):
+                    result = '\n'.join(result)
+            except (ValueError, IndexError, TypeError):
+                result = "Invalid command"
+            except Exception as error:
+                # Answered like the server does, so the batch still gets one result per command
+                traceback.print_exc()
+                result = f"Error: {type(error).__name__}: {error}"
+            results.append(result)
+        conn.send(results)
+    conn.close()
+
+
+class EventRouter:
+    """
+    Runs each event's GatorTicketMaster in one of several worker processes,
+    chosen by hashing the event id, so events are processed in parallel while
+    every event still sees its own commands in order.
+    """
+    def __init__(self, workers, **options):
+        """
+        Start the worker processes.
+        Args:
+            workers (int): Number of worker processes
+            options: GatorTicketMaster constructor arguments used for every event
+        """
+        self.connections = []
+        self.processes = []
+        for _ in range(workers):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker, args=(child_conn, options), daemon=True)
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+
+    def run_batch(self, commands):
+        """
+        Execute a batch of (event id, command) pairs on the workers.
+        Each worker gets its share of the batch in one message, and the results
+        are merged back into the order of the batch.
+        Args:
+            commands (list): (event id, single-event command line) pairs
+        Returns: list: Result text of each command
+        """
+        shards = len(self.connections)
+        batches = [[] for _ in range(shards)]
+        positions = [[] for _ in range(shards)]
+        for i, command in enumerate(commands):
+            shard = shard_of(command[0], shards)
+            batches[shard].append(command)
+            positions[shard].append(i)
+        for conn, batch in zip(self.connections, batches):
+            if batch:
+                conn.send(batch)
+        results = [None] * len(commands)
+        for conn, batch, batch_positions in zip(self.connections, batches, positions):
+            if batch:
+                for i, result in zip(batch_positions, conn.recv()):
+                    results[i] = result
+        return results
+
+    def close(self):
+        # Stop the workers and wait for them to exit.
+        for conn in self.connections:
+            conn.send(None)
+            conn.close()
+        for process in self.processes:
+            process.join()
+
+
+def process_events(input_file, output_file, workers, per_event_dir=None, **options):
+    """
+    Process a multi-event command file. Every command carries the event id as
+    its first argument, e.g. Initialize(evt, 10) or Reserve(evt, user, priority);
+    Quit() ends the run for all events.
+    Args:
+        input_file (str): Path to the input file containing commands
+        output_file (str): Path to the merged output, in the original command order
+        workers (int): Number of worker processes
+        per_event_dir (str): If given, also append each event's results to <dir>/<event>_output_file.txt
+        options: GatorTicketMaster constructor arguments
+    """
+    router = EventRouter(workers, **options)
+    try:
+        with open(input_file, 'r') as f, open(output_file, 'w') as out:
+            commands = []
+            quit_seen = False
+            for line in read_lines(f):
+                if line.strip().partition('(')[0] == 'Quit':
+                    quit_seen = True
+                    break
+                commands.append(split_event(line))
+                if len(commands) >= BATCH_SIZE:
+                    _write_results(out, commands, router.run_batch(commands), per_event_dir)
+                    commands = []
+            if commands:
+                _write_results(out, commands, router.run_batch(commands), per_event_dir)
+            if quit_seen:
+                out.write("Program Terminated!!\n")
+    finally:
+        router.close()
+
+
+def _write_results(out, commands, results, per_event_dir):
+    # Write one batch to the merged output and, optionally, to per-event files
+    out.write('\n'.join(results) + '\n')
+    if per_event_dir is None:
+        return
+    by_event = {}
+    for (event_id, _), result in zip(commands, results):
+        by_event.setdefault(event_id, []).append(result)
+    for event_id, event_results in by_event.items():
+        # Files are opened per batch, so thousands of events never hold thousands of handles
+        with open(os.path.join(per_event_dir, f"{event_id}_output_file.txt"), 'a') as event_out:
+            event_out.write('\n'.join(event_results) + '\n')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(usage="python gatorMultiEvent.py <input_file> [options]")
+    parser.add_argument("input_file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: one per core)")
+    parser.add_argument("--per-event-dir", metavar="DIR",
+                        help="also write each event's results to DIR/<event>_output_file.txt")
+    parser.add_argument("--seat-pool", choices=sorted(SEAT_POOLS), default="heap")
+    parser.add_argument("--reservations", choices=sorted(RESERVATION_STORES), default="tree")
+    parser.add_argument("--waitlist", choices=sorted(WAITLISTS), default="heap")
+    parser.add_argument("--aging", type=int, default=0, metavar="TICKS",
+                        help="raise waitlisted users' priority by one every TICKS state-changing commands")
+    options = parser.parse_args()
+    output_file = options.input_file.split('.')[0] + "_output_file.txt"
+    if options.per_event_dir:
+        os.makedirs(options.per_event_dir, exist_ok=True)
+    process_events(options.input_file, output_file, options.workers, options.per_event_dir,
+                   seat_pool=SEAT_POOLS[options.seat_pool],
+                   reservation_store=RESERVATION_STORES[options.reservations],
+                   waitlist=WAITLISTS[options.waitlist],
+                   aging_interval=options.aging)
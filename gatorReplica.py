@@ -0,0 +1,378 @@
+import multiprocessing
+from array import array
+from multiprocessing import shared_memory
+
+# Layout of a data segment: HEADER_WORDS int64 header words, then the seat -> user
+# column (SEAT_CAPACITY words) and the user -> reservation table: USER_CAPACITY user
+# ids, then USER_CAPACITY first seats and USER_CAPACITY last seats of the seat or
+# block ReservationOf reports. The table is open-addressed with linear probing and
+# kept at most half full, a slot whose first seat is NO_SEAT being empty, so its
+# size follows the number of users holding seats, not their ids.
+# Readers use the VERSION word as a seqlock: the publisher makes it odd while it
+# writes and even again when it is done, so a read that saw the same even value
+# before and after copied a consistent state. A segment that has been outgrown
+# names its replacement in SUCCESSOR; the small directory segment always holds
+# the generation of the live one.
+VERSION, SUCCESSOR, SEAT_CAPACITY, USER_CAPACITY, LAST_SEAT, AVAILABLE, WAITLIST, RESERVED, CLOCK = range(9)
+HEADER_WORDS = 16
+NO_USER = -1
+NO_SEAT = -1
+CHUNK = 1024  # Seats compared per step when looking for changes
+
+
+def _segment_name(name, generation):
+    return f"{name}_{generation}"
+
+
+def _home(user_id, mask):
+    # Preferred user table slot of a user id: Fibonacci hashing, so runs of ids spread out
+    return (user_id * 0x9E3779B97F4A7C15 >> 32) & mask
+
+
+def _attach(name):
+    # Open an existing segment. Python 3.13+ can leave it untracked; before that the
+    # attach registers it with the resource tracker, which is harmless for readers that
+    # share the publisher's tracker (its own process, or workers started from it such
+    # as ReaderPool) but makes an unrelated process's tracker unlink it at exit.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class _Segment:
+    # Typed views over one data segment
+    def __init__(self, shm):
+        self.shm = shm
+        words = shm.buf.cast('q')
+        self.header = words[:HEADER_WORDS]
+        seat_capacity, user_capacity = self.header[SEAT_CAPACITY], self.header[USER_CAPACITY]
+        self.seat_user = words[HEADER_WORDS:HEADER_WORDS + seat_capacity]
+        users = HEADER_WORDS + seat_capacity
+        self.user_key = words[users:users + user_capacity]
+        self.user_seat = words[users + user_capacity:users + 2 * user_capacity]
+        self.user_last = words[users + 2 * user_capacity:users + 3 * user_capacity]
+        self.words = words
+
+    def reservation(self, user_id):
+        # Probe the user table; returns the user's (first seat, last seat) or (NO_SEAT, NO_SEAT)
+        user_key, user_seat = self.user_key, self.user_seat
+        mask = len(user_seat) - 1
+        slot = _home(user_id, mask)
+        while user_seat[slot] != NO_SEAT:
+            if user_key[slot] == user_id:
+                return user_seat[slot], self.user_last[slot]
+            slot = (slot + 1) & mask
+        return NO_SEAT, NO_SEAT
+
+    def release(self):
+        # Drop the views before closing, as SharedMemory.close requires
+        for view in (self.seat_user, self.user_key, self.user_seat, self.user_last, self.header, self.words):
+            view.release()
+        self.shm.close()
+
+
+class SeatMapPublisher:
+    """
+    Mirrors a GatorTicketMaster's seat -> user and user -> seat maps and its
+    counters into shared memory, so reader processes can answer read-only
+    commands without going through the writer.
+    publish() finds the seats that changed since the last call by comparing the
+    seat index with a private copy chunk by chunk (a C-level compare per chunk),
+    then rewrites only those seats and their users under the seqlock. The writer
+    itself is untouched; call publish() after each batch of commands.
+    """
+    def __init__(self, gator_tm, name, seat_capacity=1024, user_capacity=1024):
+        """
+        Create the shared memory segments.
+        Args:
+            gator_tm (GatorTicketMaster): The system to mirror
+            name (str): Shared memory name readers attach to
+            seat_capacity (int): Initial seat column size; grows on demand
+            user_capacity (int): Initial user table slots, a power of two; grows on demand
+        """
+        self.gator_tm = gator_tm
+        self.name = name
+        self.directory = shared_memory.SharedMemory(name=name, create=True, size=8)
+        self.generation = 0
+        self.mirror = array('q')  # Seat -> user as last published
+        self.users = 0  # Users in the user table
+        self.multi = set()  # Users holding several reservations; which one ReservationOf reports can change
+        self.segment = self._create(seat_capacity, user_capacity)
+        self.directory.buf.cast('q')[0] = self.generation
+
+    def _create(self, seat_capacity, user_capacity):
+        # Allocate an empty data segment for the current generation
+        size = 8 * (HEADER_WORDS + seat_capacity + 3 * user_capacity)
+        shm = shared_memory.SharedMemory(name=_segment_name(self.name, self.generation), create=True, size=size)
+        header = shm.buf.cast('q')
+        header[SEAT_CAPACITY] = seat_capacity
+        header[USER_CAPACITY] = user_capacity
+        header.release()
+        segment = _Segment(shm)
+        segment.seat_user[:] = array('q', [NO_USER]) * seat_capacity
+        segment.user_seat[:] = array('q', [NO_SEAT]) * user_capacity
+        return segment
+
+    def _grow(self, seat_capacity, user_capacity):
+        """
+        Move to a larger segment: fill a new generation from scratch, point the
+        directory at it and mark the old one as replaced before unlinking it.
+        Readers still mapping the old segment see SUCCESSOR and reattach.
+        """
+        old = self.segment
+        self.generation += 1
+        self.mirror = array('q')
+        self.users = 0
+        self.segment = self._create(seat_capacity, user_capacity)
+        self._write(self._changed_seats())
+        self.directory.buf.cast('q')[0] = self.generation
+        header = old.header
+        header[VERSION] += 1
+        header[SUCCESSOR] = self.generation
+        header[VERSION] += 1
+        old.release()
+        old.shm.unlink()
+
+    def _changed_seats(self):
+        # Seats whose owner differs from the last published value, found chunk by chunk
+        owner, mirror = self.gator_tm.seat_index.owner, self.mirror
+        if len(mirror) < len(owner):
+            mirror.extend(array('q', [NO_USER]) * (len(owner) - len(mirror)))
+        changed = []
+        if owner != mirror:
+            for start in range(0, len(owner), CHUNK):
+                if owner[start:start + CHUNK] != mirror[start:start + CHUNK]:
+                    changed.extend(seat for seat in range(start, min(start + CHUNK, len(owner)))
+                                   if owner[seat] != mirror[seat])
+        return changed
+
+    def publish(self):
+        """
+        Copy everything that changed since the last call into shared memory,
+        moving to a larger segment first if the seats or users have outgrown it.
+        Returns: int: Number of seats rewritten
+        """
+        changed = self._changed_seats()
+        owner = self.gator_tm.seat_index.owner
+        header = self.segment.header
+        seat_capacity, user_capacity = header[SEAT_CAPACITY], header[USER_CAPACITY]
+        # Each changed seat adds at most one user, and no more users than held seats
+        users = self.users + min(len(changed), len(self.gator_tm.seat_index))
+        if len(owner) > seat_capacity or 2 * users > user_capacity:
+            while seat_capacity < len(owner):
+                seat_capacity *= 2
+            while 2 * users > user_capacity:
+                user_capacity *= 2
+            self._grow(seat_capacity, user_capacity)
+            return len(changed)
+        self._write(changed)
+        return len(changed)
+
+    def _write(self, changed):
+        # Rewrite the changed seats, their users' reservations and the counters under the seqlock.
+        # Users with several reservations are rewritten every time: any change to the reservation
+        # tree can move which of them ReservationOf reaches first.
+        gator_tm = self.gator_tm
+        owner, mirror = gator_tm.seat_index.owner, self.mirror
+        segment = self.segment
+        header, seat_user = segment.header, segment.seat_user
+        header[VERSION] += 1
+        touched = set(self.multi)
+        for seat in changed:
+            old_user, new_user = mirror[seat], owner[seat]
+            seat_user[seat] = mirror[seat] = new_user
+            touched.update((old_user, new_user))
+        touched.discard(NO_USER)
+        for user_id in touched:
+            self._set_reservation(user_id)
+        header[LAST_SEAT] = gator_tm.last_seat_number
+        header[AVAILABLE] = len(gator_tm.available_seats)
+        header[WAITLIST] = gator_tm._waitlist_count()
+        header[RESERVED] = len(gator_tm.seat_index)
+        header[CLOCK] = gator_tm.clock
+        header[VERSION] += 1
+
+    def _set_reservation(self, user_id):
+        # Store, update or delete a user's entry in the user table to match the writer
+        gator_tm = self.gator_tm
+        seats = gator_tm.reservations.items_between(user_id, user_id)
+        if next(seats, None) is not None and next(seats, None) is not None:
+            self.multi.add(user_id)
+        else:
+            self.multi.discard(user_id)
+        first = gator_tm.reservations.search(user_id)
+        user_key, user_seat, user_last = self.segment.user_key, self.segment.user_seat, self.segment.user_last
+        mask = len(user_seat) - 1
+        slot = _home(user_id, mask)
+        while user_seat[slot] != NO_SEAT and user_key[slot] != user_id:
+            slot = (slot + 1) & mask
+        if first is not None:
+            if user_seat[slot] == NO_SEAT:
+                user_key[slot] = user_id
+                self.users += 1
+            user_seat[slot] = first
+            user_last[slot] = first + gator_tm.blocks.get(first, 1) - 1
+            return
+        if user_seat[slot] == NO_SEAT:
+            return
+        self.users -= 1
+        # Backward-shift deletion: pull later entries of the probe run into the hole,
+        # so lookups never need tombstones
+        hole, slot = slot, (slot + 1) & mask
+        while user_seat[slot] != NO_SEAT:
+            home = _home(user_key[slot], mask)
+            if (slot - home) & mask >= (slot - hole) & mask:
+                user_key[hole], user_seat[hole], user_last[hole] = user_key[slot], user_seat[slot], user_last[slot]
+                hole = slot
+            slot = (slot + 1) & mask
+        user_seat[hole] = NO_SEAT
+
+    def close(self):
+        # Unlink the shared memory; attached readers keep their mappings until they close
+        self.segment.release()
+        self.segment.shm.unlink()
+        self.directory.close()
+        self.directory.unlink()
+
+
+class SeatMapReader:
+    """
+    Answers read-only commands from a published seat map. Results are the same
+    text GatorTicketMaster produces for the state as of the last publish().
+    Every read is retried until it sees an even, unchanged seqlock version.
+    """
+    def __init__(self, name):
+        # Attach to the live segment published under name
+        self.name = name
+        self.directory = _attach(name)
+        self.segment = None
+        self._reattach()
+        self.handlers = {
+            'Available': (self.available, 0),
+            'SeatOwner': (self.seat_owner, 1),
+            'ReservationOf': (self.reservation_of, 1),
+            'PrintReservations': (self.print_reservations, 0),
+        }
+
+    def _reattach(self):
+        # Map the generation the directory currently names, retrying if it is replaced meanwhile
+        while True:
+            generation = self.directory.buf.cast('q')[0]
+            try:
+                shm = _attach(_segment_name(self.name, generation))
+            except FileNotFoundError:
+                continue
+            if self.segment is not None:
+                self.segment.release()
+            self.segment = _Segment(shm)
+            return
+
+    def _read(self, read):
+        # Run read(segment) until it sees a consistent snapshot
+        while True:
+            header = self.segment.header
+            version = header[VERSION]
+            if header[SUCCESSOR]:
+                self._reattach()
+                continue
+            if version & 1:
+                continue
+            result = read(self.segment)
+            if header[VERSION] == version:
+                return result
+
+    def available(self):
+        # Same text as GatorTicketMaster.available
+        return self._read(lambda s: f"Total Seats Available : {s.header[AVAILABLE]}, Waitlist : {s.header[WAITLIST]}")
+
+    def seat_owner(self, seat_id):
+        # Same text as GatorTicketMaster.seat_owner
+        def read(s):
+            if seat_id <= 0 or seat_id > s.header[LAST_SEAT]:
+                return "Invalid input. Please provide a valid seat number."
+            user_id = s.seat_user[seat_id]
+            if user_id == NO_USER:
+                return f"Seat {seat_id} is not reserved"
+            return f"Seat {seat_id} is reserved by user {user_id}"
+        return self._read(read)
+
+    def reservation_of(self, user_id):
+        # Same text as GatorTicketMaster.reservation_of.
+        # NO_USER marks free seats in the seat column, so that one id is left to the writer.
+        if user_id == NO_USER:
+            return "Unknown command"
+
+        def read(s):
+            first, last = s.reservation(user_id)
+            if first == NO_SEAT:
+                return f"User {user_id} has no reservation"
+            if last == first:
+                return f"User {user_id} has seat {first}"
+            return f"User {user_id} has seats {first}-{last}"
+        return self._read(read)
+
+    def print_reservations(self):
+        # Same lines as GatorTicketMaster.print_reservations, copied out in one consistent read
+        def read(s):
+            seats = s.seat_user[:s.header[LAST_SEAT] + 1]
+            return [f"[seat {seat}, user {user_id}]" for seat, user_id in enumerate(seats) if user_id != NO_USER]
+        return self._read(read)
+
+    def execute(self, line):
+        """
+        Run one read-only command line, as CommandProcessor.execute does.
+        Returns the result text or list of lines, or "Unknown command" for
+        commands that need the writer
+        """
+        name, _, rest = line.strip().partition('(')
+        entry = self.handlers.get(name)
+        if entry is None:
+            return "Unknown command"
+        handler, arity = entry
+        if arity == 0:
+            return handler()
+        return handler(int(rest.rstrip(')')))
+
+    def close(self):
+        # Unmap the segments
+        self.segment.release()
+        self.directory.close()
+
+
+_reader = None
+
+
+def _init_worker(name):
+    # Pool initializer: attach this worker process to the seat map
+    global _reader
+    _reader = SeatMapReader(name)
+
+
+def _run_batch(lines):
+    # Pool task: answer a batch of read-only command lines
+    return [_reader.execute(line) for line in lines]
+
+
+class ReaderPool:
+    """
+    A pool of reader processes attached to one published seat map. Batches of
+    read-only command lines are spread over the processes.
+    """
+    def __init__(self, name, processes):
+        # Start processes reader processes attached to the seat map published under name
+        self.pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(name,))
+
+    def run(self, batches):
+        """
+        Execute batches of read-only command lines in parallel.
+        Args:
+            batches (list): Lists of command lines
+        Returns: list: The results of each batch, in order
+        """
+        return self.pool.map(_run_batch, batches)
+
+    def close(self):
+        # Stop the reader processes
+        self.pool.close()
+        self.pool.join()
@@ -0,0 +1,201 @@
+import argparse
+import asyncio
+import os
+import traceback
+
+from gatorTicketMaster import (READ_ONLY_COMMANDS, RESERVATION_STORES, SEAT_POOLS, WAITLISTS, CommandLog,
+                               CommandProcessor, GatorTicketMaster, Instrumentation, replay_log)
+from gatorReplica import SeatMapPublisher
+
+# Protocol: the client sends one command per line, in the same syntax as the input
+# files. For every command the server answers with the number of result lines
+# followed by the lines themselves, so multi-line results (Cancel with a
+# reassignment, PrintReservations) are framed unambiguously. Quit() closes the
+# connection after answering "Program Terminated!!".
+
+# Every connection shares one system, so a transaction could not keep one client's
+# changes apart from another's; these commands are refused instead
+TRANSACTION_COMMANDS = ('Begin', 'Commit', 'Rollback')
+
+
+class TicketServer:
+    """
+    Long-running server around a single GatorTicketMaster. Connection handlers
+    only parse frames and queue commands; one writer task owns the system and
+    runs every command queued since its last pass as one batch, so pipelined
+    requests from all clients are coalesced per event-loop tick. With a
+    command log, each batch is committed to it before any of its replies is sent.
+    """
+    def __init__(self, gator_tm, publisher=None, command_log=None):
+        self.gator_tm = gator_tm
+        processor = CommandProcessor(gator_tm)
+        for name in TRANSACTION_COMMANDS:
+            processor.handlers[name] = (self._no_transactions, 0, False)
+        self.execute = processor.execute
+        self.publisher = publisher
+        self.command_log = command_log
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.commands = 0
+
+    async def run_writer(self):
+        # Single writer: drain everything queued, execute it in order, resolve the futures
+        while True:
+            batch = [await self.queue.get()]
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            replies = []
+            for line, future in batch:
+                result = ''
+                try:
+                    result = self.execute(line)
+                    name = line.partition('(')[0]
+                    if (self.command_log is not None and name != 'Quit' and name not in READ_ONLY_COMMANDS
+                            and name not in TRANSACTION_COMMANDS):
+                        self.command_log.append(line)
+                    if result is None:
+                        lines = ["Program Terminated!!"]
+                    elif isinstance(result, str):
+                        lines = result.split('\n')
+                    else:
+                        lines = list(result) or ['']
+                except (ValueError, IndexError, TypeError):
+                    lines = ["Invalid command"]
+                except Exception as error:
+                    # Any other failure is answered as well, so the client and the requests
+                    # it pipelined behind this one never wait on an unresolved future
+                    traceback.print_exc()
+                    lines = [f"Error: {type(error).__name__}: {error}"]
+                replies.append((future, (f"{len(lines)}\n" + '\n'.join(lines) + '\n', result is None)))
+            try:
+                if self.command_log is not None:
+                    self.command_log.commit()
+            except Exception:
+                traceback.print_exc()
+            for future, reply in replies:
+                future.set_result(reply)
+            try:
+                if self.publisher is not None:
+                    self.publisher.publish()
+                if self.gator_tm.change_feed is not None:
+                    self.gator_tm.change_feed.flush()  # Each batch is one coalescing batch
+            except Exception:
+                traceback.print_exc()  # The replies are sent; keep serving the next batch
+            self.batches += 1
+            self.commands += len(batch)
+
+    @staticmethod
+    def _no_transactions():
+        return "Transactions are not available in server mode"
+
+    async def handle_client(self, reader, writer):
+        """
+        Serve one connection. Requests are queued as soon as they are read, so a
+        client may pipeline many commands; replies are written back in order.
+        """
+        loop = asyncio.get_running_loop()
+        replies = asyncio.Queue()
+
+        async def send_replies():
+            while True:
+                future = await replies.get()
+                if future is None:
+                    break
+                reply, quit_ = await future
+                writer.write(reply.encode())
+                if quit_:
+                    break
+                if replies.empty():
+                    await writer.drain()
+            await writer.drain()
+
+        sender = asyncio.create_task(send_replies())
+        try:
+            while not sender.done():
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode().strip()
+                if not line:
+                    continue
+                future = loop.create_future()
+                self.queue.put_nowait((line, future))
+                replies.put_nowait(future)
+                if line.partition('(')[0] == 'Quit':
+                    break
+        finally:
+            replies.put_nowait(None)
+            await sender
+            writer.close()
+
+
+async def serve(gator_tm, host=None, port=None, unix_path=None, publisher=None, command_log=None):
+    """
+    Run the server until cancelled.
+    Args:
+        gator_tm (GatorTicketMaster): The system that all connections share
+        host (str), port (int): TCP address to listen on
+        unix_path (str): Unix socket path to listen on instead of TCP
+        publisher (SeatMapPublisher): Shared-memory seat map to refresh after every batch
+        command_log (CommandLog): Log that each batch's state-changing commands are committed to
+    """
+    server = TicketServer(gator_tm, publisher, command_log)
+    writer_task = asyncio.create_task(server.run_writer())
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        listener = await asyncio.start_unix_server(server.handle_client, path=unix_path)
+    else:
+        listener = await asyncio.start_server(server.handle_client, host, port)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        writer_task.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(usage="python gatorServer.py [--port PORT | --unix PATH] [options]")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7878)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--seat-pool", choices=sorted(SEAT_POOLS), default="heap")
+    parser.add_argument("--reservations", choices=sorted(RESERVATION_STORES), default="tree")
+    parser.add_argument("--waitlist", choices=sorted(WAITLISTS), default="heap")
+    parser.add_argument("--aging", type=int, default=0, metavar="TICKS",
+                        help="raise waitlisted users' priority by one every TICKS state-changing commands")
+    parser.add_argument("--stats", action="store_true", help="record per-command latencies for Stats()")
+    parser.add_argument("--publish", metavar="NAME",
+                        help="mirror the seat map into shared memory NAME for gatorReplica readers")
+    parser.add_argument("--snapshot", metavar="PATH",
+                        help="restore state from this snapshot if it exists and save a new one on shutdown")
+    parser.add_argument("--wal", metavar="PATH",
+                        help="append state-changing commands to this log and replay its tail on restore")
+    options = parser.parse_args()
+    structures = dict(seat_pool=SEAT_POOLS[options.seat_pool],
+                      reservation_store=RESERVATION_STORES[options.reservations],
+                      waitlist=WAITLISTS[options.waitlist],
+                      aging_interval=options.aging)
+    # Restart from the last snapshot plus the log tail, as gatorTicketMaster.py does
+    log_offset = log_end = 0
+    if options.snapshot and os.path.exists(options.snapshot):
+        gator_tm, log_offset = GatorTicketMaster.load_snapshot(options.snapshot, **structures)
+    else:
+        gator_tm = GatorTicketMaster(**structures)
+    if options.wal and os.path.exists(options.wal):
+        log_end = replay_log(gator_tm, options.wal, log_offset)
+    command_log = CommandLog(options.wal, end=log_end) if options.wal else None
+    if options.stats:
+        Instrumentation().attach(gator_tm)
+    publisher = SeatMapPublisher(gator_tm, options.publish) if options.publish else None
+    try:
+        asyncio.run(serve(gator_tm, options.host, options.port, options.unix, publisher, command_log))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if publisher is not None:
+            publisher.close()
+        if options.snapshot:
+            gator_tm.save_snapshot(options.snapshot, command_log.offset() if command_log else 0)
+        if command_log is not None:
+            command_log.close()
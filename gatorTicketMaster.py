@@ -1,688 +1,5443 @@
-import sys
-import time
-
-class Node:
-    #Represents a node in RedBlack tree
-    def __init__(self, key, value, color="RED"):
-        #Initialize new node
-        self.key = key
-        self.value = value
-        self.color = color
-        self.left = None
-        self.right = None
-        self.parent = None
-
-class RedBlackTree:
-    #This class implements Red Black tree data structure
-    def __init__(self):
-        #Initialize an empty red black tree
-        self.NIL = Node(None, None, "BLACK")
-        self.root = self.NIL
-
-    def insert(self, key, value):
-        """
-        Insert a new key-value pair into the tree.
-        Args:
-            key: The key to insert
-            value: The value associated with the key
-        """
-        new_node = Node(key, value)
-        new_node.left = self.NIL
-        new_node.right = self.NIL
-        # Find the proper position for the new node
-
-        y = None
-        x = self.root
-
-        while x != self.NIL:
-            y = x
-            if new_node.key < x.key:
-                x = x.left
-            else:
-                x = x.right
-        
-        # Insert the new node
-        new_node.parent = y
-        if y is None:
-            self.root = new_node
-        elif new_node.key < y.key:
-            y.left = new_node
-        else:
-            y.right = new_node
-        # Fix the tree to maintain Red-Black properties
-        self._insert_fixup(new_node)
-
-    def _insert_fixup(self, k):
-        """
-        Fix the Red-Black Tree properties after insertion.
-        Args:
-            k: The newly inserted node
-        """
-        while k.parent and k.parent.color == "RED":
-            if k.parent == k.parent.parent.left:
-                y = k.parent.parent.right
-                if y.color == "RED":
-                    k.parent.color = "BLACK"
-                    y.color = "BLACK"
-                    k.parent.parent.color = "RED"
-                    k = k.parent.parent
-                else:
-                    if k == k.parent.right:
-                        k = k.parent
-                        self._left_rotate(k)
-                    k.parent.color = "BLACK"
-                    k.parent.parent.color = "RED"
-                    self._right_rotate(k.parent.parent)
-            else:
-                # Mirror image of the above case
-                y = k.parent.parent.left
-                if y.color == "RED":
-                    k.parent.color = "BLACK"
-                    y.color = "BLACK"
-                    k.parent.parent.color = "RED"
-                    k = k.parent.parent
-                else:
-                    if k == k.parent.left:
-                        k = k.parent
-                        self._right_rotate(k)
-                    k.parent.color = "BLACK"
-                    k.parent.parent.color = "RED"
-                    self._left_rotate(k.parent.parent)
-            if k == self.root:
-                break
-        self.root.color = "BLACK"
-
-    def _left_rotate(self, x):
-        """
-        Perform a left rotation on the given node.
-        Args:
-            x: The node to rotate
-        """
-        y = x.right
-        x.right = y.left
-        if y.left != self.NIL:
-            y.left.parent = x
-        y.parent = x.parent
-        if x.parent is None:
-            self.root = y
-        elif x == x.parent.left:
-            x.parent.left = y
-        else:
-            x.parent.right = y
-        y.left = x
-        x.parent = y
-
-    def _right_rotate(self, x):
-        """
-        Perform a right rotation on the given node.
-        Args:
-            x: The node to rotate
-        """
-        y = x.left
-        x.left = y.right
-        if y.right != self.NIL:
-            y.right.parent = x
-        y.parent = x.parent
-        if x.parent is None:
-            self.root = y
-        elif x == x.parent.right:
-            x.parent.right = y
-        else:
-            x.parent.left = y
-        y.right = x
-        x.parent = y
-
-    def search(self, key):
-        """
-        Search for a key in the tree.
-        Args: key: The key to search for
-        Returns the value associated with the key, or None if not found
-        """
-        return self._search_helper(self.root, key)
-
-    def _search_helper(self, node, key):
-        """
-        This is a recursive helper method for search.
-        Args:
-            node: The current node in the recursion
-            key: The key to search for
-        Returns the value associated with the key, or None if not found
-        """
-        if node == self.NIL or key == node.key:
-            return node.value if node != self.NIL else None
-        if key < node.key:
-            return self._search_helper(node.left, key)
-        return self._search_helper(node.right, key)
-
-    def delete(self, key):
-        """
-        This method deletes a node with the given key from the tree.
-        Args:
-            key: The key to delete
-        Returns True if the key was found and deleted, False otherwise
-        """
-        z = self._find_node(self.root, key)
-        if z == self.NIL:
-            return False
-
-        y = z
-        y_original_color = y.color
-        if z.left == self.NIL:
-            x = z.right
-            self._transplant(z, z.right)
-        elif z.right == self.NIL:
-            x = z.left
-            self._transplant(z, z.left)
-        else:
-            y = self._minimum(z.right)
-            y_original_color = y.color
-            x = y.right
-            if y.parent == z:
-                x.parent = y
-            else:
-                self._transplant(y, y.right)
-                y.right = z.right
-                y.right.parent = y
-            self._transplant(z, y)
-            y.left = z.left
-            y.left.parent = y
-            y.color = z.color
-        if y_original_color == "BLACK":
-            self._delete_fixup(x)
-        return True
-
-    def _find_node(self, node, key):
-        """
-        Find a node with the given key in the tree.
-        Args:
-            node: The current node in the recursion
-            key: The key to find
-        Returns the node with the given key, or self.NIL if not found
-        """
-        if node == self.NIL or key == node.key:
-            return node
-        if key < node.key:
-            return self._find_node(node.left, key)
-        return self._find_node(node.right, key)
-
-    def _minimum(self, node):
-        # Find the minimum node in the subtree rooted at node
-        while node.left != self.NIL:
-            node = node.left
-        return node
-
-    def _transplant(self, u, v):
-        # Replace subtree rooted at node u with subtree rooted at node 
-        if u.parent is None:
-            self.root = v
-        elif u == u.parent.left:
-            u.parent.left = v
-        else:
-            u.parent.right = v
-        v.parent = u.parent
-
-    def _delete_fixup(self, x):
-        """
-        Fix the Red-Black Tree properties after deletion.
-        Args:
-            x: The node to start fixing from
-        """
-        while x != self.root and x.color == "BLACK":
-            if x == x.parent.left:
-                w = x.parent.right
-                if w.color == "RED":
-                    w.color = "BLACK"
-                    x.parent.color = "RED"
-                    self._left_rotate(x.parent)
-                    w = x.parent.right
-                if w.left.color == "BLACK" and w.right.color == "BLACK":
-                    w.color = "RED"
-                    x = x.parent
-                else:
-                    if w.right.color == "BLACK":
-                        w.left.color = "BLACK"
-                        w.color = "RED"
-                        self._right_rotate(w)
-                        w = x.parent.right
-                    w.color = x.parent.color
-                    x.parent.color = "BLACK"
-                    w.right.color = "BLACK"
-                    self._left_rotate(x.parent)
-                    x = self.root
-            else:
-                w = x.parent.left
-                if w.color == "RED":
-                    w.color = "BLACK"
-                    x.parent.color = "RED"
-                    self._right_rotate(x.parent)
-                    w = x.parent.left
-                if w.right.color == "BLACK" and w.left.color == "BLACK":
-                    w.color = "RED"
-                    x = x.parent
-                else:
-                    if w.left.color == "BLACK":
-                        w.right.color = "BLACK"
-                        w.color = "RED"
-                        self._left_rotate(w)
-                        w = x.parent.left
-                    w.color = x.parent.color
-                    x.parent.color = "BLACK"
-                    w.left.color = "BLACK"
-                    self._right_rotate(x.parent)
-                    x = self.root
-        x.color = "BLACK"
-
-    def inorder_traversal(self):
-        """
-        Perform an inorder traversal of the tree.
-        Returns a sorted list of (key, value) pairs in the tree
-        """
-        result = []
-        self._inorder_helper(self.root, result)
-        result.sort(key=lambda x: x[1])
-        return result
-
-    def _inorder_helper(self, node, result):
-        """
-        Recursive helper method for inorder traversal.
-        Args:
-            node: The current node in the recursion
-            result: The list to store the traversal result
-        """
-        if node != self.NIL:
-            self._inorder_helper(node.left, result)
-            result.append((node.key, node.value))
-            self._inorder_helper(node.right, result)
-            
-class MinHeap:
-    #Implements minHeap data structure
-    def __init__(self):
-        #Initialise an empty min heap
-        self.heap = []
-
-    def insert(self, item):
-        """
-        Insert a new item into the heap.
-        Args:
-            item: The item to be inserted
-        """
-        self.heap.append(item)
-        self._sift_up(len(self.heap) - 1)
-
-    def extract_min(self):
-        #Remove and return the minimum element from the heap.
-        if not self.heap:
-            return None
-        if len(self.heap) == 1:
-            return self.heap.pop()
-        min_val = self.heap[0]
-        self.heap[0] = self.heap.pop()
-        self._sift_down(0)
-        return min_val
-
-    def _sift_up(self, i):
-        # Restore the heap property by moving an element up the heap.
-        #Args: i: The index of the element to sift up
-        parent = (i - 1) // 2
-        if i > 0 and self.heap[i] < self.heap[parent]:
-            self.heap[i], self.heap[parent] = self.heap[parent], self.heap[i]
-            self._sift_up(parent)
-
-    def _sift_down(self, i):
-        #Restore the heap property by moving an element down the heap.
-        #i: The index of the element to sift down
-        min_index = i
-        left = 2 * i + 1
-        right = 2 * i + 2
-        if left < len(self.heap) and self.heap[left] < self.heap[min_index]:
-            min_index = left
-        if right < len(self.heap) and self.heap[right] < self.heap[min_index]:
-            min_index = right
-        if i != min_index:
-            self.heap[i], self.heap[min_index] = self.heap[min_index], self.heap[i]
-            self._sift_down(min_index)
-
-    def __len__(self):
-        #Return the number of elements in the heap.
-        return len(self.heap)
-
-class MaxHeap:
-    # Implements a max heap data structure.
-    def __init__(self):
-        #Initialise an empty max heap
-        self.heap = []
-
-    def parent(self, i):
-        # Return the parent index of a given index.
-        return (i - 1) // 2
-
-    def left_child(self, i):
-        # Return the left child index of a given index.
-        return 2 * i + 1
-
-    def right_child(self, i):
-        # Return the right child index of a given index.
-        return 2 * i + 2
-
-    def swap(self, i, j):
-        #Swap two elements in the heap.
-        self.heap[i], self.heap[j] = self.heap[j], self.heap[i]
-
-    def insert(self, item):
-        # Insert a new item into the heap.
-        # Args: item: The item to be inserted
-        self.heap.append(item)
-        self._sift_up(len(self.heap) - 1)
-
-    def extract_max(self):
-        """
-        Remove and return the maximum element from the heap.
-        Returns the maximum element, or None if the heap is empty
-        """
-        if not self.heap:
-            return None
-        max_element = self.heap[0]
-        self.heap[0] = self.heap[-1]
-        self.heap.pop()
-        self._sift_down(0)  # Corrected method call
-        return max_element
-
-    def _sift_up(self, i):
-        # Restore the heap property by moving an element up the heap.
-        parent = self.parent(i)
-        if i > 0 and self._compare(self.heap[i], self.heap[parent]) > 0:
-            self.swap(i, parent)
-            self._sift_up(parent)
-
-    def _sift_down(self, i):
-        # Restore the heap property by moving an element down the heap.
-        max_index = i
-        left = self.left_child(i)
-        right = self.right_child(i)
-        if left < len(self.heap) and self._compare(self.heap[left], self.heap[max_index]) > 0:
-            max_index = left
-        if right < len(self.heap) and self._compare(self.heap[right], self.heap[max_index]) > 0:
-            max_index = right
-        if i != max_index:
-            self.swap(i, max_index)
-            self._sift_down(max_index)
-
-    def _compare(self, a, b):
-        """
-        Compare two elements in the heap.
-        Args:
-            a, b: The elements to compare
-        Returns a positive value if a > b, negative if a < b, and 0 if equal
-        """
-        if a[0] != b[0]:  # Compare priorities
-            return a[0] - b[0]
-        return b[1] - a[1]  # If priorities are equal, compare timestamps (earlier timestamp has higher priority)
-
-    def remove(self, value, key_index=0):
-        #Remove a specific value from the heap.
-            for i, item in enumerate(self.heap):
-                if item[key_index] == value:
-                    last_item = self.heap.pop()
-                    if i < len(self.heap):
-                        self.heap[i] = last_item
-                        self._sift_up(i)
-                        self._sift_down(i)
-                    return True
-            return False
-
-    def __len__(self):
-        # Return the number of elements in the heap.
-        return len(self.heap)
-
-
-class GatorTicketMaster:
-    
-    def __init__(self):
-        """Initialize the GatorTicketMaster system with empty data structures."""
-        self.available_seats = MinHeap()
-        self.waitlist = MaxHeap()
-        self.reservations = RedBlackTree()
-        self.last_seat_number = 0
-
-    def initialize(self, seat_count):
-        """
-        Initialize the system with a given number of seats.
-        Args:
-            seat_count (int): Number of seats to initialize
-        Returns: str: Confirmation message
-        """
-        if seat_count <= 0:
-            return "Invalid input. Please provide a valid number of seats."
-        for i in range(1, seat_count + 1):
-            self.available_seats.insert(i)
-        self.last_seat_number = seat_count
-        return f"{seat_count} Seats are made available for reservation"
-
-    def available(self):
-        """
-        Report the number of available seats and waitlist size.
-        Returns:  str: Status message
-        """
-        available_count = len(self.available_seats)
-        waitlist_count = len(self.waitlist)
-        return f"Total Seats Available : {available_count}, Waitlist : {waitlist_count}"
-    
-    def reserve(self, user_id, user_priority):
-        """
-        Reserve a seat for a user or add them to the waitlist.
-        Args:
-            user_id : User ID
-            user_priority : User priority
-        Returns: str: Confirmation message
-        """
-        if not self.available_seats.heap:
-            self.waitlist.insert((user_priority, time.time(), user_id))
-            return f"User {user_id} is added to the waiting list"
-        else:
-            seat_id = self.available_seats.extract_min()
-            self.reservations.insert(user_id, seat_id)
-            return f"User {user_id} reserved seat {seat_id}"
-    
-    def cancel(self, seat_id, user_id):
-        """
-        Cancel a users reservation and reassign the seat if possible.
-        Args:
-            seat_id : Seat ID to cancel
-            user_id : User ID cancelling the reservation
-        Returns: str: Confirmation message
-        """
-        if not self.reservations.search(user_id):
-            return f"User {user_id} has no reservation to cancel"
-    
-        reserved_seat = self.reservations.search(user_id)
-        if reserved_seat != seat_id:
-            return f"User {user_id} has no reservation for seat {seat_id}"
-    
-        self.reservations.delete(user_id)
-    
-        if self.waitlist.heap:
-            next_user = self.waitlist.extract_max()
-            self.reservations.insert(next_user[2], seat_id)
-            return f"User {user_id} canceled their reservation\nUser {next_user[2]} reserved seat {seat_id}"
-        else:
-            self.available_seats.insert(seat_id)
-            return f"User {user_id} canceled their reservation"
-
-    def exit_waitlist(self, user_id):
-        """
-        Remove a user from the waitlist.
-        Args:
-            user_id: User ID to remove from waitlist
-        Returns: str: Confirmation message
-        """
-        if self.waitlist.remove(user_id, key_index=2):
-            return f"User {user_id} is removed from the waiting list"
-        return f"User {user_id} is not in waitlist"
-
-    def update_priority(self, user_id, user_priority):
-        """
-        Update a user's priority in the waitlist.
-        Args:
-            user_id : User ID to update
-            user_priority : New priority
-        Returns: str: Confirmation message
-        """
-        for i, item in enumerate(self.waitlist.heap):
-            if item[2] == user_id:
-                # Create a new tuple with updated priority but same timestamp and user_id
-                updated_item = (user_priority, item[1], user_id)
-                # Replace the old item with the updated one
-                self.waitlist.heap[i] = updated_item
-                # Restore the heap property
-                self.waitlist._sift_up(i)
-                self.waitlist._sift_down(i)
-                return f"User {user_id} priority has been updated to {user_priority}"
-        return f"User {user_id} priority is not updated"
-
-    def add_seats(self, count):
-        """
-        Add new seats and assign them to waitlisted users if possible.
-        Args:
-            count : Number of seats to add
-        Returns: str: Confirmation message
-        """
-        if count <= 0:
-            return "Invalid input. Please provide a valid number of seats."
-        
-        new_seats = list(range(self.last_seat_number + 1, self.last_seat_number + count + 1))
-        self.last_seat_number += count
-        
-        result = [f"Additional {count} Seats are made available for reservation"]
-        
-        if self.waitlist.heap:
-            # Sort waitlist by priority (highest first), then by timestamp (earliest first)
-            waitlist_users = sorted(self.waitlist.heap, key=lambda x: (-x[0], x[1]))
-            
-            while new_seats and waitlist_users:
-                seat_id = min(new_seats)
-                new_seats.remove(seat_id)
-                user = waitlist_users.pop(0)
-                self.reservations.insert(user[2], seat_id)
-                result.append(f"User {user[2]} reserved seat {seat_id}")
-                self.waitlist.remove(user[2], key_index=2)  # Remove user from the original waitlist
-        
-        # If there are still seats left, make them available
-        for seat in new_seats:
-            self.available_seats.insert(seat)
-        
-        return "\n".join(result)
-
-    def print_reservations(self):
-        """
-        Get a list of all current reservations.
-        Returns: list: List of reservation strings
-        """
-        reservations = self.reservations.inorder_traversal()
-        return [f"[seat {seat}, user {user}]" for user, seat in reservations]
-
-    def release_seats(self, user_id1, user_id2):
-        """
-        Release seats for a range of user IDs and reassign them if possible.
-        Args:
-            user_id1 : Start of user ID range
-            user_id2 : End of user ID range
-        Returns:
-            str: Confirmation message
-        """
-        if user_id1 > user_id2:
-            return "Invalid input. Please provide a valid range of users."
-        
-        released_seats = []
-        released_users = []
-        result = [f"Reservations of the Users in the range [{user_id1}, {user_id2}] are released"]
-        
-        for user_id in range(user_id1, user_id2 + 1):
-            seat = self.reservations.search(user_id)
-            if seat:
-                self.reservations.delete(user_id)
-                released_seats.append(seat)
-                released_users.append(user_id)
-            else:
-                # Check if the user is in the waitlist
-                for i, item in enumerate(self.waitlist.heap):
-                    if item[2] == user_id:
-                        self.waitlist.heap.pop(i)
-                        break
-        
-        released_seats.sort()
-        
-        # If waitlist is not empty, assign seats to waitlisted users
-        if self.waitlist.heap:
-            # Sort waitlist by priority (highest first), then by timestamp (earliest first)
-            waitlist_users = sorted(self.waitlist.heap, key=lambda x: (-x[0], x[1]))
-            
-            while released_seats and waitlist_users:
-                lowest_seat = released_seats.pop(0)  # Get and remove the lowest seat
-                highest_priority_user = waitlist_users.pop(0)  # Get and remove the highest priority user
-                self.reservations.insert(highest_priority_user[2], lowest_seat)
-                result.append(f"User {highest_priority_user[2]} reserved seat {lowest_seat}")
-                self.waitlist.remove(highest_priority_user[2], key_index=2)  # Remove user from the original waitlist
-        
-        # If there are still seats left or waitlist was empty, make them available
-        for seat in released_seats:
-            self.available_seats.insert(seat)
-        
-        return "\n".join(result)
-
-def process_input(input_file, output_file):
-    """
-    Process commands from an input file and write results to an output file.
-    Args:
-        input_file (str): Path to the input file containing commands
-        output_file (str): Path to the output file for writing results
-    """
-    gator_tm = GatorTicketMaster()  # Create an instance of GatorTicketMaster
-    with open(input_file, 'r') as f, open(output_file, 'w') as out:
-        for line in f:
-            # Parse the command and its arguments
-            command = line.strip().split('(')
-            func_name = command[0]
-            args = command[1].rstrip(')').split(',') if len(command) > 1 else []
-            # Execute the appropriate method based on the command
-            if func_name == 'Initialize':
-                result = gator_tm.initialize(int(args[0]))
-            elif func_name == 'Available':
-                result = gator_tm.available()
-            elif func_name == 'Reserve':
-                result = gator_tm.reserve(int(args[0]), int(args[1]))
-            elif func_name == 'Cancel':
-                result = gator_tm.cancel(int(args[0]), int(args[1]))
-            elif func_name == 'PrintReservations':
-                result = gator_tm.print_reservations()
-            elif func_name == 'AddSeats':
-                result = gator_tm.add_seats(int(args[0]))
-            elif func_name == 'UpdatePriority':
-                result = gator_tm.update_priority(int(args[0]), int(args[1]))
-            elif func_name == 'ExitWaitlist':
-                result = gator_tm.exit_waitlist(int(args[0]))
-            elif func_name == 'ReleaseSeats':
-                result = gator_tm.release_seats(int(args[0]), int(args[1]))
-            elif func_name == 'Quit':
-                out.write("Program Terminated!!\n")
-                break
-            else:
-                result = "Unknown command"
-            # Write the result to the output file
-            if isinstance(result, list):
-                out.write('\n'.join(result) + '\n')
-            else:
-                out.write(str(result) + '\n')
-
-if __name__ == "__main__":
-    # Check if the correct number of command-line arguments is provided
-    if len(sys.argv) != 2:
-        print("Usage: python gatorTicketMaster.py <input_file>")
-        sys.exit(1)
-    # Get the input file name from command-line arguments
-    input_file = sys.argv[1]
-    # Generate the output file name based on the input file name
-    output_file = input_file.split('.')[0] + "_output_file.txt"
-     # Process the input file and generate the output
-    process_input(input_file, output_file)
-
-
+import argparse
+import gzip
+import heapq
+import itertools
+import lzma
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_right
+
+class Node:
+    #Represents a node in RedBlack tree
+    def __init__(self, key, value, color="RED"):
+        #Initialize new node
+        self.key = key
+        self.value = value
+        self.color = color
+        self.left = None
+        self.right = None
+        self.parent = None
+
+class RedBlackTree:
+    #This class implements Red Black tree data structure
+    def __init__(self):
+        #Initialize an empty red black tree
+        self.NIL = Node(None, None, "BLACK")
+        self.root = self.NIL
+        self.size = 0
+
+    def insert(self, key, value):
+        """
+        Insert a new key-value pair into the tree. A key may be inserted more
+        than once; the new pair goes after the pairs already stored under it in key order.
+        Args:
+            key: The key to insert
+            value: The value associated with the key
+        """
+        new_node = Node(key, value)
+        new_node.left = self.NIL
+        new_node.right = self.NIL
+        # Find the proper position for the new node
+
+        y = None
+        x = self.root
+
+        while x != self.NIL:
+            y = x
+            if new_node.key < x.key:
+                x = x.left
+            else:
+                x = x.right
+        
+        # Insert the new node
+        new_node.parent = y
+        if y is None:
+            self.root = new_node
+        elif new_node.key < y.key:
+            y.left = new_node
+        else:
+            y.right = new_node
+        self.size += 1
+        # Fix the tree to maintain Red-Black properties
+        self._insert_fixup(new_node)
+
+    def _insert_fixup(self, k):
+        """
+        Fix the Red-Black Tree properties after insertion.
+        Args:
+            k: The newly inserted node
+        """
+        while k.parent and k.parent.color == "RED":
+            if k.parent == k.parent.parent.left:
+                y = k.parent.parent.right
+                if y.color == "RED":
+                    k.parent.color = "BLACK"
+                    y.color = "BLACK"
+                    k.parent.parent.color = "RED"
+                    k = k.parent.parent
+                else:
+                    if k == k.parent.right:
+                        k = k.parent
+                        self._left_rotate(k)
+                    k.parent.color = "BLACK"
+                    k.parent.parent.color = "RED"
+                    self._right_rotate(k.parent.parent)
+            else:
+                # Mirror image of the above case
+                y = k.parent.parent.left
+                if y.color == "RED":
+                    k.parent.color = "BLACK"
+                    y.color = "BLACK"
+                    k.parent.parent.color = "RED"
+                    k = k.parent.parent
+                else:
+                    if k == k.parent.left:
+                        k = k.parent
+                        self._right_rotate(k)
+                    k.parent.color = "BLACK"
+                    k.parent.parent.color = "RED"
+                    self._left_rotate(k.parent.parent)
+            if k == self.root:
+                break
+        self.root.color = "BLACK"
+
+    def _left_rotate(self, x):
+        """
+        Perform a left rotation on the given node.
+        Args:
+            x: The node to rotate
+        """
+        y = x.right
+        x.right = y.left
+        if y.left != self.NIL:
+            y.left.parent = x
+        y.parent = x.parent
+        if x.parent is None:
+            self.root = y
+        elif x == x.parent.left:
+            x.parent.left = y
+        else:
+            x.parent.right = y
+        y.left = x
+        x.parent = y
+
+    def _right_rotate(self, x):
+        """
+        Perform a right rotation on the given node.
+        Args:
+            x: The node to rotate
+        """
+        y = x.left
+        x.left = y.right
+        if y.right != self.NIL:
+            y.right.parent = x
+        y.parent = x.parent
+        if x.parent is None:
+            self.root = y
+        elif x == x.parent.right:
+            x.parent.right = y
+        else:
+            x.parent.left = y
+        y.right = x
+        x.parent = y
+
+    def search(self, key):
+        """
+        Search for a key in the tree. Of several pairs under the key, the one
+        met first on the way down from the root is found, here and in delete.
+        Args: key: The key to search for
+        Returns the value associated with the key, or None if not found
+        """
+        node = self._find_node(self.root, key)
+        return node.value if node != self.NIL else None
+
+    def delete(self, key):
+        """
+        This method deletes a node with the given key from the tree.
+        Args:
+            key: The key to delete
+        Returns True if the key was found and deleted, False otherwise
+        """
+        z = self._find_node(self.root, key)
+        if z == self.NIL:
+            return False
+        self._delete_node(z)
+        return True
+
+    def delete_item(self, key, value):
+        """
+        Delete the pair (key, value), whichever of the key's pairs it is.
+        Args:
+            key: The key of the pair
+            value: The value of the pair
+        Returns True if the pair was found and deleted, False otherwise
+        """
+        z = next((node for node in self._nodes_between(key, key) if node.value == value), None)
+        if z is None:
+            return False
+        self._delete_node(z)
+        return True
+
+    def _delete_node(self, z):
+        """
+        Unlink a node that is known to be in the tree and rebalance.
+        Nodes are moved rather than copied, so references to other nodes stay valid.
+        Args:
+            z: The node to delete
+        """
+        self.size -= 1
+        y = z
+        y_original_color = y.color
+        if z.left == self.NIL:
+            x = z.right
+            self._transplant(z, z.right)
+        elif z.right == self.NIL:
+            x = z.left
+            self._transplant(z, z.left)
+        else:
+            y = self._minimum(z.right)
+            y_original_color = y.color
+            x = y.right
+            if y.parent == z:
+                x.parent = y
+            else:
+                self._transplant(y, y.right)
+                y.right = z.right
+                y.right.parent = y
+            self._transplant(z, y)
+            y.left = z.left
+            y.left.parent = y
+            y.color = z.color
+        if y_original_color == "BLACK":
+            self._delete_fixup(x)
+
+    def _find_node(self, node, key):
+        """
+        Find a node with the given key in the tree, walking down iteratively.
+        Args:
+            node: The root of the subtree to search
+            key: The key to find
+        Returns the node with the given key, or self.NIL if not found
+        """
+        while node != self.NIL and key != node.key:
+            node = node.left if key < node.key else node.right
+        return node
+
+    def _minimum(self, node):
+        # Find the minimum node in the subtree rooted at node
+        while node.left != self.NIL:
+            node = node.left
+        return node
+
+    def _transplant(self, u, v):
+        # Replace subtree rooted at node u with subtree rooted at node 
+        if u.parent is None:
+            self.root = v
+        elif u == u.parent.left:
+            u.parent.left = v
+        else:
+            u.parent.right = v
+        v.parent = u.parent
+
+    def _delete_fixup(self, x):
+        """
+        Fix the Red-Black Tree properties after deletion.
+        Args:
+            x: The node to start fixing from
+        """
+        while x != self.root and x.color == "BLACK":
+            if x == x.parent.left:
+                w = x.parent.right
+                if w.color == "RED":
+                    w.color = "BLACK"
+                    x.parent.color = "RED"
+                    self._left_rotate(x.parent)
+                    w = x.parent.right
+                if w.left.color == "BLACK" and w.right.color == "BLACK":
+                    w.color = "RED"
+                    x = x.parent
+                else:
+                    if w.right.color == "BLACK":
+                        w.left.color = "BLACK"
+                        w.color = "RED"
+                        self._right_rotate(w)
+                        w = x.parent.right
+                    w.color = x.parent.color
+                    x.parent.color = "BLACK"
+                    w.right.color = "BLACK"
+                    self._left_rotate(x.parent)
+                    x = self.root
+            else:
+                w = x.parent.left
+                if w.color == "RED":
+                    w.color = "BLACK"
+                    x.parent.color = "RED"
+                    self._right_rotate(x.parent)
+                    w = x.parent.left
+                if w.right.color == "BLACK" and w.left.color == "BLACK":
+                    w.color = "RED"
+                    x = x.parent
+                else:
+                    if w.left.color == "BLACK":
+                        w.right.color = "BLACK"
+                        w.color = "RED"
+                        self._left_rotate(w)
+                        w = x.parent.left
+                    w.color = x.parent.color
+                    x.parent.color = "BLACK"
+                    w.left.color = "BLACK"
+                    self._right_rotate(x.parent)
+                    x = self.root
+        x.color = "BLACK"
+
+    def items_between(self, lo, hi):
+        """
+        Iterate over the (key, value) pairs with lo <= key <= hi in key order.
+        Costs O(log n + k) for k matching keys. The tree must not be modified while iterating.
+        Args:
+            lo: Lower bound of the key range (inclusive)
+            hi: Upper bound of the key range (inclusive)
+        """
+        for node in self._nodes_between(lo, hi):
+            yield node.key, node.value
+
+    def _nodes_between(self, lo, hi):
+        """
+        Iterative inorder walk over the nodes whose keys lie in [lo, hi].
+        Args:
+            lo: Lower bound of the key range, or None for no lower bound
+            hi: Upper bound of the key range, or None for no upper bound
+        """
+        stack = []
+        node = self.root
+        # Descend to the smallest key >= lo, remembering the nodes still to visit
+        while node != self.NIL:
+            if lo is not None and node.key < lo:
+                node = node.right
+            else:
+                stack.append(node)
+                node = node.left
+        while stack:
+            node = stack.pop()
+            if hi is not None and node.key > hi:
+                return
+            yield node
+            node = node.right
+            while node != self.NIL:
+                stack.append(node)
+                node = node.left
+
+    def delete_range(self, lo, hi):
+        """
+        Delete one pair of every key in [lo, hi], in key order: the pair delete
+        would remove. The matching nodes are collected with one range walk and a
+        key stored once is unlinked directly, so no per-key search from the root
+        is needed; only a key stored more than once is looked up again.
+        Args:
+            lo: Lower bound of the key range (inclusive)
+            hi: Upper bound of the key range (inclusive)
+        Returns a list of the deleted (key, value) pairs in key order
+        """
+        nodes = list(self._nodes_between(lo, hi))
+        deleted = []
+        for i, node in enumerate(nodes):
+            if i and nodes[i - 1].key == node.key:
+                continue
+            if i + 1 < len(nodes) and nodes[i + 1].key == node.key:
+                node = self._find_node(self.root, node.key)
+            deleted.append((node.key, node.value))
+            self._delete_node(node)
+        return deleted
+
+    def insert_many(self, pairs):
+        """
+        Insert a batch of (key, value) pairs, one after the other. The batch is
+        not merged into a rebuilt tree: the tree keeps the shape single inserts
+        give it, which decides the pair search finds among repeated keys.
+        Args:
+            pairs: (key, value) pairs
+        """
+        for key, value in pairs:
+            self.insert(key, value)
+
+    def build_from_sorted(self, keys, values, layout=None):
+        """
+        Replace the tree contents with a tree built from sorted keys in O(n),
+        instead of n separate inserts.
+        Without a layout the tree is balanced: every level is full except possibly
+        the deepest, whose nodes are colored red, so all root-to-leaf paths have
+        the same black height. With a layout saved by layout() the same tree is rebuilt.
+        Args:
+            keys: Sequence of keys in ascending order
+            values: Sequence of the matching values
+            layout: Optional depth and color of every node, as returned by layout()
+        """
+        if layout is not None:
+            nodes = [Node(key, value, "RED" if shape & 1 else "BLACK") for key, value, shape in zip(keys, values, layout)]
+            self.root = self._link(nodes, layout)
+            self.size = len(nodes)
+            return
+        red_depth = (len(keys) + 1).bit_length() - 1
+        self.root = self._build_subtree(keys, values, 0, len(keys) - 1, 0, red_depth, None)
+        self.size = len(keys)
+
+    def _build_subtree(self, keys, values, lo, hi, depth, red_depth, parent):
+        # Build the subtree holding keys[lo..hi] and return its root
+        if lo > hi:
+            return self.NIL
+        mid = (lo + hi) // 2
+        node = Node(keys[mid], values[mid], "RED" if depth == red_depth else "BLACK")
+        node.parent = parent
+        node.left = self._build_subtree(keys, values, lo, mid - 1, depth + 1, red_depth, node)
+        node.right = self._build_subtree(keys, values, mid + 1, hi, depth + 1, red_depth, node)
+        return node
+
+    def _link(self, nodes, layout):
+        # Link nodes given in key order into the tree their depths describe and return its root.
+        # A node's left subtree is the run of deeper nodes just before it, so one stack pass does it.
+        stack = []
+        for node, shape in zip(nodes, layout):
+            depth = shape >> 1
+            child = self.NIL
+            while stack and stack[-1][1] > depth:
+                child = stack.pop()[0]
+            node.left, node.right = child, self.NIL
+            if child != self.NIL:
+                child.parent = node
+            node.parent = stack[-1][0] if stack else None
+            if stack:
+                stack[-1][0].right = node
+            stack.append((node, depth))
+        return stack[0][0] if stack else self.NIL
+
+    def layout(self):
+        """
+        Describe the shape of the tree for build_from_sorted: the depth and color
+        of every node in key order, packed as depth * 2 + 1 for red.
+        Returns: array: One byte per node
+        """
+        result = array('b')
+        stack = []
+        node, depth = self.root, 0
+        while stack or node != self.NIL:
+            while node != self.NIL:
+                stack.append((node, depth))
+                node, depth = node.left, depth + 1
+            node, depth = stack.pop()
+            result.append(depth << 1 | (node.color == "RED"))
+            node, depth = node.right, depth + 1
+        return result
+
+    def height(self):
+        # Return the number of nodes on the longest root-to-leaf path, walking iteratively.
+        best = 0
+        stack = [(self.root, 1)] if self.root != self.NIL else []
+        while stack:
+            node, depth = stack.pop()
+            best = max(best, depth)
+            for child in (node.left, node.right):
+                if child != self.NIL:
+                    stack.append((child, depth + 1))
+        return best
+
+    def memory_usage(self):
+        # Approximate bytes held by the nodes: each one is an object plus its attribute dict.
+        return self.size * (sys.getsizeof(self.NIL) + sys.getsizeof(self.NIL.__dict__))
+
+    def __len__(self):
+        # Return the number of keys in the tree.
+        return self.size
+
+    def items(self):
+        """
+        Iterate over all (key, value) pairs in key order without recursion.
+        Memory use is bounded by the tree height.
+        """
+        return self.items_between(None, None)
+
+    def inorder_traversal(self):
+        """
+        Perform an inorder traversal of the tree.
+        Returns a list of (key, value) pairs sorted by value
+        """
+        result = list(self.items())
+        result.sort(key=lambda x: x[1])
+        return result
+
+class OSNode(Node):
+    #Red black tree node that also records the size of its subtree
+    def __init__(self, key, value, color="RED"):
+        super().__init__(key, value, color)
+        self.count = 1
+
+
+class OrderStatisticTree(RedBlackTree):
+    """
+    Red black tree augmented with subtree sizes, so the rank of a key and the
+    k-th key are found in O(log n). The counts are kept current through
+    inserts, deletes and rotations.
+    """
+    def __init__(self):
+        super().__init__()
+        self.NIL = OSNode(None, None, "BLACK")
+        self.NIL.count = 0
+        self.root = self.NIL
+
+    def insert(self, key, value):
+        """
+        Insert a new key-value pair, counting it in every subtree on the way down.
+        Args:
+            key: The key to insert
+            value: The value associated with the key
+        """
+        new_node = OSNode(key, value)
+        new_node.left = self.NIL
+        new_node.right = self.NIL
+        y = None
+        x = self.root
+        while x != self.NIL:
+            y = x
+            x.count += 1
+            x = x.left if key < x.key else x.right
+        new_node.parent = y
+        if y is None:
+            self.root = new_node
+        elif key < y.key:
+            y.left = new_node
+        else:
+            y.right = new_node
+        self.size += 1
+        self._insert_fixup(new_node)
+
+    def _left_rotate(self, x):
+        # Rotate, then recompute the sizes of the two nodes that moved
+        super()._left_rotate(x)
+        x.parent.count = x.count
+        x.count = x.left.count + x.right.count + 1
+
+    def _right_rotate(self, x):
+        # Rotate, then recompute the sizes of the two nodes that moved
+        super()._right_rotate(x)
+        x.parent.count = x.count
+        x.count = x.left.count + x.right.count + 1
+
+    def _delete_node(self, z):
+        """
+        Unlink a node, first uncounting the node that physically leaves the tree:
+        z itself, or its successor when z has two children.
+        Args:
+            z: The node to delete
+        """
+        y = z if z.left == self.NIL or z.right == self.NIL else self._minimum(z.right)
+        node = y.parent
+        while node is not None:
+            node.count -= 1
+            node = node.parent
+        if y is not z:
+            y.count = z.count  # The successor takes z's place and its subtree
+        super()._delete_node(z)
+
+    def _build_subtree(self, keys, values, lo, hi, depth, red_depth, parent):
+        # Build the subtree holding keys[lo..hi] and return its root
+        if lo > hi:
+            return self.NIL
+        mid = (lo + hi) // 2
+        node = OSNode(keys[mid], values[mid], "RED" if depth == red_depth else "BLACK")
+        node.count = hi - lo + 1
+        node.parent = parent
+        node.left = self._build_subtree(keys, values, lo, mid - 1, depth + 1, red_depth, node)
+        node.right = self._build_subtree(keys, values, mid + 1, hi, depth + 1, red_depth, node)
+        return node
+
+    def rank(self, key):
+        # Return the number of keys smaller than key in O(log n).
+        smaller = 0
+        node = self.root
+        while node != self.NIL:
+            if key < node.key:
+                node = node.left
+            elif node.key < key:
+                smaller += node.left.count + 1
+                node = node.right
+            else:
+                return smaller + node.left.count
+        return smaller
+
+    def select(self, i):
+        # Return the (key, value) pair with i smaller keys in O(log n), or None.
+        if not 0 <= i < self.size:
+            return None
+        node = self.root
+        while True:
+            left = node.left.count
+            if i < left:
+                node = node.left
+            elif i == left:
+                return node.key, node.value
+            else:
+                i -= left + 1
+                node = node.right
+
+
+class ArrayRedBlackTree:
+    """
+    Red Black tree with the same interface as RedBlackTree, stored column-wise.
+    Key, value, color and the left/right/parent links live in parallel arrays
+    indexed by node id instead of one Python object per node. Node 0 is the
+    black NIL sentinel, colors are small integers, and deleted slots are
+    chained through the left column for reuse. Keys and values must be integers.
+    """
+    RED = 0
+    BLACK = 1
+
+    def __init__(self):
+        #Initialize an empty tree holding only the NIL sentinel
+        self._reset(1)
+
+    def _reset(self, capacity):
+        # Allocate fresh columns with room for the sentinel plus capacity - 1 nodes
+        self.key = array('q', bytes(8 * capacity))
+        self.value = array('q', bytes(8 * capacity))
+        self.color = array('b', [self.BLACK]) * capacity
+        self.left = array('q', bytes(8 * capacity))
+        self.right = array('q', bytes(8 * capacity))
+        self.parent = array('q', bytes(8 * capacity))
+        self.root = 0
+        self.size = 0
+        self._free = 0  # Head of the free-slot list, 0 when empty
+
+    def _new_node(self, key, value):
+        # Take a slot from the free list, or append one, for a new red node
+        z = self._free
+        if z:
+            self._free = self.left[z]
+            self.key[z] = key
+            self.value[z] = value
+            self.color[z] = self.RED
+            self.left[z] = self.right[z] = self.parent[z] = 0
+        else:
+            z = len(self.key)
+            self.key.append(key)
+            self.value.append(value)
+            self.color.append(self.RED)
+            self.left.append(0)
+            self.right.append(0)
+            self.parent.append(0)
+        return z
+
+    def insert(self, key, value):
+        """
+        Insert a new key-value pair into the tree.
+        Args:
+            key: The key to insert
+            value: The value associated with the key
+        """
+        z = self._new_node(key, value)
+        keys, left, right = self.key, self.left, self.right
+        y = 0
+        x = self.root
+        while x:
+            y = x
+            x = left[x] if key < keys[x] else right[x]
+        self.parent[z] = y
+        if not y:
+            self.root = z
+        elif key < keys[y]:
+            left[y] = z
+        else:
+            right[y] = z
+        self.size += 1
+        self._insert_fixup(z)
+
+    def _insert_fixup(self, k):
+        # Fix the Red-Black Tree properties after insertion.
+        parent, left, right, color = self.parent, self.left, self.right, self.color
+        RED, BLACK = self.RED, self.BLACK
+        while color[parent[k]] == RED:
+            p = parent[k]
+            g = parent[p]
+            if p == left[g]:
+                y = right[g]
+                if color[y] == RED:
+                    color[p] = color[y] = BLACK
+                    color[g] = RED
+                    k = g
+                else:
+                    if k == right[p]:
+                        k = p
+                        self._left_rotate(k)
+                        p = parent[k]
+                        g = parent[p]
+                    color[p] = BLACK
+                    color[g] = RED
+                    self._right_rotate(g)
+            else:
+                # Mirror image of the above case
+                y = left[g]
+                if color[y] == RED:
+                    color[p] = color[y] = BLACK
+                    color[g] = RED
+                    k = g
+                else:
+                    if k == left[p]:
+                        k = p
+                        self._right_rotate(k)
+                        p = parent[k]
+                        g = parent[p]
+                    color[p] = BLACK
+                    color[g] = RED
+                    self._left_rotate(g)
+        color[self.root] = BLACK
+
+    def _left_rotate(self, x):
+        # Perform a left rotation on node x.
+        parent, left, right = self.parent, self.left, self.right
+        y = right[x]
+        right[x] = left[y]
+        if left[y]:
+            parent[left[y]] = x
+        px = parent[x]
+        parent[y] = px
+        if not px:
+            self.root = y
+        elif x == left[px]:
+            left[px] = y
+        else:
+            right[px] = y
+        left[y] = x
+        parent[x] = y
+
+    def _right_rotate(self, x):
+        # Perform a right rotation on node x.
+        parent, left, right = self.parent, self.left, self.right
+        y = left[x]
+        left[x] = right[y]
+        if right[y]:
+            parent[right[y]] = x
+        px = parent[x]
+        parent[y] = px
+        if not px:
+            self.root = y
+        elif x == right[px]:
+            right[px] = y
+        else:
+            left[px] = y
+        right[y] = x
+        parent[x] = y
+
+    def search(self, key):
+        """
+        Search for a key in the tree. Of several pairs under the key, the one
+        met first on the way down from the root is found, as in RedBlackTree.
+        Args: key: The key to search for
+        Returns the value associated with the key, or None if not found
+        """
+        x = self._find_node(key)
+        return self.value[x] if x else None
+
+    def _find_node(self, key):
+        # Return the id of the node holding key, or 0 if there is none
+        keys, left, right = self.key, self.left, self.right
+        x = self.root
+        while x and keys[x] != key:
+            x = left[x] if key < keys[x] else right[x]
+        return x
+
+    def delete(self, key):
+        """
+        This method deletes a node with the given key from the tree.
+        Args:
+            key: The key to delete
+        Returns True if the key was found and deleted, False otherwise
+        """
+        z = self._find_node(key)
+        if not z:
+            return False
+        self._delete_node(z)
+        return True
+
+    def delete_item(self, key, value):
+        """
+        Delete the pair (key, value), whichever of the key's pairs it is.
+        Returns True if the pair was found and deleted, False otherwise
+        """
+        values = self.value
+        z = next((x for x in self._nodes_between(key, key) if values[x] == value), 0)
+        if not z:
+            return False
+        self._delete_node(z)
+        return True
+
+    def _delete_node(self, z):
+        """
+        Unlink node z, rebalance, and put its slot on the free list.
+        Args:
+            z: The id of the node to delete
+        """
+        parent, left, right, color = self.parent, self.left, self.right, self.color
+        self.size -= 1
+        y = z
+        y_original_color = color[y]
+        if not left[z]:
+            x = right[z]
+            self._transplant(z, x)
+        elif not right[z]:
+            x = left[z]
+            self._transplant(z, x)
+        else:
+            y = right[z]
+            while left[y]:
+                y = left[y]
+            y_original_color = color[y]
+            x = right[y]
+            if parent[y] == z:
+                parent[x] = y
+            else:
+                self._transplant(y, x)
+                right[y] = right[z]
+                parent[right[y]] = y
+            self._transplant(z, y)
+            left[y] = left[z]
+            parent[left[y]] = y
+            color[y] = color[z]
+        if y_original_color == self.BLACK:
+            self._delete_fixup(x)
+        left[z] = self._free
+        self._free = z
+
+    def _transplant(self, u, v):
+        # Replace subtree rooted at node u with subtree rooted at node v
+        parent, left = self.parent, self.left
+        pu = parent[u]
+        if not pu:
+            self.root = v
+        elif u == left[pu]:
+            left[pu] = v
+        else:
+            self.right[pu] = v
+        parent[v] = pu
+
+    def _delete_fixup(self, x):
+        # Fix the Red-Black Tree properties after deletion.
+        parent, left, right, color = self.parent, self.left, self.right, self.color
+        RED, BLACK = self.RED, self.BLACK
+        while x != self.root and color[x] == BLACK:
+            p = parent[x]
+            if x == left[p]:
+                w = right[p]
+                if color[w] == RED:
+                    color[w] = BLACK
+                    color[p] = RED
+                    self._left_rotate(p)
+                    w = right[p]
+                if color[left[w]] == BLACK and color[right[w]] == BLACK:
+                    color[w] = RED
+                    x = p
+                else:
+                    if color[right[w]] == BLACK:
+                        color[left[w]] = BLACK
+                        color[w] = RED
+                        self._right_rotate(w)
+                        w = right[p]
+                    color[w] = color[p]
+                    color[p] = BLACK
+                    color[right[w]] = BLACK
+                    self._left_rotate(p)
+                    x = self.root
+            else:
+                w = left[p]
+                if color[w] == RED:
+                    color[w] = BLACK
+                    color[p] = RED
+                    self._right_rotate(p)
+                    w = left[p]
+                if color[right[w]] == BLACK and color[left[w]] == BLACK:
+                    color[w] = RED
+                    x = p
+                else:
+                    if color[left[w]] == BLACK:
+                        color[right[w]] = BLACK
+                        color[w] = RED
+                        self._left_rotate(w)
+                        w = left[p]
+                    color[w] = color[p]
+                    color[p] = BLACK
+                    color[left[w]] = BLACK
+                    self._right_rotate(p)
+                    x = self.root
+        color[x] = BLACK
+
+    def items_between(self, lo, hi):
+        """
+        Iterate over the (key, value) pairs with lo <= key <= hi in key order.
+        Costs O(log n + k) for k matching keys. The tree must not be modified while iterating.
+        Args:
+            lo: Lower bound of the key range (inclusive)
+            hi: Upper bound of the key range (inclusive)
+        """
+        keys, values = self.key, self.value
+        for x in self._nodes_between(lo, hi):
+            yield keys[x], values[x]
+
+    def _nodes_between(self, lo, hi):
+        """
+        Iterative inorder walk over the ids of the nodes whose keys lie in [lo, hi].
+        Args:
+            lo: Lower bound of the key range, or None for no lower bound
+            hi: Upper bound of the key range, or None for no upper bound
+        """
+        keys, left, right = self.key, self.left, self.right
+        stack = []
+        x = self.root
+        while x:
+            if lo is not None and keys[x] < lo:
+                x = right[x]
+            else:
+                stack.append(x)
+                x = left[x]
+        while stack:
+            x = stack.pop()
+            if hi is not None and keys[x] > hi:
+                return
+            yield x
+            x = right[x]
+            while x:
+                stack.append(x)
+                x = left[x]
+
+    def delete_range(self, lo, hi):
+        """
+        Delete one pair of every key in [lo, hi], as RedBlackTree.delete_range does.
+        Args:
+            lo: Lower bound of the key range (inclusive)
+            hi: Upper bound of the key range (inclusive)
+        Returns a list of the deleted (key, value) pairs in key order
+        """
+        nodes = list(self._nodes_between(lo, hi))
+        keys, values = self.key, self.value
+        deleted = []
+        for i, x in enumerate(nodes):
+            key = keys[x]
+            if i and keys[nodes[i - 1]] == key:
+                continue
+            if i + 1 < len(nodes) and keys[nodes[i + 1]] == key:
+                x = self._find_node(key)
+            deleted.append((key, values[x]))
+            self._delete_node(x)
+        return deleted
+
+    def insert_many(self, pairs):
+        """
+        Insert a batch of (key, value) pairs one after the other, as RedBlackTree.insert_many does.
+        Args:
+            pairs: (key, value) pairs
+        """
+        for key, value in pairs:
+            self.insert(key, value)
+
+    def build_from_sorted(self, keys, values, layout=None):
+        """
+        Replace the tree contents with a tree built from sorted keys in O(n), balanced
+        or, given a layout saved by layout(), the same tree again.
+        Node ids follow key order, so the key and value columns are copied in one step.
+        Args:
+            keys: Sequence of integer keys in ascending order
+            values: Sequence of the matching integer values
+            layout: Optional depth and color of every node, as returned by layout()
+        """
+        n = len(keys)
+        self._reset(n + 1)
+        self.key[1:] = array('q', keys)
+        self.value[1:] = array('q', values)
+        self.size = n
+        if layout is not None:
+            self.root = self._link(layout)
+            return
+        red_depth = (n + 1).bit_length() - 1
+        self.root = self._build_subtree(1, n, 0, red_depth, 0)
+
+    def _build_subtree(self, lo, hi, depth, red_depth, parent):
+        # Link node ids lo..hi into a balanced subtree and return its root id
+        if lo > hi:
+            return 0
+        mid = (lo + hi) // 2
+        self.color[mid] = self.RED if depth == red_depth else self.BLACK
+        self.parent[mid] = parent
+        self.left[mid] = self._build_subtree(lo, mid - 1, depth + 1, red_depth, mid)
+        self.right[mid] = self._build_subtree(mid + 1, hi, depth + 1, red_depth, mid)
+        return mid
+
+    def _link(self, layout):
+        # Link node ids 1..n into the tree layout describes and return its root id, as RedBlackTree._link does
+        parent, left, right, color = self.parent, self.left, self.right, self.color
+        stack = []
+        for x, shape in enumerate(layout, 1):
+            depth = shape >> 1
+            color[x] = self.RED if shape & 1 else self.BLACK
+            child = 0
+            while stack and stack[-1][1] > depth:
+                child = stack.pop()[0]
+            left[x] = child
+            if child:
+                parent[child] = x
+            parent[x] = stack[-1][0] if stack else 0
+            if stack:
+                right[stack[-1][0]] = x
+            stack.append((x, depth))
+        return stack[0][0] if stack else 0
+
+    def layout(self):
+        """
+        Describe the shape of the tree for build_from_sorted, as RedBlackTree.layout does.
+        Returns: array: One byte per node
+        """
+        left, right, color = self.left, self.right, self.color
+        result = array('b')
+        stack = []
+        x, depth = self.root, 0
+        while stack or x:
+            while x:
+                stack.append((x, depth))
+                x, depth = left[x], depth + 1
+            x, depth = stack.pop()
+            result.append(depth << 1 | (color[x] == self.RED))
+            x, depth = right[x], depth + 1
+        return result
+
+    def height(self):
+        # Return the number of nodes on the longest root-to-leaf path, walking iteratively.
+        best = 0
+        stack = [(self.root, 1)] if self.root else []
+        while stack:
+            x, depth = stack.pop()
+            best = max(best, depth)
+            for child in (self.left[x], self.right[x]):
+                if child:
+                    stack.append((child, depth + 1))
+        return best
+
+    def memory_usage(self):
+        # Bytes held by the column arrays, including free slots.
+        columns = (self.key, self.value, self.color, self.left, self.right, self.parent)
+        return sum(column.itemsize * len(column) for column in columns)
+
+    def __len__(self):
+        # Return the number of keys in the tree.
+        return self.size
+
+    def items(self):
+        # Iterate over all (key, value) pairs in key order without recursion.
+        return self.items_between(None, None)
+
+    def inorder_traversal(self):
+        """
+        Perform an inorder traversal of the tree.
+        Returns a list of (key, value) pairs sorted by value
+        """
+        result = list(self.items())
+        result.sort(key=lambda x: x[1])
+        return result
+
+class DenseReservationStore:
+    """
+    Reservation store with the same interface as RedBlackTree for mostly dense
+    integer user ids. While the ids are dense it is a direct-address table: an
+    array indexed by user id holding the seat, with NO_SEAT for users without
+    one, so search, insert and delete are O(1) and cost 8 bytes per id.
+    A user who books more than once keeps the later seats, oldest first, in the
+    extra dict. With no tree shape to follow, search and delete act on a user's
+    earliest seat, in both modes.
+    When fewer than 1 in SPARSE ids in the table are in use (or a negative id
+    arrives), the contents migrate into a SPARSE_STORE tree; they migrate back
+    once more than 1 in DENSE ids up to the highest one seen are in use again.
+    The gap between the two thresholds keeps churn near either one from
+    migrating back and forth. Keys and values must be integers.
+    """
+    NO_SEAT = -1
+    SPARSE = 16  # Migrate to the tree below 1 / SPARSE density
+    DENSE = 4  # Migrate back above 1 / DENSE density
+    MIN_SPAN = 1024  # Tables this small stay dense whatever their density
+    SPARSE_STORE = RedBlackTree
+
+    def __init__(self):
+        #Initialize an empty store in table mode
+        self.seat = array('q')  # User id -> earliest seat, NO_SEAT when the user has none
+        self.extra = {}  # User id -> later seats, oldest first, for users holding more than one
+        self.size = 0
+        self.tree = None  # The tree holding the contents while the ids are sparse
+        self.low = self.high = 0  # Bounds on the ids inserted while in tree mode
+
+    def _to_tree(self):
+        # Move the contents into a tree
+        keys, values = [], []
+        for key, value in self.items():
+            keys.append(key)
+            values.append(value)
+        self.tree = self.SPARSE_STORE()
+        self.tree.build_from_sorted(keys, values)
+        self.low, self.high = (keys[0], keys[-1]) if keys else (0, 0)
+        self.seat, self.extra = array('q'), {}
+
+    def _to_table(self):
+        # Move the contents of the tree back into a table spanning ids up to self.high
+        seat, extra, no_seat = array('q', [self.NO_SEAT]) * (self.high + 1), {}, self.NO_SEAT
+        for key, value in self.tree.items():
+            if seat[key] == no_seat:
+                seat[key] = value
+            else:
+                extra.setdefault(key, []).append(value)
+        self.seat, self.extra, self.size, self.tree = seat, extra, len(self.tree), None
+
+    def _check_dense(self):
+        # Called in tree mode after inserts: return to the table once the ids are dense again
+        if self.low >= 0 and self.DENSE * len(self.tree) > self.high + 1:
+            self._to_table()
+
+    def _check_sparse(self):
+        # Called in table mode after deletes: move to a tree once the ids are sparse
+        if self.SPARSE * self.size < len(self.seat) and len(self.seat) > self.MIN_SPAN:
+            self._to_tree()
+
+    def _first(self, key):
+        # Tree mode: the earliest seat of a user, or None
+        return next((value for _, value in self.tree.items_between(key, key)), None)
+
+    def _pop(self, key):
+        # Table mode: clear the earliest seat of a user who has one, moving their next seat up
+        later = self.extra.get(key)
+        if later:
+            self.seat[key] = later.pop(0)
+            if not later:
+                del self.extra[key]
+        else:
+            self.seat[key] = self.NO_SEAT
+
+    def insert(self, key, value):
+        """
+        Add a seat for a user, after any seats they already hold.
+        Args:
+            key: User id
+            value: Seat id
+        """
+        tree = self.tree
+        if tree is not None:
+            tree.insert(key, value)
+            if key > self.high:
+                self.high = key
+            elif key < self.low:
+                self.low = key
+            self._check_dense()
+            return
+        seat = self.seat
+        if not 0 <= key < len(seat):
+            if key < 0 or (key >= self.MIN_SPAN and self.SPARSE * (self.size + 1) <= key):
+                self._to_tree()
+                self.insert(key, value)
+                return
+            seat.extend(array('q', [self.NO_SEAT]) * (key + 1 - len(seat)))
+        if seat[key] == self.NO_SEAT:
+            seat[key] = value
+        else:
+            self.extra.setdefault(key, []).append(value)
+        self.size += 1
+
+    def search(self, key):
+        """
+        Search for a user's earliest seat.
+        Args: key: User id
+        Returns the seat, or None if the user has none
+        """
+        if self.tree is not None:
+            return self._first(key)
+        if 0 <= key < len(self.seat):
+            value = self.seat[key]
+            if value != self.NO_SEAT:
+                return value
+        return None
+
+    def delete(self, key):
+        """
+        Delete a user's earliest seat.
+        Args: key: User id
+        Returns True if the key was found and deleted, False otherwise
+        """
+        if self.tree is not None:
+            value = self._first(key)
+            return value is not None and self.tree.delete_item(key, value)
+        seat = self.seat
+        if 0 <= key < len(seat) and seat[key] != self.NO_SEAT:
+            self._pop(key)
+            self.size -= 1
+            self._check_sparse()
+            return True
+        return False
+
+    def delete_item(self, key, value):
+        """
+        Delete the pair (key, value), whichever of the user's seats it is.
+        Returns True if the pair was found and deleted, False otherwise
+        """
+        if self.tree is not None:
+            return self.tree.delete_item(key, value)
+        if self.search(key) == value:
+            return self.delete(key)
+        later = self.extra.get(key)
+        if not later or value not in later:
+            return False
+        later.remove(value)
+        if not later:
+            del self.extra[key]
+        self.size -= 1
+        self._check_sparse()
+        return True
+
+    def items_between(self, lo, hi):
+        """
+        Iterate over the (key, value) pairs with lo <= key <= hi in key order,
+        a user's seats oldest first. The store must not be modified while iterating.
+        Args:
+            lo: Lower bound of the key range (inclusive), or None
+            hi: Upper bound of the key range (inclusive), or None
+        """
+        if self.tree is not None:
+            yield from self.tree.items_between(lo, hi)
+            return
+        seat, no_seat, extra = self.seat, self.NO_SEAT, self.extra
+        first = 0 if lo is None else max(lo, 0)
+        last = len(seat) - 1 if hi is None else min(hi, len(seat) - 1)
+        for key in range(first, last + 1):
+            value = seat[key]
+            if value != no_seat:
+                yield key, value
+                if extra and key in extra:
+                    for value in extra[key]:
+                        yield key, value
+
+    def delete_range(self, lo, hi):
+        """
+        Delete the earliest seat of every user in [lo, hi].
+        Args:
+            lo: Lower bound of the key range (inclusive)
+            hi: Upper bound of the key range (inclusive)
+        Returns a list of the deleted (key, value) pairs in key order
+        """
+        if self.tree is not None:
+            deleted = []
+            for key, value in self.tree.items_between(lo, hi):
+                if not deleted or deleted[-1][0] != key:
+                    deleted.append((key, value))
+            for key, value in deleted:
+                self.tree.delete_item(key, value)
+            return deleted
+        seat, no_seat = self.seat, self.NO_SEAT
+        deleted = [(key, seat[key]) for key in range(max(lo, 0), min(hi, len(seat) - 1) + 1) if seat[key] != no_seat]
+        for key, _ in deleted:
+            self._pop(key)
+        self.size -= len(deleted)
+        self._check_sparse()
+        return deleted
+
+    def insert_many(self, pairs):
+        """
+        Insert a batch of (key, value) pairs.
+        Args:
+            pairs: (key, value) pairs
+        """
+        if self.tree is not None:
+            self.tree.insert_many(pairs)
+            for key, _ in pairs:
+                if key > self.high:
+                    self.high = key
+                elif key < self.low:
+                    self.low = key
+            self._check_dense()
+            return
+        for key, value in pairs:
+            self.insert(key, value)
+
+    def build_from_sorted(self, keys, values, layout=None):
+        """
+        Replace the contents with the given pairs in O(n), in whichever mode
+        their density calls for.
+        Args:
+            keys: Sequence of integer keys in ascending order
+            values: Sequence of the matching integer values
+            layout: Ignored; searches here do not depend on a tree shape
+        """
+        self.extra = {}
+        if keys and (keys[0] < 0 or (keys[-1] >= self.MIN_SPAN and self.DENSE * len(keys) <= keys[-1])):
+            self.tree = self.SPARSE_STORE()
+            self.tree.build_from_sorted(keys, values)
+            self.low, self.high = keys[0], keys[-1]
+            self.seat = array('q')
+            return
+        self.tree = None
+        seat, no_seat = array('q', [self.NO_SEAT]) * (keys[-1] + 1 if keys else 0), self.NO_SEAT
+        for key, value in zip(keys, values):
+            if seat[key] == no_seat:
+                seat[key] = value
+            else:
+                self.extra.setdefault(key, []).append(value)
+        self.seat, self.size = seat, len(keys)
+
+    def layout(self):
+        # No shape to save: a user's earliest seat is found whatever the layout
+        return None
+
+    def height(self):
+        # Steps per lookup: the tree height in tree mode, one probe in table mode
+        if self.tree is not None:
+            return self.tree.height()
+        return 1 if self.size else 0
+
+    def memory_usage(self):
+        # Bytes held by the table and the later seats, or by the tree in tree mode
+        if self.tree is not None:
+            return self.tree.memory_usage()
+        return self.seat.itemsize * len(self.seat) + sys.getsizeof(self.extra)
+
+    def __len__(self):
+        # Return the number of (key, value) pairs in the store.
+        return len(self.tree) if self.tree is not None else self.size
+
+    def items(self):
+        # Iterate over all (key, value) pairs in key order.
+        return self.items_between(None, None)
+
+    def inorder_traversal(self):
+        """
+        List every reservation.
+        Returns a list of (key, value) pairs sorted by value
+        """
+        result = list(self.items())
+        result.sort(key=lambda x: x[1])
+        return result
+
+class MinHeap:
+    #Implements minHeap data structure
+    def __init__(self):
+        #Initialise an empty min heap
+        self.heap = []
+        self.removed = set()  # Discarded items still in the heap array, skipped when they surface
+
+    def insert(self, item):
+        """
+        Insert a new item into the heap.
+        Args:
+            item: The item to be inserted
+        """
+        if self.removed and item in self.removed:
+            self.removed.discard(item)  # Its entry is still in the array
+            return
+        self.heap.append(item)
+        self._sift_up(len(self.heap) - 1)
+
+    def extract_min(self):
+        #Remove and return the minimum element from the heap.
+        while self.heap:
+            if len(self.heap) == 1:
+                min_val = self.heap.pop()
+            else:
+                min_val = self.heap[0]
+                self.heap[0] = self.heap.pop()
+                self._sift_down(0)
+            if not self.removed or min_val not in self.removed:
+                return min_val
+            self.removed.discard(min_val)
+        return None
+
+    def _sift_up(self, i):
+        # Restore the heap property by moving an element up the heap.
+        #Args: i: The index of the element to sift up
+        parent = (i - 1) // 2
+        if i > 0 and self.heap[i] < self.heap[parent]:
+            self.heap[i], self.heap[parent] = self.heap[parent], self.heap[i]
+            self._sift_up(parent)
+
+    def _sift_down(self, i):
+        #Restore the heap property by moving an element down the heap.
+        #i: The index of the element to sift down
+        min_index = i
+        left = 2 * i + 1
+        right = 2 * i + 2
+        if left < len(self.heap) and self.heap[left] < self.heap[min_index]:
+            min_index = left
+        if right < len(self.heap) and self.heap[right] < self.heap[min_index]:
+            min_index = right
+        if i != min_index:
+            self.heap[i], self.heap[min_index] = self.heap[min_index], self.heap[i]
+            self._sift_down(min_index)
+
+    def insert_range(self, first, last):
+        """
+        Insert every seat from first to last (inclusive).
+        A sorted run is already a valid heap, and seats larger than their parent need
+        no sifting (always true for new seats), so Initialize and AddSeats run in O(k).
+        Args:
+            first: The first seat to insert
+            last: The last seat to insert
+        """
+        seats = range(first, last + 1)
+        if self.removed:
+            revived = self.removed.intersection(seats)
+            if revived:
+                self.removed -= revived
+                seats = [seat for seat in seats if seat not in revived]
+        heap = self.heap
+        start = len(heap)
+        heap.extend(seats)
+        if start == 0:
+            return
+        for i in range(start, len(heap)):
+            if heap[i] < heap[(i - 1) // 2]:
+                self._sift_up(i)
+
+    def take_lowest(self, k):
+        """
+        Remove the k lowest free seats, or all of them if there are fewer.
+        A small batch is popped with the C heapq functions in O(k log n); a larger
+        one sorts the heap once, and the sorted remainder is still a valid heap.
+        Args:
+            k: Number of seats to take
+        Returns: list: The seats in ascending order
+        """
+        if self.removed:
+            self._purge()
+        heap = self.heap
+        if 8 * k < len(heap):
+            return [heapq.heappop(heap) for _ in range(k)]
+        seats = sorted(heap)
+        self.heap = seats[k:]
+        return seats[:k]
+
+    def take_block(self, k):
+        """
+        Remove the lowest-numbered run of k adjacent free seats.
+        The heap has no notion of adjacency, so this sorts the seats in O(n log n);
+        a sorted list is a valid heap, so the rest is kept as it is.
+        Args:
+            k: Number of adjacent seats needed
+        Returns the first seat of the block, or None if no run is long enough
+        """
+        if self.removed:
+            self._purge()
+        seats = sorted(self.heap)
+        run = 0
+        for i, seat in enumerate(seats):
+            run = run + 1 if run and seat == seats[i - 1] + 1 else 1
+            if run == k:
+                self.heap = seats[:i - k + 1] + seats[i + 1:]
+                return seat - k + 1
+        return None
+
+    def discard_range(self, first, last):
+        """
+        Remove the seats first..last (inclusive), which must all be in the heap.
+        They are only marked as removed, in O(k), and skipped when they reach the top.
+        Args:
+            first: The first seat to remove
+            last: The last seat to remove
+        """
+        self.removed.update(range(first, last + 1))
+        if 2 * len(self.removed) > len(self.heap):
+            self._purge()
+
+    def _purge(self):
+        # Drop the discarded entries from the array and restore the heap property in O(n)
+        removed = self.removed
+        self.heap = [seat for seat in self.heap if seat not in removed]
+        heapq.heapify(self.heap)
+        removed.clear()
+
+    def free_runs(self):
+        # Yield the free seats as (first, last) runs in ascending order.
+        if self.removed:
+            self._purge()
+        seats = sorted(self.heap)
+        i = 0
+        while i < len(seats):
+            j = i
+            while j + 1 < len(seats) and seats[j + 1] == seats[j] + 1:
+                j += 1
+            yield seats[i], seats[j]
+            i = j + 1
+
+    def memory_usage(self):
+        # Approximate bytes held by the heap list and its int entries.
+        return sys.getsizeof(self.heap) + len(self.heap) * 28
+
+    def __len__(self):
+        #Return the number of elements in the heap.
+        return len(self.heap) - len(self.removed)
+
+class _SeatRunTree:
+    """
+    SeatRangePool's runs once there are many of them: the nodes of an
+    ArrayRedBlackTree keyed by their first seat, with their last seat as the
+    value, so finding, adding and removing a run are O(log runs) however
+    fragmented the venue gets. Growing or trimming a run rewrites its key or
+    value in place, which keeps the tree ordered because runs never overlap.
+    The lowest run is cached, so extract_min is O(1) until it is used up.
+    """
+    def __init__(self):
+        #Initialise an empty pool
+        self.tree = ArrayRedBlackTree()
+        self._first = 0  # Node id of the lowest run, 0 when the pool is empty
+        self._count = 0
+
+    def _floor(self, seat):
+        # Return the id of the last run starting at or before seat, or 0 if there is none
+        tree = self.tree
+        keys, left, right = tree.key, tree.left, tree.right
+        x, found = tree.root, 0
+        while x:
+            if keys[x] <= seat:
+                found = x
+                x = right[x]
+            else:
+                x = left[x]
+        return found
+
+    def _next(self, x):
+        # Return the id of the run after run x, or 0 if x is the last one
+        tree = self.tree
+        left, right, parent = tree.left, tree.right, tree.parent
+        if right[x]:
+            x = right[x]
+            while left[x]:
+                x = left[x]
+            return x
+        y = parent[x]
+        while y and x == right[y]:
+            x, y = y, parent[y]
+        return y
+
+    def _add_run(self, first, last):
+        # Add the run first..last, which touches no other run
+        tree = self.tree
+        tree.insert(first, last)
+        if not self._first or first < tree.key[self._first]:
+            self._first = tree._find_node(first)
+
+    def _remove_run(self, x):
+        # Remove run x; node ids of the other runs stay valid
+        if x == self._first:
+            self._first = self._next(x)
+        self.tree._delete_node(x)
+
+    def insert(self, seat):
+        """
+        Return a single seat to the pool, merging it with neighbouring runs, in O(log runs).
+        Args:
+            seat: The seat to insert
+        """
+        keys, values = self.tree.key, self.tree.value
+        x = self._floor(seat)
+        if x and values[x] >= seat:
+            return  # Already free
+        y = self._next(x) if x else self._first
+        joins_left = x and values[x] == seat - 1
+        joins_right = y and keys[y] == seat + 1
+        if joins_left and joins_right:
+            values[x] = values[y]
+            self._remove_run(y)
+        elif joins_left:
+            values[x] = seat
+        elif joins_right:
+            keys[y] = seat
+        else:
+            self._add_run(seat, seat)
+        self._count += 1
+
+    def insert_range(self, first, last):
+        """
+        Add the seats first..last (inclusive) as one run in O(log runs).
+        The seats must not already be in the pool.
+        Args:
+            first: The first seat to insert
+            last: The last seat to insert
+        """
+        if last < first:
+            return
+        keys, values = self.tree.key, self.tree.value
+        x = self._floor(first)
+        y = self._next(x) if x else self._first
+        joins_left = x and values[x] == first - 1
+        joins_right = y and keys[y] == last + 1
+        if joins_left and joins_right:
+            values[x] = values[y]
+            self._remove_run(y)
+        elif joins_left:
+            values[x] = last
+        elif joins_right:
+            keys[y] = first
+        else:
+            self._add_run(first, last)
+        self._count += last - first + 1
+
+    def extract_min(self):
+        #Remove and return the lowest free seat, or None if the pool is empty.
+        if not self._count:
+            return None
+        x = self._first
+        keys = self.tree.key
+        seat = keys[x]
+        if seat == self.tree.value[x]:
+            self._remove_run(x)
+        else:
+            keys[x] = seat + 1
+        self._count -= 1
+        return seat
+
+    def take_lowest(self, k):
+        """
+        Remove the k lowest free seats, or all of them if there are fewer, by
+        consuming whole runs from the front in O(runs taken * log runs + k).
+        Args:
+            k: Number of seats to take
+        Returns: list: The seats in ascending order
+        """
+        keys, values = self.tree.key, self.tree.value
+        seats = []
+        while len(seats) < k and self._first:
+            x = self._first
+            first = keys[x]
+            last = min(values[x], first + k - len(seats) - 1)
+            seats.extend(range(first, last + 1))
+            if last == values[x]:
+                self._remove_run(x)
+            else:
+                keys[x] = last + 1
+        self._count -= len(seats)
+        return seats
+
+    def take_block(self, k):
+        """
+        Remove the lowest-numbered run of k adjacent free seats, scanning the runs in O(runs).
+        Args:
+            k: Number of adjacent seats needed
+        Returns the first seat of the block, or None if no run is long enough
+        """
+        keys, values = self.tree.key, self.tree.value
+        for x in self.tree._nodes_between(None, None):
+            first = keys[x]
+            if values[x] - first + 1 >= k:
+                if values[x] - first + 1 > k:
+                    keys[x] = first + k
+                else:
+                    self._remove_run(x)
+                self._count -= k
+                return first
+        return None
+
+    def discard_range(self, first, last):
+        """
+        Remove the seats first..last (inclusive), which must all be free, in O(log runs).
+        Being adjacent free seats, they lie inside a single run, which is trimmed or split.
+        Args:
+            first: The first seat to remove
+            last: The last seat to remove
+        """
+        keys, values = self.tree.key, self.tree.value
+        x = self._floor(first)
+        run_first, run_last = keys[x], values[x]
+        if run_first == first and run_last == last:
+            self._remove_run(x)
+        elif run_first == first:
+            keys[x] = last + 1
+        elif run_last == last:
+            values[x] = first - 1
+        else:
+            values[x] = first - 1
+            self._add_run(last + 1, run_last)
+        self._count -= last - first + 1
+
+    def runs(self):
+        # Return the number of free runs.
+        return len(self.tree)
+
+    def free_runs(self):
+        # Yield the free seats as (first, last) runs in ascending order.
+        return self.tree.items()
+
+    def memory_usage(self):
+        # Approximate bytes held by the run tree's columns.
+        return self.tree.memory_usage()
+
+    def __len__(self):
+        #Return the number of free seats.
+        return self._count
+
+class SeatRangePool:
+    """
+    Free-seat pool that stores seats as sorted, disjoint runs [start, end]
+    instead of one heap entry per seat. It has the same interface as MinHeap.
+    While there are at most TREE_RUNS runs they live in two sorted lists:
+    Initialize and AddSeats add a single run in O(1), a run is located by
+    binary search, and a seat that starts a new run in the middle shifts the
+    lists with a memmove, which at these sizes beats rebalancing a tree.
+    Beyond TREE_RUNS the runs move into a _SeatRunTree, where every operation
+    is O(log runs), and they move back once fewer than LIST_RUNS are left; the
+    gap keeps churn near either threshold from migrating back and forth.
+    """
+    TREE_RUNS = 1 << 14  # Move into the tree above this many runs
+    LIST_RUNS = 1 << 12  # Move back to the lists below this many
+
+    def __init__(self):
+        #Initialise an empty pool in list mode
+        self.starts = []
+        self.ends = []
+        self._head = 0  # Runs before this index have been used up
+        self._count = 0
+        self.tree = None  # The _SeatRunTree holding the runs while there are many
+
+    def _to_tree(self):
+        # Move the runs into a tree
+        tree = _SeatRunTree()
+        tree.tree.build_from_sorted(self.starts[self._head:], self.ends[self._head:])
+        tree._first = tree._floor(self.starts[self._head])
+        tree._count = self._count
+        self.tree = tree
+        self.starts, self.ends, self._head = [], [], 0
+
+    def _check_runs(self):
+        # Called in tree mode after removals: return to the lists once the runs are few again
+        if self.tree.runs() < self.LIST_RUNS:
+            self.starts, self.ends = [], []
+            for first, last in self.tree.free_runs():
+                self.starts.append(first)
+                self.ends.append(last)
+            self._count, self.tree = len(self.tree), None
+
+    def insert(self, seat):
+        """
+        Return a single seat to the pool, merging it with neighbouring runs, in O(log runs).
+        Args:
+            seat: The seat to insert
+        """
+        if self.tree is not None:
+            self.tree.insert(seat)
+            return
+        starts, ends, head = self.starts, self.ends, self._head
+        i = bisect_right(starts, seat, head)
+        if i > head and ends[i - 1] >= seat:
+            return  # Already free
+        joins_left = i > head and ends[i - 1] == seat - 1
+        joins_right = i < len(starts) and starts[i] == seat + 1
+        if joins_left and joins_right:
+            ends[i - 1] = ends[i]
+            del starts[i], ends[i]
+        elif joins_left:
+            ends[i - 1] = seat
+        elif joins_right:
+            starts[i] = seat
+        elif i == head and head > 0:
+            # Reuse the slot left behind by a used-up run
+            self._head = head - 1
+            starts[head - 1] = ends[head - 1] = seat
+        else:
+            starts.insert(i, seat)
+            ends.insert(i, seat)
+        self._count += 1
+        if len(starts) - self._head > self.TREE_RUNS:
+            self._to_tree()
+
+    def insert_range(self, first, last):
+        """
+        Add the seats first..last (inclusive) as one run in O(log runs).
+        The seats must not already be in the pool.
+        Args:
+            first: The first seat to insert
+            last: The last seat to insert
+        """
+        if self.tree is not None:
+            self.tree.insert_range(first, last)
+            return
+        if last < first:
+            return
+        starts, ends, head = self.starts, self.ends, self._head
+        i = bisect_right(starts, first, head)
+        if i > head and ends[i - 1] == first - 1:
+            ends[i - 1] = last
+            if i < len(starts) and starts[i] == last + 1:
+                ends[i - 1] = ends[i]
+                del starts[i], ends[i]
+        elif i < len(starts) and starts[i] == last + 1:
+            starts[i] = first
+        else:
+            starts.insert(i, first)
+            ends.insert(i, last)
+        self._count += last - first + 1
+        if len(starts) - self._head > self.TREE_RUNS:
+            self._to_tree()
+
+    def extract_min(self):
+        #Remove and return the lowest free seat, or None if the pool is empty.
+        if self.tree is not None:
+            seat = self.tree.extract_min()
+            self._check_runs()
+            return seat
+        if not self._count:
+            return None
+        head = self._head
+        seat = self.starts[head]
+        if seat == self.ends[head]:
+            self._head = head + 1
+            if self._head > 64 and 2 * self._head > len(self.starts):
+                # Drop the used-up prefix once it dominates the lists
+                del self.starts[:self._head], self.ends[:self._head]
+                self._head = 0
+        else:
+            self.starts[head] = seat + 1
+        self._count -= 1
+        return seat
+
+    def take_lowest(self, k):
+        """
+        Remove the k lowest free seats, or all of them if there are fewer, by
+        consuming whole runs from the front in O(runs taken + k), times log runs in tree mode.
+        Args:
+            k: Number of seats to take
+        Returns: list: The seats in ascending order
+        """
+        if self.tree is not None:
+            seats = self.tree.take_lowest(k)
+            self._check_runs()
+            return seats
+        starts, ends = self.starts, self.ends
+        head = self._head
+        seats = []
+        while len(seats) < k and head < len(starts):
+            first = starts[head]
+            last = min(ends[head], first + k - len(seats) - 1)
+            seats.extend(range(first, last + 1))
+            if last == ends[head]:
+                head += 1
+            else:
+                starts[head] = last + 1
+        self._head = head
+        self._count -= len(seats)
+        if head > 64 and 2 * head > len(starts):
+            del starts[:head], ends[:head]
+            self._head = 0
+        return seats
+
+    def take_block(self, k):
+        """
+        Remove the lowest-numbered run of k adjacent free seats, scanning the runs in O(runs).
+        Args:
+            k: Number of adjacent seats needed
+        Returns the first seat of the block, or None if no run is long enough
+        """
+        if self.tree is not None:
+            first = self.tree.take_block(k)
+            self._check_runs()
+            return first
+        starts, ends = self.starts, self.ends
+        for i in range(self._head, len(starts)):
+            first = starts[i]
+            if ends[i] - first + 1 >= k:
+                if ends[i] - first + 1 > k:
+                    starts[i] = first + k
+                elif i == self._head:
+                    self._head = i + 1
+                else:
+                    del starts[i], ends[i]
+                self._count -= k
+                return first
+        return None
+
+    def discard_range(self, first, last):
+        """
+        Remove the seats first..last (inclusive), which must all be free, in O(log runs).
+        Being adjacent free seats, they lie inside a single run, which is trimmed or split.
+        Args:
+            first: The first seat to remove
+            last: The last seat to remove
+        """
+        if self.tree is not None:
+            self.tree.discard_range(first, last)
+            self._check_runs()
+            return
+        starts, ends = self.starts, self.ends
+        i = bisect_right(starts, first, self._head) - 1
+        run_first, run_last = starts[i], ends[i]
+        if run_first == first and run_last == last:
+            if i == self._head:
+                self._head = i + 1
+            else:
+                del starts[i], ends[i]
+        elif run_first == first:
+            starts[i] = last + 1
+        elif run_last == last:
+            ends[i] = first - 1
+        else:
+            ends[i] = first - 1
+            starts.insert(i + 1, last + 1)
+            ends.insert(i + 1, run_last)
+        self._count -= last - first + 1
+        if len(starts) - self._head > self.TREE_RUNS:
+            self._to_tree()
+
+    def runs(self):
+        # Return the number of free runs.
+        if self.tree is not None:
+            return self.tree.runs()
+        return len(self.starts) - self._head
+
+    def free_runs(self):
+        # Yield the free seats as (first, last) runs in ascending order.
+        if self.tree is not None:
+            return self.tree.free_runs()
+        return zip(self.starts[self._head:], self.ends[self._head:])
+
+    def memory_usage(self):
+        # Approximate bytes held by the run lists and their int entries, or by the tree.
+        if self.tree is not None:
+            return self.tree.memory_usage()
+        return sys.getsizeof(self.starts) + sys.getsizeof(self.ends) + 2 * len(self.starts) * 28
+
+    def __len__(self):
+        #Return the number of free seats.
+        if self.tree is not None:
+            return len(self.tree)
+        return self._count
+
+class SegmentTreeSeatPool:
+    """
+    Free-seat pool kept as a segment tree over seat ids, with the same interface
+    as MinHeap. Every node stores the longest free run inside its span and the
+    free runs touching its two ends, so the lowest-numbered block of k adjacent
+    free seats is found in O(log n) (take_block). A range of seats is marked
+    free or taken by filling the fully covered nodes of each level with array
+    slices and recomputing only the two boundary nodes, so Initialize and block
+    updates cost O(log n) Python steps.
+    """
+    def __init__(self):
+        #Initialise an empty pool. Leaf size + i stands for seat i.
+        self.size = 1
+        self.prefix = array('i', [0, 0])  # Free run starting at the left end of each node
+        self.suffix = array('i', [0, 0])  # Free run ending at the right end of each node
+        self.best = array('i', [0, 0])  # Longest free run inside each node
+        self._count = 0
+
+    def _grow(self, last_seat):
+        # Double the number of leaves until seat last_seat fits, then rebuild the inner nodes in O(n)
+        if last_seat < self.size:
+            return
+        old_size, old_prefix = self.size, self.prefix
+        while self.size <= last_seat:
+            self.size *= 2
+        self.prefix = array('i', [0]) * (2 * self.size)
+        self.suffix = array('i', [0]) * (2 * self.size)
+        self.best = array('i', [0]) * (2 * self.size)
+        if not self._count:
+            return
+        leaves = old_prefix[old_size:]
+        self.prefix[self.size:self.size + old_size] = leaves
+        self.suffix[self.size:self.size + old_size] = leaves
+        self.best[self.size:self.size + old_size] = leaves
+        lo, hi, span = self.size >> 1, self.size - 1, 1
+        while lo:
+            for i in range(lo, hi + 1):
+                self._pull(i, span)
+            lo, hi, span = lo >> 1, hi >> 1, span * 2
+
+    def _pull(self, i, span):
+        """
+        Recompute node i from its children, each of which covers span seats.
+        Returns True if the node changed, so callers can stop climbing once nothing does.
+        """
+        prefix, suffix, best = self.prefix, self.suffix, self.best
+        left = 2 * i
+        right = left + 1
+        head = prefix[left]
+        if head == span:
+            head += prefix[right]
+        tail = suffix[right]
+        if tail == span:
+            tail += suffix[left]
+        longest = suffix[left] + prefix[right]
+        if best[left] > longest:
+            longest = best[left]
+        if best[right] > longest:
+            longest = best[right]
+        if prefix[i] == head and suffix[i] == tail and best[i] == longest:
+            return False
+        prefix[i], suffix[i], best[i] = head, tail, longest
+        return True
+
+    def _set_range(self, first, last, free):
+        """
+        Mark seats first..last (inclusive) as free (1) or taken (0), level by level.
+        Nodes strictly between the two ends of a level lie wholly inside the range
+        and are filled directly; only the end nodes are recomputed from their children.
+        Once the ends meet, the climb stops at the first node that does not change.
+        """
+        lo, hi = first + self.size, last + self.size
+        if hi - lo > 1:
+            fill = array('i', [free]) * (hi - lo - 1)
+            self.prefix[lo + 1:hi] = self.suffix[lo + 1:hi] = self.best[lo + 1:hi] = fill
+        self.prefix[lo] = self.suffix[lo] = self.best[lo] = free
+        self.prefix[hi] = self.suffix[hi] = self.best[hi] = free
+        lo, hi, span = lo >> 1, hi >> 1, 1
+        while lo != hi:
+            if hi - lo > 1:
+                fill = array('i', [free * 2 * span]) * (hi - lo - 1)
+                self.prefix[lo + 1:hi] = self.suffix[lo + 1:hi] = self.best[lo + 1:hi] = fill
+            self._pull(lo, span)
+            self._pull(hi, span)
+            lo, hi, span = lo >> 1, hi >> 1, span * 2
+        # Single path to the root, with _pull inlined because every seat update takes it
+        prefix, suffix, best = self.prefix, self.suffix, self.best
+        while lo:
+            left = 2 * lo
+            right = left + 1
+            head = prefix[left]
+            if head == span:
+                head += prefix[right]
+            tail = suffix[right]
+            if tail == span:
+                tail += suffix[left]
+            longest = suffix[left] + prefix[right]
+            if best[left] > longest:
+                longest = best[left]
+            if best[right] > longest:
+                longest = best[right]
+            if prefix[lo] == head and suffix[lo] == tail and best[lo] == longest:
+                break
+            prefix[lo] = head
+            suffix[lo] = tail
+            best[lo] = longest
+            lo >>= 1
+            span *= 2
+
+    def insert(self, seat):
+        """
+        Return a single seat to the pool.
+        Args:
+            seat: The seat to insert
+        """
+        self._grow(seat)
+        if self.best[self.size + seat]:
+            return  # Already free
+        self._set_range(seat, seat, 1)
+        self._count += 1
+
+    def insert_range(self, first, last):
+        """
+        Add the seats first..last (inclusive). The seats must not already be in the pool.
+        Args:
+            first: The first seat to insert
+            last: The last seat to insert
+        """
+        if last < first:
+            return
+        self._grow(last)
+        self._set_range(first, last, 1)
+        self._count += last - first + 1
+
+    def find_block(self, k):
+        """
+        Find the lowest-numbered run of k adjacent free seats in O(log n) without taking it.
+        Args:
+            k: Number of adjacent seats needed
+        Returns the first seat of the run, or None if no run is long enough
+        """
+        prefix, suffix, best = self.prefix, self.suffix, self.best
+        if k <= 0 or best[1] < k:
+            return None
+        i, span = 1, self.size
+        while i < self.size:
+            span //= 2
+            left = 2 * i
+            if best[left] >= k:
+                i = left
+            elif suffix[left] + prefix[left + 1] >= k:
+                # The run straddles the two halves; it starts inside the left child's suffix
+                return (left + 1) * span - self.size - suffix[left]
+            else:
+                i = left + 1
+        return i - self.size
+
+    def take_block(self, k):
+        """
+        Remove the lowest-numbered run of k adjacent free seats in O(log n).
+        Args:
+            k: Number of adjacent seats needed
+        Returns the first seat of the block, or None if no run is long enough
+        """
+        first = self.find_block(k)
+        if first is not None:
+            self._set_range(first, first + k - 1, 0)
+            self._count -= k
+        return first
+
+    def discard_range(self, first, last):
+        """
+        Remove the seats first..last (inclusive), which must all be free, with one range update.
+        Args:
+            first: The first seat to remove
+            last: The last seat to remove
+        """
+        self._set_range(first, last, 0)
+        self._count -= last - first + 1
+
+    def extract_min(self):
+        #Remove and return the lowest free seat, or None if the pool is empty.
+        return self.take_block(1)
+
+    def take_lowest(self, k):
+        """
+        Remove the k lowest free seats, or all of them if there are fewer.
+        Walks the free runs from the left and clears each one with a single range update.
+        Args:
+            k: Number of seats to take
+        Returns: list: The seats in ascending order
+        """
+        runs = []
+        remaining = k
+        for first, last in self.free_runs():
+            if remaining <= 0:
+                break
+            last = min(last, first + remaining - 1)
+            runs.append((first, last))
+            remaining -= last - first + 1
+        seats = []
+        for first, last in runs:
+            self._set_range(first, last, 0)
+            seats.extend(range(first, last + 1))
+        self._count -= len(seats)
+        return seats
+
+    def longest_run(self):
+        # Return the length of the longest run of adjacent free seats. O(1)
+        return self.best[1]
+
+    def free_runs(self):
+        # Yield the free seats as (first, last) runs in ascending order, skipping full and empty subtrees.
+        run_first = run_last = None
+        stack = [(1, self.size)]
+        while stack:
+            i, span = stack.pop()
+            if not self.best[i]:
+                continue
+            if self.best[i] == span:
+                first = i * span - self.size
+                if run_last is not None and run_last + 1 == first:
+                    run_last = first + span - 1
+                else:
+                    if run_last is not None:
+                        yield run_first, run_last
+                    run_first, run_last = first, first + span - 1
+                continue
+            stack.append((2 * i + 1, span // 2))
+            stack.append((2 * i, span // 2))
+        if run_last is not None:
+            yield run_first, run_last
+
+    def memory_usage(self):
+        # Bytes held by the three node arrays.
+        return 3 * self.best.itemsize * len(self.best)
+
+    def __len__(self):
+        #Return the number of free seats.
+        return self._count
+
+class Tournament:
+    """
+    Tournament tree over a growing list of players, each with a comparable key
+    or None while it is out. Every inner node holds the winner of its subtree,
+    the player with the smallest key, so winner() is O(1) and changing one
+    player's key replays only its own matches in O(log n).
+    """
+    def __init__(self):
+        #Initialise an empty tournament. Leaf size + i stands for player i.
+        self.keys = []
+        self.size = 1
+        self.tree = [-1, -1]  # Winning player of each node, -1 if none is in
+
+    def add(self, key=None):
+        # Add a player and return its index, doubling the tree when it is full
+        i = len(self.keys)
+        self.keys.append(key)
+        if i == self.size:
+            self.size *= 2
+            self.tree = [-1] * (2 * self.size)
+            for j in range(len(self.keys)):
+                self.tree[self.size + j] = j if self.keys[j] is not None else -1
+            for node in range(self.size - 1, 0, -1):
+                self.tree[node] = self._match(self.tree[2 * node], self.tree[2 * node + 1])
+        else:
+            self.update(i, key)
+        return i
+
+    def pop(self):
+        # Remove the last player added
+        self.update(len(self.keys) - 1, None)
+        self.keys.pop()
+
+    def _match(self, a, b):
+        # The winner of two subtree winners; the lower index wins ties
+        if a < 0:
+            return b
+        if b < 0 or self.keys[a] <= self.keys[b]:
+            return a
+        return b
+
+    def update(self, i, key):
+        # Set player i's key (None takes it out) and replay its matches up to the root
+        self.keys[i] = key
+        tree = self.tree
+        node = self.size + i
+        tree[node] = i if key is not None else -1
+        node //= 2
+        while node:
+            tree[node] = self._match(tree[2 * node], tree[2 * node + 1])
+            node //= 2
+
+    def winner(self):
+        # Return the index of the player with the smallest key, or -1 if none is in
+        return self.tree[1]
+
+
+class SectionedSeatPool:
+    """
+    Free-seat pool for a venue split into sections, with the same interface as
+    MinHeap. Seat numbers stay global: each section owns one or more runs of
+    adjacent seat numbers (one per InitializeSection, or per Initialize/AddSeats
+    for the general section 0), and every run keeps its free seats in its own
+    pool of the configured class, numbered from 1 within the run. Tournament
+    trees over the runs pick, in O(log runs), the run holding the lowest free
+    seat (extract_min), the first run of a section or of a tier with a free
+    seat, and the best available run: lowest tier number first, with the
+    untiered general seats last. A run only re-plays its matches when it runs
+    out of free seats or gets one back.
+    """
+    GENERAL_TIER = 1 << 62  # Rank of tier 0, the general seats, in best-available order
+
+    def __init__(self, seat_pool=MinHeap):
+        """
+        Create a pool with no sections.
+        Args:
+            seat_pool: Class used for each run's free seats
+        """
+        self.seat_pool = seat_pool
+        self.starts = []  # First seat of each run, ascending
+        self.ends = []  # Last seat of each run
+        self.pools = []  # Free seats of each run, numbered from 1 within the run
+        self.run_sections = []  # Section of each run
+        self.run_tiers = []  # Tier of each run
+        self.places = []  # (player in its tier tournament, player in its section tournament) of each run
+        self.lowest = Tournament()  # Runs with free seats, by seat number
+        self.best = Tournament()  # Runs with free seats, by (tier, seat number)
+        self.tiers = {}  # Tier -> (Tournament, runs in player order)
+        self.sections = {}  # Section -> (tier, Tournament, runs in player order)
+        self._count = 0
+
+    def add_section(self, section, tier, first, last):
+        """
+        Give section the seats first..last, which must follow every existing run.
+        The run starts with no free seats; insert_range frees them.
+        Args:
+            section: Section id; its first run fixes its tier
+            tier: Price tier, 1 being the best; 0 for the general seats
+            first, last: The run's seat numbers
+        """
+        run = len(self.starts)
+        self.starts.append(first)
+        self.ends.append(last)
+        self.pools.append(self.seat_pool())
+        self.run_sections.append(section)
+        self.run_tiers.append(tier)
+        self.lowest.add()
+        self.best.add()
+        if tier not in self.tiers:
+            self.tiers[tier] = (Tournament(), [])
+        if section not in self.sections:
+            self.sections[section] = (tier, Tournament(), [])
+        tier_tournament, tier_runs = self.tiers[tier]
+        _, section_tournament, section_runs = self.sections[section]
+        tier_runs.append(run)
+        section_runs.append(run)
+        self.places.append((tier_tournament.add(), section_tournament.add()))
+
+    def remove_last_section(self):
+        # Undo the latest add_section; its run must have no free seats
+        run = len(self.starts) - 1
+        section, tier = self.run_sections.pop(), self.run_tiers.pop()
+        for tournament, runs in (self.tiers[tier], self.sections[section][1:]):
+            tournament.pop()
+            runs.pop()
+        if not self.tiers[tier][1]:
+            del self.tiers[tier]
+        if not self.sections[section][2]:
+            del self.sections[section]
+        self.lowest.pop()
+        self.best.pop()
+        del self.starts[run], self.ends[run], self.pools[run], self.places[run]
+
+    def convert(self, seat_pool):
+        # Move every run's free seats into a pool of class seat_pool, which later runs use too
+        self.seat_pool = seat_pool
+        for run, pool in enumerate(self.pools):
+            if not isinstance(pool, seat_pool):
+                self.pools[run] = seat_pool()
+                for first, last in pool.free_runs():
+                    self.pools[run].insert_range(first, last)
+
+    def section_tier(self, section):
+        # Return the tier of a section, or None if it does not exist
+        entry = self.sections.get(section)
+        return None if entry is None else entry[0]
+
+    def section_of(self, seat):
+        # Return the (section, tier) a seat belongs to
+        run = bisect_right(self.starts, seat) - 1
+        return self.run_sections[run], self.run_tiers[run]
+
+    def _opened(self, run, is_open):
+        # Enter a run into its tournaments, or take it out, when it gains its first free seat or loses its last
+        tier = self.run_tiers[run]
+        tier_place, section_place = self.places[run]
+        self.lowest.update(run, run if is_open else None)
+        self.best.update(run, ((tier or self.GENERAL_TIER), run) if is_open else None)
+        self.tiers[tier][0].update(tier_place, run if is_open else None)
+        self.sections[self.run_sections[run]][1].update(section_place, run if is_open else None)
+
+    def _pieces(self, first, last):
+        # Split first..last into (run, local first, local last) at run boundaries
+        run = bisect_right(self.starts, first) - 1
+        while first <= last:
+            piece_last = min(last, self.ends[run])
+            offset = self.starts[run] - 1
+            yield run, first - offset, piece_last - offset
+            first = piece_last + 1
+            run += 1
+
+    def insert(self, seat):
+        """
+        Return a single seat to its run's pool.
+        Args:
+            seat: The seat to insert
+        """
+        run = bisect_right(self.starts, seat) - 1
+        pool = self.pools[run]
+        before = len(pool)
+        pool.insert(seat - self.starts[run] + 1)
+        self._count += len(pool) - before
+        if not before:
+            self._opened(run, True)
+
+    def insert_range(self, first, last):
+        """
+        Add the seats first..last (inclusive), one range per run they cover.
+        Args:
+            first: The first seat to insert
+            last: The last seat to insert
+        """
+        for run, local_first, local_last in self._pieces(first, last):
+            pool = self.pools[run]
+            before = len(pool)
+            pool.insert_range(local_first, local_last)
+            self._count += local_last - local_first + 1
+            if not before:
+                self._opened(run, True)
+
+    def discard_range(self, first, last):
+        """
+        Remove the seats first..last (inclusive), which must all be free.
+        Args:
+            first: The first seat to remove
+            last: The last seat to remove
+        """
+        for run, local_first, local_last in self._pieces(first, last):
+            pool = self.pools[run]
+            pool.discard_range(local_first, local_last)
+            self._count -= local_last - local_first + 1
+            if not pool:
+                self._opened(run, False)
+
+    def _extract(self, run):
+        # Take the lowest free seat of a run, or return None if run is -1
+        if run < 0:
+            return None
+        pool = self.pools[run]
+        seat = pool.extract_min() + self.starts[run] - 1
+        self._count -= 1
+        if not pool:
+            self._opened(run, False)
+        return seat
+
+    def extract_min(self):
+        #Remove and return the lowest free seat, or None if the pool is empty.
+        return self._extract(self.lowest.winner())
+
+    def extract_best(self):
+        # Remove and return the lowest free seat of the best tier that has one, or None.
+        return self._extract(self.best.winner())
+
+    def extract_tier(self, tier):
+        # Remove and return the lowest free seat in the given tier, or None.
+        tournament, runs = self.tiers[tier]
+        player = tournament.winner()
+        return self._extract(runs[player] if player >= 0 else -1)
+
+    def extract_section(self, section):
+        # Remove and return the lowest free seat in the given section, or None.
+        _, tournament, runs = self.sections[section]
+        player = tournament.winner()
+        return self._extract(runs[player] if player >= 0 else -1)
+
+    def take_lowest(self, k):
+        """
+        Remove the k lowest free seats, or all of them if there are fewer, run by run.
+        Args:
+            k: Number of seats to take
+        Returns: list: The seats in ascending order
+        """
+        seats = []
+        while len(seats) < k:
+            run = self.lowest.winner()
+            if run < 0:
+                break
+            pool, offset = self.pools[run], self.starts[run] - 1
+            taken = pool.take_lowest(k - len(seats))
+            seats.extend(seat + offset for seat in taken)
+            self._count -= len(taken)
+            if not pool:
+                self._opened(run, False)
+        return seats
+
+    def take_block(self, k):
+        """
+        Remove the lowest-numbered run of k adjacent free seats inside one
+        section run, asking the runs in seat order. O(runs) plus the pool's own search.
+        Args:
+            k: Number of adjacent seats needed
+        Returns the first seat of the block, or None if no run is long enough
+        """
+        for run, pool in enumerate(self.pools):
+            if len(pool) >= k:
+                first = pool.take_block(k)
+                if first is not None:
+                    self._count -= k
+                    if not pool:
+                        self._opened(run, False)
+                    return first + self.starts[run] - 1
+        return None
+
+    def free_runs(self):
+        # Yield the free seats as (first, last) runs in ascending order.
+        for start, pool in zip(self.starts, self.pools):
+            for first, last in pool.free_runs():
+                yield first + start - 1, last + start - 1
+
+    def memory_usage(self):
+        # Approximate bytes held by the run pools and the per-run lists.
+        return sum(pool.memory_usage() for pool in self.pools) + 8 * 8 * len(self.pools)
+
+    def __len__(self):
+        #Return the number of free seats.
+        return self._count
+
+class MaxHeap:
+    # Implements a max heap data structure.
+    def __init__(self, key_index=2):
+        #Initialise an empty max heap
+        #key_index: The item field used to look up entries (the user id for waitlist entries).
+        #A key may have several items; lookups by key act on its best one, the item extract_max
+        #would reach first. Items are told apart by item[1], their unique arrival sequence number.
+        self.heap = []
+        self.key_index = key_index
+        self.position = {}  # Maps each item's sequence number to its index in self.heap
+        self.sequences = {}  # Maps item[key_index] to the sequence numbers of its items
+
+    def parent(self, i):
+        # Return the parent index of a given index.
+        return (i - 1) // 2
+
+    def left_child(self, i):
+        # Return the left child index of a given index.
+        return 2 * i + 1
+
+    def right_child(self, i):
+        # Return the right child index of a given index.
+        return 2 * i + 2
+
+    def swap(self, i, j):
+        #Swap two elements in the heap and keep the position index current.
+        self.heap[i], self.heap[j] = self.heap[j], self.heap[i]
+        self.position[self.heap[i][1]] = i
+        self.position[self.heap[j][1]] = j
+
+    def insert(self, item):
+        # Insert a new item into the heap.
+        # Args: item: The item to be inserted
+        self.heap.append(item)
+        self.position[item[1]] = len(self.heap) - 1
+        self.sequences.setdefault(item[self.key_index], []).append(item[1])
+        self._sift_up(len(self.heap) - 1)
+
+    def insert_many(self, items):
+        """
+        Insert a batch of items. A batch at least as large as the heap is
+        appended and the whole heap rebuilt in O(n + k) instead of k sifts.
+        Args:
+            items: The items to insert
+        """
+        if len(items) < len(self.heap):
+            for item in items:
+                self.insert(item)
+            return
+        self.heap.extend(items)
+        self._heapify()
+
+    def extract_max(self):
+        """
+        Remove and return the maximum element from the heap.
+        Returns the maximum element, or None if the heap is empty
+        """
+        if not self.heap:
+            return None
+        return self._remove_at(0)
+
+    def peek(self):
+        # Return the maximum element without removing it, or None if the heap is empty.
+        return self.heap[0] if self.heap else None
+
+    def _sift_up(self, i):
+        # Restore the heap property by moving an element up the heap.
+        parent = self.parent(i)
+        if i > 0 and self._compare(self.heap[i], self.heap[parent]) > 0:
+            self.swap(i, parent)
+            self._sift_up(parent)
+
+    def _sift_down(self, i):
+        # Restore the heap property by moving an element down the heap.
+        max_index = i
+        left = self.left_child(i)
+        right = self.right_child(i)
+        if left < len(self.heap) and self._compare(self.heap[left], self.heap[max_index]) > 0:
+            max_index = left
+        if right < len(self.heap) and self._compare(self.heap[right], self.heap[max_index]) > 0:
+            max_index = right
+        if i != max_index:
+            self.swap(i, max_index)
+            self._sift_down(max_index)
+
+    def _compare(self, a, b):
+        """
+        Compare two elements in the heap.
+        Args:
+            a, b: The elements to compare
+        Returns a positive value if a > b, negative if a < b, and 0 if equal
+        """
+        if a[0] != b[0]:  # Compare priorities
+            return a[0] - b[0]
+        return b[1] - a[1]  # If priorities are equal, compare sequence numbers (earlier arrival has higher priority)
+
+    def _best(self, key):
+        # Return the index of the key's best item, or None. O(1) for a key with one item
+        sequences = self.sequences.get(key)
+        if sequences is None:
+            return None
+        if len(sequences) == 1:
+            return self.position[sequences[0]]
+        heap, position = self.heap, self.position
+        return position[max(sequences, key=lambda sequence: (heap[position[sequence]][0], -sequence))]
+
+    def _remove_at(self, i):
+        # Remove and return the item at index i, keeping the heap valid
+        item = self.heap[i]
+        del self.position[item[1]]
+        sequences = self.sequences[item[self.key_index]]
+        sequences.remove(item[1])
+        if not sequences:
+            del self.sequences[item[self.key_index]]
+        last_item = self.heap.pop()
+        if i < len(self.heap):
+            self.heap[i] = last_item
+            self.position[last_item[1]] = i
+            self._sift_up(i)
+            self._sift_down(self.position[last_item[1]])
+        return item
+
+    def contains(self, key):
+        # Return True if an item with the given key is in the heap. O(1)
+        return key in self.sequences
+
+    def get(self, key):
+        # Return the best item stored under the given key, or None. O(1) for a key with one item
+        i = self._best(key)
+        return self.heap[i] if i is not None else None
+
+    def entries(self, key):
+        # Return every item stored under the given key
+        return [self.heap[self.position[sequence]] for sequence in self.sequences.get(key, ())]
+
+    def replace(self, key, item):
+        """
+        Replace the best item stored under key and restore the heap property in O(log n).
+        Args:
+            key: The key of the item to replace
+            item: The new item, which must carry the same key
+        Returns True if the key was found and replaced, False otherwise
+        """
+        i = self._best(key)
+        if i is None:
+            return False
+        old = self.heap[i]
+        if old[1] != item[1]:
+            del self.position[old[1]]
+            sequences = self.sequences[key]
+            sequences[sequences.index(old[1])] = item[1]
+        self.heap[i] = item
+        self.position[item[1]] = i
+        self._sift_up(i)
+        self._sift_down(self.position[item[1]])
+        return True
+
+    def remove(self, value, key_index=None):
+        #Remove the best item with a specific key from the heap and return it, or None.
+        #Lookups on the indexed key take O(log n); any other field falls back to a linear scan.
+        if key_index is None or key_index == self.key_index:
+            i = self._best(value)
+        else:
+            i = next((j for j, item in enumerate(self.heap) if item[key_index] == value), None)
+        if i is None:
+            return None
+        return self._remove_at(i)
+
+    def discard(self, item):
+        # Remove this exact item. Returns True if it was in the heap, False otherwise
+        i = self.position.get(item[1])
+        if i is None or self.heap[i] != item:
+            return False
+        self._remove_at(i)
+        return True
+
+    def remove_range(self, lo, hi, skip=()):
+        """
+        Remove the best item of every key in [lo, hi] except those in skip, keeping the heap valid.
+        Narrow ranges are removed key by key through the index in O(r log n);
+        wide ones filter the array once and re-heapify in O(n).
+        Args:
+            lo: Lower bound of the key range (inclusive)
+            hi: Upper bound of the key range (inclusive)
+            skip: Keys to leave alone
+        Returns a list of the removed items in key order
+        """
+        sequences = self.sequences
+        if hi - lo + 1 <= len(sequences):
+            return [self.remove(key) for key in range(lo, hi + 1) if key in sequences and key not in skip]
+        heap = self.heap
+        keys = sorted(key for key in sequences if lo <= key <= hi and key not in skip)
+        removed = [heap[self._best(key)] for key in keys]
+        drop = {item[1] for item in removed}
+        self.heap = [item for item in heap if item[1] not in drop]
+        self._heapify()
+        return removed
+
+    def _heapify(self):
+        # Rebuild both indexes and restore the heap property bottom-up in O(n).
+        self.position = {item[1]: i for i, item in enumerate(self.heap)}
+        self.sequences = {}
+        k = self.key_index
+        for item in self.heap:
+            self.sequences.setdefault(item[k], []).append(item[1])
+        for i in range(len(self.heap) // 2 - 1, -1, -1):
+            self._sift_down(i)
+
+    def items(self):
+        # Return a copy of the stored items in heap-array order.
+        return list(self.heap)
+
+    def load(self, items):
+        """
+        Replace the contents with items in O(n). An array that is already in heap
+        order, such as a saved self.heap, keeps its exact layout.
+        Args:
+            items: The items to store
+        """
+        self.heap = list(items)
+        self._heapify()
+
+    def memory_usage(self):
+        # Approximate bytes held by the heap, its entry tuples and both indexes.
+        entry = sys.getsizeof(self.heap[0]) + 3 * 28 if self.heap else 0
+        return (sys.getsizeof(self.heap) + len(self.heap) * entry + sys.getsizeof(self.position)
+                + sys.getsizeof(self.sequences) + len(self.sequences) * 64)
+
+    def __len__(self):
+        # Return the number of elements in the heap.
+        return len(self.heap)
+
+
+class HeapqWaitlist:
+    """
+    Waitlist with the same interface and ordering as MaxHeap, built on the C heapq
+    functions. Each (priority, sequence, user) entry is packed into one int,
+    -priority * 2**SEQUENCE_BITS + sequence, so the smallest key is the highest
+    priority and, among equal priorities, the earliest arrival. A user may wait
+    more than once; lookups by user act on their smallest key. Removed and
+    re-prioritised entries are deleted lazily and skipped when they surface.
+    """
+    SEQUENCE_BITS = 40
+    SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+
+    def __init__(self, key_index=2):
+        #Initialise an empty waitlist. Entries are always looked up by user id.
+        self.heap = []  # Packed keys, including stale ones
+        self.keys = {}  # User id -> their live packed keys
+        self.users = {}  # Live packed key -> user id
+
+    def _pack(self, item):
+        # Pack a (priority, sequence, user) item into a sortable int key
+        return (-item[0] << self.SEQUENCE_BITS) + item[1]
+
+    def _unpack(self, key):
+        # Rebuild the (priority, sequence, user) item of a live key
+        return (-(key >> self.SEQUENCE_BITS), key & self.SEQUENCE_MASK, self.users[key])
+
+    def _forget(self, key):
+        # Drop a live key, leaving it in the heap as stale; returns its item
+        item = self._unpack(key)
+        del self.users[key]
+        keys = self.keys[item[2]]
+        keys.remove(key)
+        if not keys:
+            del self.keys[item[2]]
+        return item
+
+    def insert(self, item):
+        # Insert a (priority, sequence, user) item.
+        key = self._pack(item)
+        self.keys.setdefault(item[2], []).append(key)
+        self.users[key] = item[2]
+        heapq.heappush(self.heap, key)
+
+    def insert_many(self, items):
+        # Insert a batch of items; one at least as large as the heap is appended and heapified in O(n + k).
+        keys, users = self.keys, self.users
+        packed = []
+        for item in items:
+            key = self._pack(item)
+            keys.setdefault(item[2], []).append(key)
+            users[key] = item[2]
+            packed.append(key)
+        if len(packed) < len(self.heap):
+            for key in packed:
+                heapq.heappush(self.heap, key)
+        else:
+            self.heap.extend(packed)
+            heapq.heapify(self.heap)
+
+    def extract_max(self):
+        """
+        Remove and return the highest-priority item, skipping stale keys.
+        Returns the item, or None if the waitlist is empty
+        """
+        heap, users = self.heap, self.users
+        while heap:
+            key = heapq.heappop(heap)
+            if key in users:
+                return self._forget(key)
+        return None
+
+    def peek(self):
+        # Return the highest-priority item without removing it, dropping stale keys on top.
+        heap, users = self.heap, self.users
+        while heap and heap[0] not in users:
+            heapq.heappop(heap)
+        return self._unpack(heap[0]) if heap else None
+
+    def contains(self, key):
+        # Return True if the user is waitlisted. O(1)
+        return key in self.keys
+
+    def get(self, key):
+        # Return the user's best (priority, sequence, user) item, or None. O(1) for a user waiting once
+        keys = self.keys.get(key)
+        return self._unpack(min(keys)) if keys is not None else None
+
+    def entries(self, key):
+        # Return every item of the user
+        return [self._unpack(packed) for packed in self.keys.get(key, ())]
+
+    def replace(self, key, item):
+        """
+        Replace the user's best item in O(log n); the old key is left behind as stale.
+        Args:
+            key: The user id
+            item: The new (priority, sequence, user) item
+        Returns True if the user was found and replaced, False otherwise
+        """
+        keys = self.keys.get(key)
+        if keys is None:
+            return False
+        self._forget(min(keys))
+        self.insert(item)
+        self._compact()
+        return True
+
+    def remove(self, value, key_index=None):
+        #Remove a user's best item and return it, or None. Matching on another field falls back to a linear scan.
+        if key_index is not None and key_index != 2:
+            packed = next((key for key in self.users if self._unpack(key)[key_index] == value), None)
+        else:
+            keys = self.keys.get(value)
+            packed = min(keys) if keys is not None else None
+        if packed is None:
+            return None
+        item = self._forget(packed)
+        self._compact()
+        return item
+
+    def discard(self, item):
+        # Remove this exact item. Returns True if it was waiting, False otherwise
+        key = self._pack(item)
+        if self.users.get(key) != item[2]:
+            return False
+        self._forget(key)
+        self._compact()
+        return True
+
+    def remove_range(self, lo, hi, skip=()):
+        """
+        Remove the best item of every user id in [lo, hi] except those in skip,
+        as MaxHeap.remove_range does.
+        Returns a list of the removed items in user order
+        """
+        keys = self.keys
+        if hi - lo + 1 <= len(keys):
+            targets = [user_id for user_id in range(lo, hi + 1) if user_id in keys and user_id not in skip]
+        else:
+            targets = sorted(user_id for user_id in keys if lo <= user_id <= hi and user_id not in skip)
+        removed = [self._forget(min(keys[user_id])) for user_id in targets]
+        self._compact()
+        return removed
+
+    def _compact(self):
+        # Drop stale keys once they outnumber live ones, keeping memory and pops bounded
+        if len(self.heap) > 2 * len(self.users) + 64:
+            self.heap = list(self.users)
+            heapq.heapify(self.heap)
+
+    def items(self):
+        # Return the live (priority, sequence, user) items in no particular order.
+        return [self._unpack(key) for key in self.users]
+
+    def load(self, items):
+        # Replace the contents with items in O(n).
+        self.heap, self.keys, self.users = [], {}, {}
+        for item in items:
+            key = self._pack(item)
+            self.keys.setdefault(item[2], []).append(key)
+            self.users[key] = item[2]
+            self.heap.append(key)
+        heapq.heapify(self.heap)
+
+    def memory_usage(self):
+        # Approximate bytes held by the key heap and both dictionaries.
+        return (sys.getsizeof(self.heap) + len(self.heap) * 32
+                + sys.getsizeof(self.keys) + sys.getsizeof(self.users) + len(self.users) * 28 + len(self.keys) * 64)
+
+    def __len__(self):
+        # Return the number of waiting entries.
+        return len(self.users)
+
+
+class RankedWaitlist:
+    """
+    Wraps a waitlist (MaxHeap or HeapqWaitlist) and mirrors it in an
+    OrderStatisticTree keyed on (-priority, sequence), the waitlist's own
+    order, so a user's position and the top k users are answered in O(log n)
+    and O(k + log n). The tree is built on the first rank query and kept in
+    step from then on, so workloads that never ask pay almost nothing.
+    """
+    def __init__(self, waitlist):
+        #Wrap an empty waitlist
+        self.waitlist = waitlist
+        self.ranks = None  # OrderStatisticTree of (-priority, sequence) -> user, once built
+
+    def _ranks(self):
+        # Return the rank tree, bulk-building it from the waitlist on first use
+        if self.ranks is None:
+            entries = sorted((-item[0], item[1], item[2]) for item in self.waitlist.items())
+            self.ranks = OrderStatisticTree()
+            self.ranks.build_from_sorted([entry[:2] for entry in entries], [entry[2] for entry in entries])
+        return self.ranks
+
+    def insert(self, item):
+        # Insert a (priority, sequence, user) item.
+        self.waitlist.insert(item)
+        if self.ranks is not None:
+            self.ranks.insert((-item[0], item[1]), item[2])
+
+    def insert_many(self, items):
+        # Insert a batch of (priority, sequence, user) items.
+        self.waitlist.insert_many(items)
+        if self.ranks is not None:
+            self.ranks.insert_many([((-item[0], item[1]), item[2]) for item in items])
+
+    def extract_max(self):
+        # Remove and return the highest-priority item, or None if the waitlist is empty.
+        item = self.waitlist.extract_max()
+        if item is not None and self.ranks is not None:
+            self.ranks.delete((-item[0], item[1]))
+        return item
+
+    def peek(self):
+        # Return the highest-priority item without removing it, or None.
+        return self.waitlist.peek()
+
+    def contains(self, key):
+        # Return True if the user is waitlisted.
+        return self.waitlist.contains(key)
+
+    def get(self, key):
+        # Return the user's best (priority, sequence, user) item, or None.
+        return self.waitlist.get(key)
+
+    def entries(self, key):
+        # Return every item of the user.
+        return self.waitlist.entries(key)
+
+    def replace(self, key, item):
+        # Replace the user's best item, moving its rank tree entry to the new key.
+        old = self.waitlist.get(key)
+        if not self.waitlist.replace(key, item):
+            return False
+        if self.ranks is not None:
+            self.ranks.delete((-old[0], old[1]))
+            self.ranks.insert((-item[0], item[1]), key)
+        return True
+
+    def remove(self, value, key_index=None):
+        # Remove a user's best item and return it, or None.
+        item = self.waitlist.remove(value, key_index)
+        if item is not None and self.ranks is not None:
+            self.ranks.delete((-item[0], item[1]))
+        return item
+
+    def discard(self, item):
+        # Remove this exact item. Returns True if it was waiting, False otherwise
+        if not self.waitlist.discard(item):
+            return False
+        if self.ranks is not None:
+            self.ranks.delete((-item[0], item[1]))
+        return True
+
+    def remove_range(self, lo, hi, skip=()):
+        """
+        Remove the best item of every user id in [lo, hi] except those in skip.
+        Returns a list of the removed items in user order
+        """
+        removed = self.waitlist.remove_range(lo, hi, skip)
+        if self.ranks is not None:
+            for item in removed:
+                self.ranks.delete((-item[0], item[1]))
+        return removed
+
+    def position(self, key):
+        # Return the 1-based place of the user's best item in the waitlist, or None if not waitlisted.
+        item = self.waitlist.get(key)
+        if item is None:
+            return None
+        return self._ranks().rank((-item[0], item[1])) + 1
+
+    def top(self, k):
+        # Return the k highest-priority (priority, sequence, user) items in waitlist order.
+        result = []
+        for (negative_priority, sequence), user_id in self._ranks().items():
+            if len(result) == k:
+                break
+            result.append((-negative_priority, sequence, user_id))
+        return result
+
+    def items(self):
+        # Return the waitlisted (priority, sequence, user) items.
+        return self.waitlist.items()
+
+    def load(self, items):
+        # Replace the contents with items; the rank tree is rebuilt on the next query.
+        self.waitlist.load(items)
+        self.ranks = None
+
+    def memory_usage(self):
+        # Approximate bytes held by the waitlist and, once built, the rank tree.
+        return self.waitlist.memory_usage() + (self.ranks.memory_usage() if self.ranks is not None else 0)
+
+    def __len__(self):
+        # Return the number of waiting entries.
+        return len(self.waitlist)
+
+
+class SeatIndex:
+    """
+    Dense seat -> user map backed by an array indexed by seat number.
+    Lookups and updates are O(1), and walking it yields reservations in
+    seat order in O(seats) without sorting. It grows with the seat count.
+    """
+    NO_USER = -1
+
+    def __init__(self):
+        #Initialise an index with no seats
+        self.owner = array('q')
+        self.count = 0  # Number of seats currently held
+
+    def grow(self, last_seat):
+        # Make room for seats up to and including last_seat.
+        missing = last_seat + 1 - len(self.owner)
+        if missing > 0:
+            self.owner.extend(array('q', [self.NO_USER]) * missing)
+
+    def insert(self, seat_id, user_id):
+        # Record that user_id holds seat_id.
+        if self.owner[seat_id] == self.NO_USER:
+            self.count += 1
+        self.owner[seat_id] = user_id
+
+    def insert_many(self, pairs):
+        # Record a batch of (seat, user) pairs.
+        owner, no_user = self.owner, self.NO_USER
+        for seat_id, user_id in pairs:
+            if owner[seat_id] == no_user:
+                self.count += 1
+            owner[seat_id] = user_id
+
+    def delete(self, seat_id):
+        # Mark seat_id as not held. Returns True if it was held.
+        if 0 <= seat_id < len(self.owner) and self.owner[seat_id] != self.NO_USER:
+            self.owner[seat_id] = self.NO_USER
+            self.count -= 1
+            return True
+        return False
+
+    def search(self, seat_id):
+        # Return the user holding seat_id, or None.
+        if 0 <= seat_id < len(self.owner):
+            user_id = self.owner[seat_id]
+            if user_id != self.NO_USER:
+                return user_id
+        return None
+
+    def items(self):
+        # Iterate over (seat, user) pairs in seat order.
+        no_user = self.NO_USER
+        for seat_id, user_id in enumerate(self.owner):
+            if user_id != no_user:
+                yield seat_id, user_id
+
+    def memory_usage(self):
+        # Bytes held by the owner array.
+        return self.owner.itemsize * len(self.owner)
+
+    def __len__(self):
+        # Return the number of seats currently held.
+        return self.count
+
+
+class TimerWheel:
+    """
+    Hierarchical timer wheel on an integer clock. Level L has SLOTS buckets of
+    SLOTS**L ticks each; a timer is filed in the coarsest level its delay
+    needs and moves down a level each time its bucket comes round, so
+    scheduling is O(1) and each timer is touched at most LEVELS times however
+    many expire together. Timers beyond the top level's range are simply
+    filed again when their bucket comes round early.
+    """
+    BITS = 8
+    SLOTS = 1 << BITS
+    LEVELS = 4
+
+    def __init__(self, now=0):
+        #Initialise an empty wheel at clock value now
+        self.time = now
+        self.wheels = [[[] for _ in range(self.SLOTS)] for _ in range(self.LEVELS)]
+        self.count = 0
+
+    def schedule(self, key, expiry):
+        """
+        Fire key when the clock reaches expiry (or on the next tick if that has passed).
+        The timer fires as (expiry, key) either way.
+        Args:
+            key: Value returned when the timer fires
+            expiry (int): Clock value to fire at
+        """
+        self._file(key, expiry, max(expiry, self.time + 1))
+        self.count += 1
+
+    def _file(self, key, expiry, due=None):
+        # Put a timer in the bucket of the coarsest level that its remaining delay up to due
+        # (expiry unless that has passed) needs
+        if due is None:
+            due = expiry
+        delay = due - self.time
+        level = 0
+        while level < self.LEVELS - 1 and delay >= 1 << (self.BITS * (level + 1)):
+            level += 1
+        self.wheels[level][(due >> (self.BITS * level)) & (self.SLOTS - 1)].append((expiry, key))
+
+    def advance(self, now):
+        """
+        Move the clock forward to now, one tick at a time while timers are pending.
+        Args:
+            now (int): New clock value
+        Returns: list: (expiry, key) pairs of the timers that fired, tick by tick
+        """
+        fired = []
+        while self.time < now:
+            if not self.count:
+                self.time = now
+                break
+            self.time += 1
+            t = self.time
+            # Pour every higher-level bucket that starts at this tick into the levels below
+            level = 1
+            while level < self.LEVELS and not t & ((1 << (self.BITS * level)) - 1):
+                bucket = self.wheels[level][(t >> (self.BITS * level)) & (self.SLOTS - 1)]
+                if bucket:
+                    self.wheels[level][(t >> (self.BITS * level)) & (self.SLOTS - 1)] = []
+                    for expiry, key in bucket:
+                        self._file(key, expiry)
+                level += 1
+            slot = t & (self.SLOTS - 1)
+            due = self.wheels[0][slot]
+            if due:
+                self.wheels[0][slot] = []
+                self.count -= len(due)
+                fired.extend(due)
+        return fired
+
+    def __len__(self):
+        # Return the number of pending timers.
+        return self.count
+
+
+_MISSING = object()
+
+
+def _restore_key(data, key, value):
+    # Put a dict entry back to value, or remove it if it did not exist
+    if value is _MISSING:
+        data.pop(key, None)
+    else:
+        data[key] = value
+
+
+def _truncate(seat_index, length):
+    # Undo SeatIndex.grow; the seats beyond length are all free again by now
+    del seat_index.owner[length:]
+
+
+def _restore_seats(seat_index, previous):
+    # Undo SeatIndex.insert_many from the (seat, previous user) pairs it overwrote
+    for seat_id, user_id in reversed(previous):
+        if user_id is None:
+            seat_index.delete(seat_id)
+        else:
+            seat_index.insert(seat_id, user_id)
+
+
+def _return_seats(pool, seats):
+    # Undo take_lowest: give the ascending seats back to the pool one run at a time
+    i = 0
+    while i < len(seats):
+        j = i
+        while j + 1 < len(seats) and seats[j + 1] == seats[j] + 1:
+            j += 1
+        pool.insert_range(seats[i], seats[j])
+        i = j + 1
+
+
+def _restore_entries(store, pairs):
+    # Undo a store deletion: put back every pair of the keys it touched, in their original order
+    keys = list(dict.fromkeys(key for key, _ in pairs))
+    for key in keys:
+        while store.search(key) is not None:
+            store.delete(key)
+    for key, value in pairs:
+        store.insert(key, value)
+
+
+def _delete_items(store, pairs):
+    # Undo insert_many on the reservation store
+    for key, value in pairs:
+        store.delete_item(key, value)
+
+
+def _discard_items(waitlist, items):
+    # Undo insert_many on a waitlist
+    for item in items:
+        waitlist.discard(item)
+
+
+def _call(structure, name, *args):
+    # Run a structure method as it is bound when the undo runs, so a change feed sees it
+    return getattr(structure, name)(*args)
+
+
+class _StructureHooks:
+    """
+    Base for UndoLog and ChangeFeed: wraps mutating methods of the system's
+    structures on the instance, so the outermost call of each goes through a
+    recorder, and takes the wrappers off again. Hooks stack: a method that is
+    already wrapped is wrapped again, and unhooking takes out only this hook's
+    wrapper, whether it is still the outermost one or another hook wrapped it since.
+    """
+    def __init__(self):
+        self.depth = 0  # Recorded calls in progress; calls a structure makes to itself are covered by the outer one
+        self.hooked = []  # (structure, method name, wrapper)
+
+    def _hook(self, structure, recorders):
+        # Wrap each named method of structure with its recorder
+        for name, recorder in recorders.items():
+            wrapper = self._recording(recorder, structure, getattr(structure, name), structure.__dict__.get(name))
+            self.hooked.append((structure, name, wrapper))
+            setattr(structure, name, wrapper)
+
+    def _recording(self, recorder, structure, method, previous):
+        # Wrap a structure method so only the outermost call is recorded; link holds the
+        # wrapped method and the instance attribute it replaced (or None), for unhooking
+        link = [method, previous]
+        def recorded(*args, **kwargs):
+            if self.depth:
+                return link[0](*args, **kwargs)
+            self.depth += 1
+            try:
+                return recorder(structure, link[0], *args, **kwargs)
+            finally:
+                self.depth -= 1
+        recorded.link = link
+        return recorded
+
+    def _unhook(self):
+        # Remove the wrappers, newest first
+        for structure, name, wrapper in reversed(self.hooked):
+            current = structure.__dict__.get(name)
+            if current is wrapper:
+                previous = wrapper.link[1]
+                if previous is None:
+                    delattr(structure, name)
+                else:
+                    setattr(structure, name, previous)
+                continue
+            # A later hook wrapped this one: splice it out of the chain
+            while current.link[1] is not wrapper:
+                current = current.link[1]
+            current.link[:] = wrapper.link
+        self.hooked = []
+
+
+class _RecordingDict:
+    """
+    Stands in for one of GatorTicketMaster's dicts while a transaction is open,
+    logging the previous value of each key before changing it.
+    """
+    def __init__(self, data, undo):
+        self.data = data
+        self.undo = undo
+        self.touched = set()  # Keys changed during the transaction
+
+    def _save(self, key):
+        self.undo.append((_restore_key, (self.data, key, self.data.get(key, _MISSING))))
+        self.touched.add(key)
+
+    def __setitem__(self, key, value):
+        self._save(key)
+        self.data[key] = value
+
+    def __delitem__(self, key):
+        self._save(key)
+        del self.data[key]
+
+    def pop(self, key, *default):
+        if key in self.data:
+            self._save(key)
+        return self.data.pop(key, *default)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def keys(self):
+        return self.data.keys()
+
+    def values(self):
+        return self.data.values()
+
+    def items(self):
+        return self.data.items()
+
+
+class UndoLog(_StructureHooks):
+    """
+    Undo log behind Begin/Commit/Rollback. While a transaction is open, the
+    mutating methods of the reservation store, seat index, seat pool and every
+    waitlist are wrapped on the instance, as Instrumentation wraps command
+    methods, and each call appends the calls that reverse it. The inverses go
+    through the methods as bound at Rollback, so a ChangeFeed reports them too.
+    The block, block request, hold and section waitlist dicts are swapped for
+    recording views, and last_seat_number, next_sequence and the seat pool
+    itself, with its class, are saved at Begin. Rollback runs the inverses newest first, so it
+    costs O(work done in the transaction) whatever the size of the state;
+    Commit just drops the log. Nothing is wrapped between transactions.
+    Rollback restores the reservations a user holds, in booking order, but not
+    the shape of the reservation tree, which can decide which of several
+    reservations a later Cancel or ReleaseSeats reaches first.
+    """
+    DICTS = ('blocks', 'block_requests', 'holds', 'section_waitlists', 'tier_waitlists')
+
+    def __init__(self, gator_tm):
+        """
+        Open a transaction on gator_tm.
+        Args:
+            gator_tm (GatorTicketMaster): The system to record
+        """
+        super().__init__()
+        self.gator_tm = gator_tm
+        self.undo = []  # (function, args) pairs, run in reverse order by rollback
+        self.last_seat_number = gator_tm.last_seat_number
+        self.next_sequence = gator_tm.next_sequence
+        self.available_seats = gator_tm.available_seats  # The first InitializeSection or ReserveBlock replaces it
+        self.seat_pool = gator_tm.seat_pool
+        self._hook(gator_tm.reservations, {
+            'insert': self._store_insert, 'delete': self._store_delete,
+            'delete_item': self._store_delete, 'delete_range': self._store_delete_range,
+            'insert_many': self._store_insert_many})
+        self._hook(gator_tm.seat_index, {
+            'insert': self._index_insert, 'delete': self._index_delete,
+            'insert_many': self._index_insert_many, 'grow': self._index_grow})
+        pool_recorders = {
+            'insert': self._pool_insert, 'insert_range': self._pool_insert_range,
+            'extract_min': self._pool_extract_min, 'take_block': self._pool_take_block,
+            'take_lowest': self._pool_take_lowest}
+        if isinstance(gator_tm.available_seats, SectionedSeatPool):
+            pool_recorders.update({
+                'extract_best': self._pool_extract_min, 'extract_tier': self._pool_extract_min,
+                'extract_section': self._pool_extract_min, 'add_section': self._pool_add_section})
+        self._hook(gator_tm.available_seats, pool_recorders)
+        for waitlist in gator_tm._waitlists():
+            self.follow(waitlist)
+        for name in self.DICTS:
+            setattr(gator_tm, name, _RecordingDict(getattr(gator_tm, name), self.undo))
+
+    def follow(self, waitlist):
+        # Record the changes to a waitlist, including one created during the transaction
+        self._hook(waitlist, {
+            'insert': self._waitlist_insert, 'insert_many': self._waitlist_insert_many,
+            'extract_max': self._waitlist_extract_max, 'replace': self._waitlist_replace,
+            'remove': self._waitlist_remove, 'discard': self._waitlist_discard,
+            'remove_range': self._waitlist_remove_range})
+
+    def _detach(self):
+        # Remove the wrappers and put the plain dicts back
+        self._unhook()
+        for name in self.DICTS:
+            setattr(self.gator_tm, name, getattr(self.gator_tm, name).data)
+
+    def commit(self):
+        # Keep every change and stop recording
+        self._detach()
+
+    def rollback(self):
+        """
+        Undo every change made since Begin, newest first, and stop recording.
+        Holds brought back by the rollback keep their original expiry. A hold
+        whose timer fired during the transaction has it filed again at that
+        expiry, which then fires on the next tick.
+        """
+        gator_tm = self.gator_tm
+        holds = gator_tm.holds
+        self._detach()
+        for function, args in reversed(self.undo):
+            function(*args)
+        gator_tm.last_seat_number = self.last_seat_number
+        gator_tm.next_sequence = self.next_sequence
+        gator_tm.available_seats = self.available_seats
+        gator_tm.seat_pool = self.seat_pool
+        timers = gator_tm.hold_timers
+        timers.advance(gator_tm.clock)
+        for seat_id in holds.touched:
+            expiry = gator_tm.holds.get(seat_id)
+            if expiry is not None and expiry <= timers.time:
+                timers.schedule(seat_id, expiry)  # A later expiry's timer is still pending
+
+    # Recorders: each runs the wrapped method and logs the calls that reverse it
+
+    def _store_insert(self, store, insert, key, value):
+        insert(key, value)
+        self.undo.append((_call, (store, 'delete_item', key, value)))
+
+    def _store_delete(self, store, delete, key, *args):
+        # Also records delete_item; a key may hold several pairs, so all of them are put back
+        pairs = list(store.items_between(key, key))
+        found = delete(key, *args)
+        if pairs:
+            self.undo.append((_restore_entries, (store, pairs)))
+        return found
+
+    def _store_delete_range(self, store, delete_range, lo, hi):
+        pairs = list(store.items_between(lo, hi))
+        deleted = delete_range(lo, hi)
+        if deleted:
+            keys = {key for key, _ in deleted}
+            self.undo.append((_restore_entries, (store, [pair for pair in pairs if pair[0] in keys])))
+        return deleted
+
+    def _store_insert_many(self, store, insert_many, pairs):
+        insert_many(pairs)
+        if pairs:
+            self.undo.append((_delete_items, (store, list(pairs))))
+
+    def _index_insert(self, index, insert, seat_id, user_id):
+        old = index.search(seat_id)
+        insert(seat_id, user_id)
+        if old is None:
+            self.undo.append((_call, (index, 'delete', seat_id)))
+        else:
+            self.undo.append((_call, (index, 'insert', seat_id, old)))
+
+    def _index_delete(self, index, delete, seat_id):
+        old = index.search(seat_id)
+        found = delete(seat_id)
+        if old is not None:
+            self.undo.append((_call, (index, 'insert', seat_id, old)))
+        return found
+
+    def _index_insert_many(self, index, insert_many, pairs):
+        pairs = list(pairs)
+        self.undo.append((_restore_seats, (index, [(seat_id, index.search(seat_id)) for seat_id, _ in pairs])))
+        insert_many(pairs)
+
+    def _index_grow(self, index, grow, last_seat):
+        length = len(index.owner)
+        grow(last_seat)
+        if len(index.owner) > length:
+            self.undo.append((_truncate, (index, length)))
+
+    def _pool_insert(self, pool, insert, seat):
+        insert(seat)
+        self.undo.append((_call, (pool, 'discard_range', seat, seat)))
+
+    def _pool_insert_range(self, pool, insert_range, first, last):
+        insert_range(first, last)
+        if first <= last:
+            self.undo.append((_call, (pool, 'discard_range', first, last)))
+
+    def _pool_extract_min(self, pool, extract_min, *args):
+        # Also records SectionedSeatPool's extract_best, extract_tier and extract_section
+        seat = extract_min(*args)
+        if seat is not None:
+            self.undo.append((_call, (pool, 'insert', seat)))
+        return seat
+
+    def _pool_add_section(self, pool, add_section, *args):
+        add_section(*args)
+        self.undo.append((_call, (pool, 'remove_last_section')))
+
+    def _pool_take_block(self, pool, take_block, k):
+        first = take_block(k)
+        if first is not None:
+            self.undo.append((_call, (pool, 'insert_range', first, first + k - 1)))
+        return first
+
+    def _pool_take_lowest(self, pool, take_lowest, k):
+        seats = take_lowest(k)
+        if seats:
+            self.undo.append((_return_seats, (pool, seats)))
+        return seats
+
+    def _waitlist_insert(self, waitlist, insert, item):
+        insert(item)
+        self.undo.append((_call, (waitlist, 'discard', item)))
+
+    def _waitlist_insert_many(self, waitlist, insert_many, items):
+        insert_many(items)
+        if items:
+            self.undo.append((_discard_items, (waitlist, list(items))))
+
+    def _waitlist_extract_max(self, waitlist, extract_max):
+        item = extract_max()
+        if item is not None:
+            self.undo.append((_call, (waitlist, 'insert', item)))
+        return item
+
+    def _waitlist_replace(self, waitlist, replace, key, item):
+        old = waitlist.get(key)
+        replaced = replace(key, item)
+        if replaced:
+            # Run newest first: take the new item out, then put the old one back
+            self.undo.append((_call, (waitlist, 'insert', old)))
+            self.undo.append((_call, (waitlist, 'discard', item)))
+        return replaced
+
+    def _waitlist_remove(self, waitlist, remove, value, key_index=None):
+        item = remove(value, key_index)
+        if item is not None:
+            self.undo.append((_call, (waitlist, 'insert', item)))
+        return item
+
+    def _waitlist_discard(self, waitlist, discard, item):
+        discarded = discard(item)
+        if discarded:
+            self.undo.append((_call, (waitlist, 'insert', item)))
+        return discarded
+
+    def _waitlist_remove_range(self, waitlist, remove_range, lo, hi, skip=()):
+        removed = remove_range(lo, hi, skip)
+        if removed:
+            self.undo.append((_call, (waitlist, 'insert_many', removed)))
+        return removed
+
+
+class ChangeFeed(_StructureHooks):
+    """
+    Incremental feed of seat and waitlist changes, so downstream readers need
+    not diff PrintReservations dumps. attach() wraps the mutating methods of the
+    seat index and every waitlist, like UndoLog does, so every path that changes
+    them (Reserve, Cancel, AddSeats, ReleaseSeats, ExitWaitlist, UpdatePriority,
+    holds expiring, Rollback) is reported. Events are tuples
+    (sequence, kind, key, value):
+        ('assign', seat, user)       seat now belongs to user
+        ('release', seat, user)      seat, held by user, is free again
+        ('join', user, priority)     user is waiting with this priority
+        ('leave', user, None)        user left a waitlist, to a seat or by request
+        ('priority', user, priority) a waiting user's priority changed
+    Priorities are effective priorities at the time of the event. A user may
+    wait more than once, so joins and leaves are counted per user.
+    Events go into a bounded ring buffer. The writer never waits for readers:
+    a subscriber that falls more than capacity events behind loses the oldest
+    ones, counted in its missed attribute, and should resync from a full dump.
+    With coalesce=True each batch (everything between flush() calls) is held
+    back and published as the net change per seat and per waiting user, so a
+    seat that changes hands repeatedly within a batch costs at most a release
+    and an assign in the ring.
+    """
+    def __init__(self, capacity=65536, coalesce=False):
+        """
+        Create an empty feed.
+        Args:
+            capacity (int): Number of events the ring buffer keeps
+            coalesce (bool): Publish the net change of each batch instead of every event
+        """
+        super().__init__()
+        self.capacity = capacity
+        self.coalesce = coalesce
+        self.ring = [None] * capacity
+        self.head = 0  # Sequence number of the next event
+        self.gator_tm = None
+        self.seats = {}  # Coalescing: seat -> owner before the batch, in order of first change
+        self.waiting = {}  # Coalescing: (waitlist, user) -> {sequence: stored priority} before the batch
+
+    def attach(self, gator_tm):
+        """
+        Start reporting the changes made to gator_tm.
+        Args:
+            gator_tm (GatorTicketMaster): The system to follow
+        """
+        self.gator_tm = gator_tm
+        if self.coalesce:
+            self._hook(gator_tm.seat_index, {
+                'insert': self._seat_touched, 'delete': self._seat_touched,
+                'insert_many': self._seats_touched})
+        else:
+            self._hook(gator_tm.seat_index, {
+                'insert': self._seat_insert, 'delete': self._seat_delete,
+                'insert_many': self._seat_insert_many})
+        for waitlist in gator_tm._waitlists():
+            self.follow(waitlist)
+        gator_tm.change_feed = self
+
+    def follow(self, waitlist):
+        # Report the changes to a waitlist, including one created after attach
+        if self.coalesce:
+            self._hook(waitlist, {
+                'insert': self._item_touched, 'insert_many': self._items_touched,
+                'extract_max': self._top_touched, 'replace': self._replace_touched,
+                'remove': self._remove_touched, 'discard': self._item_touched,
+                'remove_range': self._range_touched})
+        else:
+            self._hook(waitlist, {
+                'insert': self._waitlist_insert, 'insert_many': self._waitlist_insert_many,
+                'extract_max': self._waitlist_extract_max, 'replace': self._waitlist_replace,
+                'remove': self._waitlist_remove, 'discard': self._waitlist_discard,
+                'remove_range': self._waitlist_remove_range})
+
+    def detach(self):
+        # Stop reporting, publishing any held-back batch first
+        self.flush()
+        self._unhook()
+        self.gator_tm.change_feed = None
+
+    def subscribe(self):
+        # Return a subscription that reads the events published from now on
+        return FeedSubscription(self)
+
+    def _publish(self, kind, key, value):
+        # Append one event to the ring, overwriting the oldest once it is full
+        self.ring[self.head % self.capacity] = (self.head, kind, key, value)
+        self.head += 1
+
+    def flush(self):
+        """
+        End the current batch: with coalescing on, publish the net change of
+        every seat and waiting user touched since the last flush. Call it after
+        each batch of commands; FeedSubscription.poll calls it too.
+        """
+        if not (self.seats or self.waiting):
+            return
+        publish, owner = self._publish, self.gator_tm.seat_index.search
+        for seat_id, before in self.seats.items():
+            after = owner(seat_id)
+            if after != before:
+                if before is not None:
+                    publish('release', seat_id, before)
+                if after is not None:
+                    publish('assign', seat_id, after)
+        priority = self.gator_tm._effective_priority
+        for (waitlist, user_id), before in self.waiting.items():
+            after = {item[1]: item[0] for item in waitlist.entries(user_id)}
+            for sequence in before:
+                if sequence not in after:
+                    publish('leave', user_id, None)
+            for sequence, stored in after.items():
+                if sequence not in before:
+                    publish('join', user_id, priority(stored))
+                elif stored != before[sequence]:
+                    publish('priority', user_id, priority(stored))
+        self.seats = {}
+        self.waiting = {}
+
+    # Recorders without coalescing: each runs the wrapped method and publishes what it changed
+
+    def _seat_insert(self, index, insert, seat_id, user_id):
+        insert(seat_id, user_id)
+        self._publish('assign', seat_id, user_id)
+
+    def _seat_delete(self, index, delete, seat_id):
+        user_id = index.search(seat_id)
+        found = delete(seat_id)
+        if user_id is not None:
+            self._publish('release', seat_id, user_id)
+        return found
+
+    def _seat_insert_many(self, index, insert_many, pairs):
+        pairs = list(pairs)
+        insert_many(pairs)
+        for seat_id, user_id in pairs:
+            self._publish('assign', seat_id, user_id)
+
+    def _waitlist_insert(self, waitlist, insert, item):
+        insert(item)
+        self._publish('join', item[2], self.gator_tm._effective_priority(item[0]))
+
+    def _waitlist_insert_many(self, waitlist, insert_many, items):
+        insert_many(items)
+        priority = self.gator_tm._effective_priority
+        for item in items:
+            self._publish('join', item[2], priority(item[0]))
+
+    def _waitlist_extract_max(self, waitlist, extract_max):
+        item = extract_max()
+        if item is not None:
+            self._publish('leave', item[2], None)
+        return item
+
+    def _waitlist_replace(self, waitlist, replace, key, item):
+        replaced = replace(key, item)
+        if replaced:
+            self._publish('priority', key, self.gator_tm._effective_priority(item[0]))
+        return replaced
+
+    def _waitlist_remove(self, waitlist, remove, value, key_index=None):
+        item = remove(value, key_index)
+        if item is not None:
+            self._publish('leave', item[2], None)
+        return item
+
+    def _waitlist_discard(self, waitlist, discard, item):
+        discarded = discard(item)
+        if discarded:
+            self._publish('leave', item[2], None)
+        return discarded
+
+    def _waitlist_remove_range(self, waitlist, remove_range, lo, hi, skip=()):
+        removed = remove_range(lo, hi, skip)
+        for item in removed:
+            self._publish('leave', item[2], None)
+        return removed
+
+    # Recorders with coalescing: note the state of each seat or user before its first change in the batch
+
+    def _seat_touched(self, index, method, seat_id, *args):
+        if seat_id not in self.seats:
+            self.seats[seat_id] = index.search(seat_id)
+        return method(seat_id, *args)
+
+    def _seats_touched(self, index, insert_many, pairs):
+        pairs = list(pairs)
+        seats, search = self.seats, index.search
+        for seat_id, _ in pairs:
+            if seat_id not in seats:
+                seats[seat_id] = search(seat_id)
+        insert_many(pairs)
+
+    def _note_user(self, waitlist, user_id):
+        key = (waitlist, user_id)
+        if key not in self.waiting:
+            self.waiting[key] = {item[1]: item[0] for item in waitlist.entries(user_id)}
+
+    def _item_touched(self, waitlist, method, item):
+        # Records insert and discard
+        self._note_user(waitlist, item[2])
+        return method(item)
+
+    def _items_touched(self, waitlist, insert_many, items):
+        for item in items:
+            self._note_user(waitlist, item[2])
+        insert_many(items)
+
+    def _top_touched(self, waitlist, extract_max):
+        item = extract_max()
+        if item is not None:
+            key = (waitlist, item[2])
+            if key not in self.waiting:
+                self._note_user(waitlist, item[2])
+                self.waiting[key][item[1]] = item[0]
+        return item
+
+    def _replace_touched(self, waitlist, replace, key, item):
+        self._note_user(waitlist, key)
+        return replace(key, item)
+
+    def _remove_touched(self, waitlist, remove, value, key_index=None):
+        if key_index is None or key_index == 2:
+            self._note_user(waitlist, value)
+            return remove(value, key_index)
+        item = remove(value, key_index)
+        if item is not None:
+            key = (waitlist, item[2])
+            if key not in self.waiting:
+                self._note_user(waitlist, item[2])
+                self.waiting[key][item[1]] = item[0]
+        return item
+
+    def _range_touched(self, waitlist, remove_range, lo, hi, skip=()):
+        if hi - lo + 1 <= len(waitlist):
+            users = [user_id for user_id in range(lo, hi + 1) if waitlist.contains(user_id)]
+        else:
+            users = sorted({item[2] for item in waitlist.items() if lo <= item[2] <= hi})
+        for user_id in users:
+            if user_id not in skip:
+                self._note_user(waitlist, user_id)
+        return remove_range(lo, hi, skip)
+
+
+class FeedSubscription:
+    """
+    A reader's position in a ChangeFeed. poll() returns the events published
+    since the previous call; missed counts events that were overwritten before
+    this subscriber read them.
+    """
+    def __init__(self, feed):
+        self.feed = feed
+        self.cursor = feed.head  # Sequence number of the next event to read
+        self.missed = 0
+
+    def poll(self, limit=None):
+        """
+        Read the next events, ending the feed's current batch first.
+        Args:
+            limit (int): Most events to return; all available if omitted
+        Returns: list: Events in sequence order
+        """
+        feed = self.feed
+        feed.flush()
+        start = max(self.cursor, feed.head - feed.capacity)
+        self.missed += start - self.cursor
+        end = feed.head if limit is None else min(feed.head, start + limit)
+        ring, capacity = feed.ring, feed.capacity
+        self.cursor = end
+        return [ring[i % capacity] for i in range(start, end)]
+
+
+# Result record opcodes. With records on, command methods return (opcode, *integer fields)
+# tuples instead of text, and RESULT_FORMATS renders each one as the line text mode prints.
+RESULT_TERMINATED = 0
+RESULT_BLANK = 1
+RESULT_UNKNOWN = 2
+RESULT_INVALID_SEATS = 3
+RESULT_INVALID_USER_RANGE = 4
+RESULT_INVALID_SECTION = 5
+RESULT_INVALID_TIER = 6
+RESULT_INVALID_HOLD = 7
+RESULT_INVALID_USERS = 8
+RESULT_INVALID_SECTION_TIER = 9
+RESULT_INVALID_SEAT = 10
+RESULT_INVALID_RANGE = 11
+RESULT_INITIALIZED = 12
+RESULT_AVAILABLE = 13
+RESULT_RESERVED = 14
+RESULT_WAITLISTED = 15
+RESULT_BLOCK_RESERVED = 16
+RESULT_BLOCK_WAITLISTED = 17
+RESULT_SECTION_WAITLISTED = 18
+RESULT_TIER_WAITLISTED = 19
+RESULT_HELD = 20
+RESULT_NO_HOLD = 21
+RESULT_CONFIRMED = 22
+RESULT_HOLD_EXPIRED = 23
+RESULT_NOTHING_TO_CANCEL = 24
+RESULT_WRONG_SEAT = 25
+RESULT_CANCELED = 26
+RESULT_LEFT_WAITLIST = 27
+RESULT_NOT_WAITLISTED = 28
+RESULT_PRIORITY_UPDATED = 29
+RESULT_PRIORITY_NOT_UPDATED = 30
+RESULT_POSITION = 31
+RESULT_WAITLIST_EMPTY = 32
+RESULT_WAITLIST_ENTRY = 33
+RESULT_SEATS_ADDED = 34
+RESULT_SECTION_ADDED = 35
+RESULT_SEAT_FREE = 36
+RESULT_SEAT_OWNER = 37
+RESULT_NO_RESERVATION = 38
+RESULT_HAS_SEAT = 39
+RESULT_HAS_SEATS = 40
+RESULT_TRANSACTION_OPEN = 41
+RESULT_BEGUN = 42
+RESULT_NO_TRANSACTION = 43
+RESULT_COMMITTED = 44
+RESULT_ROLLED_BACK = 45
+RESULT_TREE = 46
+RESULT_MEMORY = 47  # Field in bytes, printed in KB
+RESULT_LATENCY_OFF = 48
+RESULT_LATENCY = 49  # Command index in COMMANDS, calls, then p50, p99 and max in ns, printed in us
+RESULT_RESERVATION = 50
+RESULT_RELEASED = 51
+
+RESULT_FORMATS = {
+    RESULT_TERMINATED: "Program Terminated!!",
+    RESULT_BLANK: "",
+    RESULT_UNKNOWN: "Unknown command",
+    RESULT_INVALID_SEATS: "Invalid input. Please provide a valid number of seats.",
+    RESULT_INVALID_USER_RANGE: "Invalid input. Please provide a valid user range.",
+    RESULT_INVALID_SECTION: "Invalid input. Please provide a valid section.",
+    RESULT_INVALID_TIER: "Invalid input. Please provide a valid tier.",
+    RESULT_INVALID_HOLD: "Invalid input. Please provide a valid hold time.",
+    RESULT_INVALID_USERS: "Invalid input. Please provide a valid number of users.",
+    RESULT_INVALID_SECTION_TIER: "Invalid input. Please provide a valid section and tier.",
+    RESULT_INVALID_SEAT: "Invalid input. Please provide a valid seat number.",
+    RESULT_INVALID_RANGE: "Invalid input. Please provide a valid range of users.",
+    RESULT_INITIALIZED: "{} Seats are made available for reservation",
+    RESULT_AVAILABLE: "Total Seats Available : {}, Waitlist : {}",
+    RESULT_RESERVED: "User {} reserved seat {}",
+    RESULT_WAITLISTED: "User {} is added to the waiting list",
+    RESULT_BLOCK_RESERVED: "User {} reserved seats {}-{}",
+    RESULT_BLOCK_WAITLISTED: "User {} is added to the waiting list for {} adjacent seats",
+    RESULT_SECTION_WAITLISTED: "User {} is added to the waiting list for section {}",
+    RESULT_TIER_WAITLISTED: "User {} is added to the waiting list for tier {}",
+    RESULT_HELD: "User {} holds seat {} for {} commands",
+    RESULT_NO_HOLD: "User {} has no hold to confirm",
+    RESULT_CONFIRMED: "User {} confirmed seat {}",
+    RESULT_HOLD_EXPIRED: "User {}'s hold on seat {} expired",
+    RESULT_NOTHING_TO_CANCEL: "User {} has no reservation to cancel",
+    RESULT_WRONG_SEAT: "User {} has no reservation for seat {}",
+    RESULT_CANCELED: "User {} canceled their reservation",
+    RESULT_LEFT_WAITLIST: "User {} is removed from the waiting list",
+    RESULT_NOT_WAITLISTED: "User {} is not in waitlist",
+    RESULT_PRIORITY_UPDATED: "User {} priority has been updated to {}",
+    RESULT_PRIORITY_NOT_UPDATED: "User {} priority is not updated",
+    RESULT_POSITION: "User {} is at position {} of {} in the waiting list",
+    RESULT_WAITLIST_EMPTY: "Waitlist is empty",
+    RESULT_WAITLIST_ENTRY: "[position {}, user {}, priority {}]",
+    RESULT_SEATS_ADDED: "Additional {} Seats are made available for reservation",
+    RESULT_SECTION_ADDED: "Section {} with {} seats (tier {}) is made available for reservation",
+    RESULT_SEAT_FREE: "Seat {} is not reserved",
+    RESULT_SEAT_OWNER: "Seat {} is reserved by user {}",
+    RESULT_NO_RESERVATION: "User {} has no reservation",
+    RESULT_HAS_SEAT: "User {} has seat {}",
+    RESULT_HAS_SEATS: "User {} has seats {}-{}",
+    RESULT_TRANSACTION_OPEN: "A transaction is already in progress",
+    RESULT_BEGUN: "Transaction started",
+    RESULT_NO_TRANSACTION: "No transaction in progress",
+    RESULT_COMMITTED: "Transaction committed",
+    RESULT_ROLLED_BACK: "Transaction rolled back",
+    RESULT_TREE: "Reservations : {}, Tree height : {}",
+    RESULT_MEMORY: "Approximate memory : {:.1f} KB",
+    RESULT_LATENCY_OFF: "Latency instrumentation is off",
+    RESULT_LATENCY: "{} : calls {}, p50 {:.1f} us, p99 {:.1f} us, max {:.1f} us",
+    RESULT_RESERVATION: "[seat {}, user {}]",
+    RESULT_RELEASED: "Reservations of the Users in the range [{}, {}] are released",
+}
+
+
+class GatorTicketMaster:
+    
+    def __init__(self, seat_pool=MinHeap, reservation_store=RedBlackTree, waitlist=MaxHeap, aging_interval=0,
+                 records=False):
+        """
+        Initialize the GatorTicketMaster system with empty data structures.
+        Args:
+            seat_pool: Class used to store free seats, MinHeap, SeatRangePool or
+                SegmentTreeSeatPool; the first block request moves to SegmentTreeSeatPool
+            reservation_store: Class used to map users to seats, RedBlackTree,
+                ArrayRedBlackTree or DenseReservationStore
+            waitlist: Class used for the waitlist, MaxHeap or HeapqWaitlist
+            aging_interval (int): If set, waitlisted users gain one priority point every
+                aging_interval clock ticks they wait
+            records (bool): Return result records, (opcode, *integer fields) tuples
+                rendered by RESULT_FORMATS, instead of formatted text
+        """
+        self.seat_pool = seat_pool
+        self.waitlist_class = waitlist
+        self.available_seats = seat_pool()  # Replaced by a SectionedSeatPool on the first InitializeSection
+        self.waitlist = RankedWaitlist(waitlist())
+        self.next_sequence = 1  # Arrival order of waitlist entries, used to break priority ties
+        self.blocks = {}  # First seat -> size of a held block of adjacent seats; reservations holds the first seat
+        self.block_waitlist = waitlist()  # Block requests that did not fit, served after the single-seat waitlist
+        self.block_requests = {}  # Sequence number of a waiting block request -> its size
+        self.section_waitlists = {}  # Section -> waitlist of ReserveSection requests it could not serve
+        self.tier_waitlists = {}  # Tier -> waitlist of ReserveTier requests it could not serve
+        self.clock = 0  # Logical time, advanced by every state-changing command
+        # With aging on, waitlists store priority * aging_interval - clock at entry. The ordering of
+        # these keys equals the ordering of effective priorities at any time, so aging costs nothing.
+        self.aging_interval = aging_interval
+        self.holds = {}  # Held seat -> clock value at which the unconfirmed hold expires
+        self.hold_timers = TimerWheel()  # Expiry timers; entries for confirmed or cancelled holds are skipped
+        self.reservations = reservation_store()
+        self.seat_index = SeatIndex()  # Seat -> user, kept in step with reservations
+        self.instrumentation = None  # Set by Instrumentation.attach
+        self.transaction = None  # UndoLog of the open transaction, set by Begin
+        self.change_feed = None  # Set by ChangeFeed.attach
+        self.records = records
+        self.last_seat_number = 0
+
+    def initialize(self, seat_count):
+        """
+        Initialize the system with a given number of seats.
+        Args:
+            seat_count (int): Number of seats to initialize
+        Returns: str: Confirmation message
+        """
+        if seat_count <= 0:
+            if self.records:
+                return (RESULT_INVALID_SEATS,)
+            return "Invalid input. Please provide a valid number of seats."
+        if isinstance(self.available_seats, SectionedSeatPool):
+            # Seats beyond the sections so far join the general section
+            first = self.last_seat_number + 1
+            if seat_count >= first:
+                self._add_section(0, 0, first, seat_count)
+                self.available_seats.insert_range(first, seat_count)
+            self.last_seat_number = max(self.last_seat_number, seat_count)
+            self.seat_index.grow(self.last_seat_number)
+            if self.records:
+                return (RESULT_INITIALIZED, seat_count)
+            return f"{seat_count} Seats are made available for reservation"
+        self.available_seats.insert_range(1, seat_count)
+        self.last_seat_number = seat_count
+        self.seat_index.grow(seat_count)
+        if self.records:
+            return (RESULT_INITIALIZED, seat_count)
+        return f"{seat_count} Seats are made available for reservation"
+
+    def available(self):
+        """
+        Report the number of available seats and waitlist size.
+        Returns:  str: Status message
+        """
+        available_count = len(self.available_seats)
+        waitlist_count = self._waitlist_count()
+        if self.records:
+            return (RESULT_AVAILABLE, available_count, waitlist_count)
+        return f"Total Seats Available : {available_count}, Waitlist : {waitlist_count}"
+    
+    def reserve(self, user_id, user_priority):
+        """
+        Reserve a seat for a user or add them to the waitlist.
+        Args:
+            user_id : User ID
+            user_priority : User priority
+        Returns: str: Confirmation message
+        """
+        if not self.available_seats:
+            self.waitlist.insert((self._waitlist_priority(user_priority), self.next_sequence, user_id))
+            self.next_sequence += 1
+            if self.records:
+                return (RESULT_WAITLISTED, user_id)
+            return f"User {user_id} is added to the waiting list"
+        else:
+            seat_id = self.available_seats.extract_min()
+            self._assign_seat(user_id, seat_id)
+            if self.records:
+                return (RESULT_RESERVED, user_id, seat_id)
+            return f"User {user_id} reserved seat {seat_id}"
+
+    def reserve_many(self, user_lo, user_hi, user_priority):
+        """
+        Reserve seats for users user_lo..user_hi, in that order, as one command.
+        The lowest free seats are taken in one bulk extraction and recorded with
+        one bulk insert per index; users beyond the free seats join the waitlist
+        in one batch. Each user gets the line Reserve would have printed.
+        Args:
+            user_lo : First user ID
+            user_hi : Last user ID (inclusive)
+            user_priority : Priority for users who are waitlisted
+        Returns: list: One message per user
+        """
+        if user_hi < user_lo:
+            if self.records:
+                return [(RESULT_INVALID_USER_RANGE,)]
+            return ["Invalid input. Please provide a valid user range."]
+        seats = self.available_seats.take_lowest(user_hi - user_lo + 1)
+        users = range(user_lo, user_lo + len(seats))
+        self.seat_index.insert_many(zip(seats, users))
+        self.reservations.insert_many(list(zip(users, seats)))
+        if self.records:
+            result = [(RESULT_RESERVED, user_id, seat_id) for user_id, seat_id in zip(users, seats)]
+        else:
+            result = [f"User {user_id} reserved seat {seat_id}" for user_id, seat_id in zip(users, seats)]
+        waiting = range(users.stop, user_hi + 1)
+        if waiting:
+            priority, sequence = self._waitlist_priority(user_priority), self.next_sequence
+            self.waitlist.insert_many([(priority, sequence + i, user_id) for i, user_id in enumerate(waiting)])
+            self.next_sequence += len(waiting)
+            if self.records:
+                result.extend((RESULT_WAITLISTED, user_id) for user_id in waiting)
+            else:
+                result.extend(f"User {user_id} is added to the waiting list" for user_id in waiting)
+        return result
+    
+    def reserve_block(self, user_id, block_size, user_priority):
+        """
+        Reserve the lowest-numbered run of adjacent seats for a group, or add the
+        request to the block waitlist if no free run is long enough.
+        Args:
+            user_id : User ID making the group booking
+            block_size : Number of adjacent seats needed
+            user_priority : User priority
+        Returns: str: Confirmation message
+        """
+        if block_size <= 0:
+            if self.records:
+                return (RESULT_INVALID_SEATS,)
+            return "Invalid input. Please provide a valid number of seats."
+        if self.seat_pool is not SegmentTreeSeatPool:
+            self._use_segment_pool()
+        first = self.available_seats.take_block(block_size)
+        if first is None:
+            self.block_waitlist.insert((self._waitlist_priority(user_priority), self.next_sequence, user_id))
+            self.block_requests[self.next_sequence] = block_size
+            self.next_sequence += 1
+            if self.records:
+                return (RESULT_BLOCK_WAITLISTED, user_id, block_size)
+            return f"User {user_id} is added to the waiting list for {block_size} adjacent seats"
+        self._assign_block(user_id, first, block_size)
+        if self.records:
+            return (RESULT_BLOCK_RESERVED, user_id, first, first + block_size - 1)
+        return f"User {user_id} reserved seats {first}-{first + block_size - 1}"
+
+    def reserve_section(self, user_id, section, user_priority):
+        """
+        Reserve the lowest free seat in a section, or add the user to that
+        section's waitlist, which is only served from the section's seats.
+        Args:
+            user_id : User ID
+            section : Section ID
+            user_priority : User priority
+        Returns: str: Confirmation message
+        """
+        if section not in self.section_waitlists:
+            if self.records:
+                return (RESULT_INVALID_SECTION,)
+            return "Invalid input. Please provide a valid section."
+        seat_id = self.available_seats.extract_section(section)
+        if seat_id is None:
+            self.section_waitlists[section].insert((self._waitlist_priority(user_priority), self.next_sequence, user_id))
+            self.next_sequence += 1
+            if self.records:
+                return (RESULT_SECTION_WAITLISTED, user_id, section)
+            return f"User {user_id} is added to the waiting list for section {section}"
+        self._assign_seat(user_id, seat_id)
+        if self.records:
+            return (RESULT_RESERVED, user_id, seat_id)
+        return f"User {user_id} reserved seat {seat_id}"
+
+    def reserve_tier(self, user_id, tier, user_priority):
+        """
+        Reserve the lowest free seat in any section of a price tier, or add the
+        user to that tier's waitlist.
+        Args:
+            user_id : User ID
+            tier : Price tier
+            user_priority : User priority
+        Returns: str: Confirmation message
+        """
+        if tier not in self.tier_waitlists:
+            if self.records:
+                return (RESULT_INVALID_TIER,)
+            return "Invalid input. Please provide a valid tier."
+        seat_id = self.available_seats.extract_tier(tier)
+        if seat_id is None:
+            self.tier_waitlists[tier].insert((self._waitlist_priority(user_priority), self.next_sequence, user_id))
+            self.next_sequence += 1
+            if self.records:
+                return (RESULT_TIER_WAITLISTED, user_id, tier)
+            return f"User {user_id} is added to the waiting list for tier {tier}"
+        self._assign_seat(user_id, seat_id)
+        if self.records:
+            return (RESULT_RESERVED, user_id, seat_id)
+        return f"User {user_id} reserved seat {seat_id}"
+
+    def reserve_best(self, user_id, user_priority):
+        """
+        Reserve the best available seat: the lowest free seat of the best tier
+        that has one, general seats last. A user who finds the venue full joins
+        the general waitlist, as with Reserve. Without sections this is Reserve.
+        Args:
+            user_id : User ID
+            user_priority : User priority
+        Returns: str: Confirmation message
+        """
+        if not isinstance(self.available_seats, SectionedSeatPool) or not self.available_seats:
+            return self.reserve(user_id, user_priority)
+        seat_id = self.available_seats.extract_best()
+        self._assign_seat(user_id, seat_id)
+        if self.records:
+            return (RESULT_RESERVED, user_id, seat_id)
+        return f"User {user_id} reserved seat {seat_id}"
+
+    def hold(self, user_id, user_priority, ttl):
+        """
+        Hold the lowest free seat for a user while ttl more state-changing commands
+        run, or add them to the waitlist. An unconfirmed hold is then released.
+        Args:
+            user_id : User ID
+            user_priority : User priority
+            ttl : Lifetime of the hold, in state-changing commands
+        Returns: str: Confirmation message
+        """
+        if ttl <= 0:
+            if self.records:
+                return (RESULT_INVALID_HOLD,)
+            return "Invalid input. Please provide a valid hold time."
+        if not self.available_seats:
+            return self.reserve(user_id, user_priority)
+        seat_id = self.available_seats.extract_min()
+        self._assign_seat(user_id, seat_id)
+        # The hold survives the next ttl state-changing commands and is released on the one after
+        expiry = self.clock + ttl + 1
+        self.holds[seat_id] = expiry
+        self.hold_timers.advance(self.clock)  # An idle wheel lags the clock; catch it up before filing
+        self.hold_timers.schedule(seat_id, expiry)
+        if self.records:
+            return (RESULT_HELD, user_id, seat_id, ttl)
+        return f"User {user_id} holds seat {seat_id} for {ttl} commands"
+
+    def confirm_hold(self, user_id):
+        """
+        Turn a user's hold into a regular reservation. A user holding several
+        seats confirms the one they booked first.
+        Args:
+            user_id : User ID
+        Returns: str: Confirmation message
+        """
+        seat_id = None
+        if self.holds:
+            seat_id = next((seat for _, seat in self.reservations.items_between(user_id, user_id)
+                            if seat in self.holds), None)
+        if seat_id is None:
+            if self.records:
+                return (RESULT_NO_HOLD, user_id)
+            return f"User {user_id} has no hold to confirm"
+        del self.holds[seat_id]
+        if self.records:
+            return (RESULT_CONFIRMED, user_id, seat_id)
+        return f"User {user_id} confirmed seat {seat_id}"
+
+    def tick(self):
+        """
+        Advance the logical clock by one and release the holds that expire.
+        Returns: list: Expiry and reassignment messages, or None if nothing expired
+        """
+        self.clock += 1
+        return self.expire_holds() if self.hold_timers.count else None
+
+    def expire_holds(self):
+        """
+        Release the holds whose timers fire up to the current clock value.
+        All seats expiring on the same tick are released together and handed to
+        the waitlist in one _assign_from_waitlist pass.
+        Returns: list: Expiry and reassignment messages, or None if nothing expired
+        """
+        holds = self.holds
+        seats = []
+        for expiry, seat_id in self.hold_timers.advance(self.clock):
+            if holds.get(seat_id) == expiry:
+                del holds[seat_id]
+                seats.append(seat_id)
+        if not seats:
+            return None
+        expired = []
+        for seat_id in sorted(seats):
+            user_id = self.seat_index.search(seat_id)
+            self.reservations.delete_item(user_id, seat_id)
+            self.seat_index.delete(seat_id)
+            expired.append((seat_id, user_id))
+        if self.records:
+            result = [(RESULT_HOLD_EXPIRED, user_id, seat_id) for seat_id, user_id in expired]
+        else:
+            result = [f"User {user_id}'s hold on seat {seat_id} expired" for seat_id, user_id in expired]
+        result.extend(self._assign_from_waitlist([seat_id for seat_id, _ in expired]))
+        return result
+
+    def cancel(self, seat_id, user_id):
+        """
+        Cancel a users reservation and reassign the seat if possible.
+        Args:
+            seat_id : Seat ID to cancel
+            user_id : User ID cancelling the reservation
+        Returns: str: Confirmation message
+        """
+        reserved_seat = self.reservations.search(user_id)
+        if not reserved_seat:
+            if self.records:
+                return (RESULT_NOTHING_TO_CANCEL, user_id)
+            return f"User {user_id} has no reservation to cancel"
+    
+        block_size = self.blocks.get(reserved_seat, 1)
+        if not reserved_seat <= seat_id < reserved_seat + block_size:
+            if self.records:
+                return (RESULT_WRONG_SEAT, user_id, seat_id)
+            return f"User {user_id} has no reservation for seat {seat_id}"
+    
+        if block_size == 1:
+            self._release_seat(user_id, seat_id)
+            self.holds.pop(seat_id, None)
+            freed = [seat_id]
+        else:
+            # Cancelling any seat of a block gives up the whole block
+            freed = self._release_block(user_id, reserved_seat)
+    
+        result = [(RESULT_CANCELED, user_id) if self.records else f"User {user_id} canceled their reservation"]
+        # Hand the seats to the top waitlisted users, or return them to the free pool
+        result.extend(self._assign_from_waitlist(freed))
+        return result if self.records else "\n".join(result)
+
+    def exit_waitlist(self, user_id):
+        """
+        Remove a user from the waitlist.
+        Args:
+            user_id: User ID to remove from waitlist
+        Returns: str: Confirmation message
+        """
+        if self.waitlist.remove(user_id, key_index=2):
+            if self.records:
+                return (RESULT_LEFT_WAITLIST, user_id)
+            return f"User {user_id} is removed from the waiting list"
+        item = self.block_waitlist.remove(user_id, key_index=2)
+        if item is not None:
+            del self.block_requests[item[1]]
+            if self.records:
+                return (RESULT_LEFT_WAITLIST, user_id)
+            return f"User {user_id} is removed from the waiting list"
+        for waitlist in self._section_waitlists():
+            if waitlist.remove(user_id, key_index=2):
+                if self.records:
+                    return (RESULT_LEFT_WAITLIST, user_id)
+                return f"User {user_id} is removed from the waiting list"
+        if self.records:
+            return (RESULT_NOT_WAITLISTED, user_id)
+        return f"User {user_id} is not in waitlist"
+
+    def update_priority(self, user_id, user_priority):
+        """
+        Update a user's priority in the waitlist. With aging on, this sets their
+        current effective priority, which keeps rising from there.
+        Args:
+            user_id : User ID to update
+            user_priority : New priority
+        Returns: str: Confirmation message
+        """
+        for waitlist in self._waitlists():
+            item = waitlist.get(user_id)
+            if item is not None:
+                # Keep the original sequence number so the user's place among equal priorities is preserved
+                waitlist.replace(user_id, (self._waitlist_priority(user_priority), item[1], user_id))
+                if self.records:
+                    return (RESULT_PRIORITY_UPDATED, user_id, user_priority)
+                return f"User {user_id} priority has been updated to {user_priority}"
+        if self.records:
+            return (RESULT_PRIORITY_NOT_UPDATED, user_id)
+        return f"User {user_id} priority is not updated"
+
+    def waitlist_position(self, user_id):
+        """
+        Report a user's place in the waitlist in O(log n).
+        Args:
+            user_id : User ID to look up
+        Returns: str: Status message
+        """
+        position = self.waitlist.position(user_id)
+        if position is None:
+            if self.records:
+                return (RESULT_NOT_WAITLISTED, user_id)
+            return f"User {user_id} is not in waitlist"
+        if self.records:
+            return (RESULT_POSITION, user_id, position, len(self.waitlist))
+        return f"User {user_id} is at position {position} of {len(self.waitlist)} in the waiting list"
+
+    def top_waitlist(self, k):
+        """
+        List the k users who will be assigned seats next, in O(k + log n).
+        Args:
+            k : Number of waitlisted users to list
+        Returns: list: One line per user, highest priority first
+        """
+        if k <= 0:
+            if self.records:
+                return [(RESULT_INVALID_USERS,)]
+            return ["Invalid input. Please provide a valid number of users."]
+        top = self.waitlist.top(k)
+        if not top:
+            if self.records:
+                return [(RESULT_WAITLIST_EMPTY,)]
+            return ["Waitlist is empty"]
+        if self.records:
+            return [(RESULT_WAITLIST_ENTRY, i, user_id, self._effective_priority(priority))
+                    for i, (priority, _, user_id) in enumerate(top, 1)]
+        return [f"[position {i}, user {user_id}, priority {self._effective_priority(priority)}]"
+                for i, (priority, _, user_id) in enumerate(top, 1)]
+
+    def add_seats(self, count):
+        """
+        Add new seats and assign them to waitlisted users if possible.
+        Args:
+            count : Number of seats to add
+        Returns: str: Confirmation message
+        """
+        if count <= 0:
+            if self.records:
+                return (RESULT_INVALID_SEATS,)
+            return "Invalid input. Please provide a valid number of seats."
+        
+        new_seats = range(self.last_seat_number + 1, self.last_seat_number + count + 1)
+        self.last_seat_number += count
+        self.seat_index.grow(self.last_seat_number)
+        if isinstance(self.available_seats, SectionedSeatPool):
+            self._add_section(0, 0, new_seats[0], new_seats[-1])
+        
+        result = [(RESULT_SEATS_ADDED, count) if self.records
+                  else f"Additional {count} Seats are made available for reservation"]
+        # Waitlisted users take the lowest new seats; the rest become available
+        result.extend(self._assign_from_waitlist(new_seats))
+        return result if self.records else "\n".join(result)
+
+    def initialize_section(self, section, count, tier):
+        """
+        Add count seats as a section of the given price tier, numbered after
+        every existing seat. The first InitializeSection turns the venue into a
+        sectioned one, keeping the seats so far as the general section 0.
+        Adding seats to an existing section needs its own tier. Waitlisted users
+        allowed to sit there take the new seats first.
+        Args:
+            section : Section ID, 1 or more
+            count : Number of seats to add
+            tier : Price tier, 1 being the best
+        Returns: str: Confirmation message
+        """
+        if count <= 0:
+            if self.records:
+                return (RESULT_INVALID_SEATS,)
+            return "Invalid input. Please provide a valid number of seats."
+        if section <= 0 or tier <= 0:
+            if self.records:
+                return (RESULT_INVALID_SECTION_TIER,)
+            return "Invalid input. Please provide a valid section and tier."
+        pool = self.available_seats
+        if not isinstance(pool, SectionedSeatPool):
+            pool = SectionedSeatPool(self.seat_pool)
+            if self.last_seat_number:
+                pool.add_section(0, 0, 1, self.last_seat_number)
+                self.section_waitlists[0] = self._new_waitlist()
+                for first, last in self.available_seats.free_runs():
+                    pool.insert_range(first, last)
+            self.available_seats = pool
+        elif pool.section_tier(section) not in (None, tier):
+            if self.records:
+                return (RESULT_INVALID_SECTION_TIER,)
+            return "Invalid input. Please provide a valid section and tier."
+        new_seats = range(self.last_seat_number + 1, self.last_seat_number + count + 1)
+        self.last_seat_number += count
+        self.seat_index.grow(self.last_seat_number)
+        self._add_section(section, tier, new_seats[0], new_seats[-1])
+        result = [(RESULT_SECTION_ADDED, section, count, tier) if self.records
+                  else f"Section {section} with {count} seats (tier {tier}) is made available for reservation"]
+        result.extend(self._assign_from_waitlist(new_seats))
+        return result if self.records else "\n".join(result)
+
+    def seat_owner(self, seat_id):
+        """
+        Report which user holds a seat, using the seat index in O(1).
+        Args:
+            seat_id : Seat ID to look up
+        Returns: str: Status message
+        """
+        if seat_id <= 0 or seat_id > self.last_seat_number:
+            if self.records:
+                return (RESULT_INVALID_SEAT,)
+            return "Invalid input. Please provide a valid seat number."
+        user_id = self.seat_index.search(seat_id)
+        if user_id is None:
+            if self.records:
+                return (RESULT_SEAT_FREE, seat_id)
+            return f"Seat {seat_id} is not reserved"
+        if self.records:
+            return (RESULT_SEAT_OWNER, seat_id, user_id)
+        return f"Seat {seat_id} is reserved by user {user_id}"
+
+    def reservation_of(self, user_id):
+        """
+        Report the seat, or the block of seats, a user holds in O(log n).
+        Args:
+            user_id : User ID to look up
+        Returns: str: Status message
+        """
+        first = self.reservations.search(user_id)
+        if first is None:
+            if self.records:
+                return (RESULT_NO_RESERVATION, user_id)
+            return f"User {user_id} has no reservation"
+        block_size = self.blocks.get(first, 1)
+        if block_size == 1:
+            if self.records:
+                return (RESULT_HAS_SEAT, user_id, first)
+            return f"User {user_id} has seat {first}"
+        if self.records:
+            return (RESULT_HAS_SEATS, user_id, first, first + block_size - 1)
+        return f"User {user_id} has seats {first}-{first + block_size - 1}"
+
+    def begin(self):
+        """
+        Start a transaction. Every change made until Commit can be undone with Rollback.
+        Returns: str: Status message
+        """
+        if self.transaction is not None:
+            if self.records:
+                return (RESULT_TRANSACTION_OPEN,)
+            return "A transaction is already in progress"
+        self.transaction = UndoLog(self)
+        if self.records:
+            return (RESULT_BEGUN,)
+        return "Transaction started"
+
+    def commit(self):
+        """
+        Keep the changes made since Begin.
+        Returns: str: Status message
+        """
+        if self.transaction is None:
+            if self.records:
+                return (RESULT_NO_TRANSACTION,)
+            return "No transaction in progress"
+        self.transaction.commit()
+        self.transaction = None
+        if self.records:
+            return (RESULT_COMMITTED,)
+        return "Transaction committed"
+
+    def rollback(self):
+        """
+        Undo every change made since Begin, in time proportional to those changes.
+        The logical clock is not wound back: it keeps counting the commands that ran.
+        Returns: str: Status message
+        """
+        if self.transaction is None:
+            if self.records:
+                return (RESULT_NO_TRANSACTION,)
+            return "No transaction in progress"
+        self.transaction.rollback()
+        self.transaction = None
+        if self.records:
+            return (RESULT_ROLLED_BACK,)
+        return "Transaction rolled back"
+
+    def save_snapshot(self, path, log_offset=0):
+        """
+        Write the full state to a compact binary snapshot.
+        The file holds a fixed header followed by int64 columns for the
+        free-seat runs, the waitlist entries, the reservations in user order,
+        the seat index, the held blocks, the block waitlist, the unconfirmed
+        holds, the section runs and the section and tier waitlists, then one
+        byte per reservation for the shape of the reservation tree. It is written to a temporary file and renamed, so a
+        crash never leaves a half-written snapshot behind.
+        Args:
+            path (str): Snapshot file to write
+            log_offset (int): Command log position the snapshot is consistent with
+        """
+        runs = list(self.available_seats.free_runs())
+        sections = self.available_seats if isinstance(self.available_seats, SectionedSeatPool) else None
+        section_runs = len(sections.starts) if sections is not None else 0
+        # Section waitlist entries are tagged with their section, tier entries with -tier
+        section_waiting = [(section, item) for section, waitlist in self.section_waitlists.items()
+                           for item in waitlist.items()]
+        section_waiting.extend((-tier, item) for tier, waitlist in self.tier_waitlists.items()
+                               for item in waitlist.items())
+        waiting = self.waitlist.items()
+        block_waiting = self.block_waitlist.items()
+        reserved = self.reservations.items()
+        layout = self.reservations.layout() or array('b')
+        users, seats = array('q'), array('q')
+        for user_id, seat_id in reserved:
+            users.append(user_id)
+            seats.append(seat_id)
+        columns = (
+            array('q', (first for first, _ in runs)),
+            array('q', (last for _, last in runs)),
+            array('q', (item[0] for item in waiting)),
+            array('q', (item[1] for item in waiting)),
+            array('q', (item[2] for item in waiting)),
+            users,
+            seats,
+            self.seat_index.owner,
+            array('q', self.blocks.keys()),
+            array('q', self.blocks.values()),
+            array('q', (item[0] for item in block_waiting)),
+            array('q', (item[1] for item in block_waiting)),
+            array('q', (item[2] for item in block_waiting)),
+            array('q', (self.block_requests[item[1]] for item in block_waiting)),
+            array('q', self.holds.keys()),
+            array('q', self.holds.values()),
+            array('q', sections.run_sections if sections is not None else ()),
+            array('q', sections.run_tiers if sections is not None else ()),
+            array('q', sections.starts if sections is not None else ()),
+            array('q', sections.ends if sections is not None else ()),
+            array('q', (key for key, _ in section_waiting)),
+            array('q', (item[0] for _, item in section_waiting)),
+            array('q', (item[1] for _, item in section_waiting)),
+            array('q', (item[2] for _, item in section_waiting)),
+            layout,
+        )
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, self.last_seat_number,
+                                         self.next_sequence, log_offset, len(runs), len(waiting),
+                                         len(users), len(self.seat_index.owner), len(self.blocks),
+                                         len(block_waiting), self.clock, len(self.holds),
+                                         self.aging_interval, section_runs, len(section_waiting), len(layout)))
+            for column in columns:
+                _write_column(f, column)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load_snapshot(cls, path, **options):
+        """
+        Rebuild a system from a snapshot written by save_snapshot.
+        The reservation tree is bulk-built from the sorted user column in O(n)
+        with its saved shape, which decides which of a user's reservations a
+        Cancel reaches first, and a MaxHeap waitlist keeps its saved heap layout.
+        Args:
+            path (str): Snapshot file to read
+            options: Constructor arguments such as seat_pool and reservation_store
+        Returns: tuple: (GatorTicketMaster, command log offset)
+        """
+        gator_tm = cls(**options)
+        with open(path, "rb") as f:
+            header = f.read(SNAPSHOT_HEADER.size)
+            if len(header) < SNAPSHOT_HEADER.size:
+                raise ValueError(f"{path} is not a GatorTicketMaster snapshot")
+            (magic, version, last_seat_number, next_sequence, log_offset, run_count, waitlist_count,
+             reservation_count, index_length, block_count, block_waitlist_count, clock,
+             hold_count, aging_interval, section_run_count, section_waiting_count,
+             layout_count) = SNAPSHOT_HEADER.unpack(header)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} GatorTicketMaster snapshot")
+            firsts = _read_column(f, 'q', run_count)
+            lasts = _read_column(f, 'q', run_count)
+            priorities = _read_column(f, 'q', waitlist_count)
+            sequences = _read_column(f, 'q', waitlist_count)
+            waiting_users = _read_column(f, 'q', waitlist_count)
+            users = _read_column(f, 'q', reservation_count)
+            seats = _read_column(f, 'q', reservation_count)
+            owner = _read_column(f, 'q', index_length)
+            block_seats = _read_column(f, 'q', block_count)
+            block_sizes = _read_column(f, 'q', block_count)
+            block_priorities = _read_column(f, 'q', block_waitlist_count)
+            block_sequences = _read_column(f, 'q', block_waitlist_count)
+            block_waiting_users = _read_column(f, 'q', block_waitlist_count)
+            requested_sizes = _read_column(f, 'q', block_waitlist_count)
+            hold_seats = _read_column(f, 'q', hold_count)
+            hold_expiries = _read_column(f, 'q', hold_count)
+            run_sections = _read_column(f, 'q', section_run_count)
+            run_tiers = _read_column(f, 'q', section_run_count)
+            run_starts = _read_column(f, 'q', section_run_count)
+            run_ends = _read_column(f, 'q', section_run_count)
+            section_keys = _read_column(f, 'q', section_waiting_count)
+            section_priorities = _read_column(f, 'q', section_waiting_count)
+            section_sequences = _read_column(f, 'q', section_waiting_count)
+            section_users = _read_column(f, 'q', section_waiting_count)
+            layout = _read_column(f, 'b', layout_count)
+        gator_tm.last_seat_number = last_seat_number
+        gator_tm.next_sequence = next_sequence
+        if section_run_count:
+            gator_tm.available_seats = SectionedSeatPool(gator_tm.seat_pool)
+            for section, tier, first, last in zip(run_sections, run_tiers, run_starts, run_ends):
+                gator_tm._add_section(section, tier, first, last)
+            for key, item in zip(section_keys, zip(section_priorities, section_sequences, section_users)):
+                waitlist = gator_tm.section_waitlists[key] if key >= 0 else gator_tm.tier_waitlists[-key]
+                waitlist.insert(item)
+        for first, last in zip(firsts, lasts):
+            gator_tm.available_seats.insert_range(first, last)
+        gator_tm.waitlist.load(zip(priorities, sequences, waiting_users))
+        gator_tm.reservations.build_from_sorted(users, seats, layout or None)
+        gator_tm.seat_index.owner = owner
+        gator_tm.seat_index.count = reservation_count + sum(block_sizes) - block_count
+        gator_tm.blocks = dict(zip(block_seats, block_sizes))
+        gator_tm.block_waitlist.load(zip(block_priorities, block_sequences, block_waiting_users))
+        gator_tm.block_requests = dict(zip(block_sequences, requested_sizes))
+        gator_tm.clock = clock
+        gator_tm.aging_interval = aging_interval  # Saved waitlist keys only make sense with their own interval
+        gator_tm.holds = dict(zip(hold_seats, hold_expiries))
+        gator_tm.hold_timers.time = clock
+        for seat_id, expiry in gator_tm.holds.items():
+            gator_tm.hold_timers.schedule(seat_id, expiry)
+        return gator_tm, log_offset
+
+    def stats(self):
+        """
+        Report the size of the internal structures and, when instrumentation is
+        attached, per-command call counts and latency percentiles.
+        Returns: list: Status lines
+        """
+        structures = (self.reservations, self.seat_index, self.available_seats, *self._waitlists())
+        memory = sum(structure.memory_usage() for structure in structures)
+        waitlist_count = self._waitlist_count()
+        if self.records:
+            result = [
+                (RESULT_TREE, len(self.reservations), self.reservations.height()),
+                (RESULT_AVAILABLE, len(self.available_seats), waitlist_count),
+                (RESULT_MEMORY, memory),
+            ]
+        else:
+            result = [
+                f"Reservations : {len(self.reservations)}, Tree height : {self.reservations.height()}",
+                f"Total Seats Available : {len(self.available_seats)}, Waitlist : {waitlist_count}",
+                f"Approximate memory : {memory / 1024:.1f} KB",
+            ]
+        if self.instrumentation is None:
+            result.append((RESULT_LATENCY_OFF,) if self.records else "Latency instrumentation is off")
+        else:
+            result.extend(self.instrumentation.report(self.records))
+        return result
+
+    def print_reservations(self):
+        """
+        List all current reservations in seat order from the seat index.
+        Returns: list: Reservation strings
+        """
+        if self.records:
+            return [(RESULT_RESERVATION, seat, user) for seat, user in self.seat_index.items()]
+        return [f"[seat {seat}, user {user}]" for seat, user in self.seat_index.items()]
+
+    def stream_reservations(self):
+        """
+        Stream all current reservations in seat order without building the list,
+        for writers that consume each result before running the next command.
+        The generator reads the live seat index, so any later command changes what it yields.
+        Returns: generator: Reservation strings
+        """
+        if self.records:
+            return ((RESULT_RESERVATION, seat, user) for seat, user in self.seat_index.items())
+        return (f"[seat {seat}, user {user}]" for seat, user in self.seat_index.items())
+
+    def release_seats(self, user_id1, user_id2):
+        """
+        Release seats for a range of user IDs and reassign them if possible.
+        Args:
+            user_id1 : Start of user ID range
+            user_id2 : End of user ID range
+        Returns:
+            str: Confirmation message
+        """
+        if user_id1 > user_id2:
+            if self.records:
+                return (RESULT_INVALID_RANGE,)
+            return "Invalid input. Please provide a valid range of users."
+        
+        if self.records:
+            result = [(RESULT_RELEASED, user_id1, user_id2)]
+        else:
+            result = [f"Reservations of the Users in the range [{user_id1}, {user_id2}] are released"]
+        
+        # Only the users that actually hold a seat or a waitlist entry are visited. Each gives
+        # up one reservation, or failing that one waiting request, as in the original loop
+        released_seats = []
+        handled = set()
+        for user_id, seat in self.reservations.delete_range(user_id1, user_id2):
+            released_seats.extend(range(seat, seat + self.blocks.pop(seat, 1)) if self.blocks else (seat,))
+            if self.holds:
+                self.holds.pop(seat, None)
+            handled.add(user_id)
+        released_seats.sort()
+        for seat_id in released_seats:
+            self.seat_index.delete(seat_id)
+        for waitlist in (self.waitlist, self.block_waitlist, *self._section_waitlists()):
+            if waitlist:
+                removed = waitlist.remove_range(user_id1, user_id2, handled)
+                if waitlist is self.block_waitlist:
+                    for item in removed:
+                        del self.block_requests[item[1]]
+                handled.update(item[2] for item in removed)
+        
+        # Waitlisted users take the lowest released seats; the rest become available
+        result.extend(self._assign_from_waitlist(released_seats))
+        return result if self.records else "\n".join(result)
+
+    def _assign_from_waitlist(self, seats):
+        """
+        Pair the k lowest seats with the k highest-priority waitlisted users in O(k log n),
+        then return any seats left over to the available pool. While section or
+        tier requests are waiting, seats are matched one by one instead.
+        Args:
+            seats: Seat IDs in ascending order
+        Returns: list: One reservation message per assigned seat
+        """
+        if self.section_waitlists and any(self._section_waitlists()):
+            result, free = self._assign_by_section(seats)
+        else:
+            result, free = self._assign_lowest(seats)
+        if isinstance(free, range):
+            if free:
+                self.available_seats.insert_range(free[0], free[-1])
+        else:
+            for seat_id in free:
+                self.available_seats.insert(seat_id)
+        if free and self.block_waitlist:
+            result.extend(self._assign_blocks())
+        return result
+
+    def _assign_lowest(self, seats):
+        # Pair the lowest seats with the top of the waitlist; returns the messages and the seats left over
+        k = min(len(seats), len(self.waitlist))
+        result = []
+        if k == 1:
+            user = self.waitlist.extract_max()
+            self._assign_seat(user[2], seats[0])
+            result.append((RESULT_RESERVED, user[2], seats[0]) if self.records
+                          else f"User {user[2]} reserved seat {seats[0]}")
+        elif k:
+            # Record the whole batch with one bulk insert into the reservation store
+            assigned = []
+            for seat_id in seats[:k]:
+                user_id = self.waitlist.extract_max()[2]
+                self.seat_index.insert(seat_id, user_id)
+                assigned.append((user_id, seat_id))
+            self.reservations.insert_many(assigned)
+            if self.records:
+                result = [(RESULT_RESERVED, user_id, seat_id) for user_id, seat_id in assigned]
+            else:
+                result = [f"User {user_id} reserved seat {seat_id}" for user_id, seat_id in assigned]
+        return result, seats[k:]
+
+    def _assign_by_section(self, seats):
+        """
+        Give each seat, lowest first, to the best waiting user allowed to take it:
+        the top of the general waitlist, of the seat's section waitlist or of its
+        tier waitlist, whichever has the highest priority (earliest arrival on ties).
+        Args:
+            seats: Seat IDs in ascending order
+        Returns: tuple: (reservation messages, seats nobody took)
+        """
+        result, free = [], []
+        section_of = self.available_seats.section_of
+        for seat_id in seats:
+            section, tier = section_of(seat_id)
+            best = top = None
+            for waitlist in (self.waitlist, self.section_waitlists[section], self.tier_waitlists.get(tier)):
+                if waitlist:
+                    item = waitlist.peek()
+                    if top is None or item[0] > top[0] or (item[0] == top[0] and item[1] < top[1]):
+                        best, top = waitlist, item
+            if best is None:
+                free.append(seat_id)
+                continue
+            user_id = best.extract_max()[2]
+            self._assign_seat(user_id, seat_id)
+            result.append((RESULT_RESERVED, user_id, seat_id) if self.records
+                          else f"User {user_id} reserved seat {seat_id}")
+        return result, free
+
+    def _assign_blocks(self):
+        """
+        Give free runs to waiting block requests in priority order, stopping at the
+        first request that still does not fit so larger groups are not starved.
+        Returns: list: One reservation message per assigned block
+        """
+        result = []
+        if self.seat_pool is not SegmentTreeSeatPool:
+            self._use_segment_pool()
+        while self.block_waitlist:
+            item = self.block_waitlist.extract_max()
+            block_size = self.block_requests[item[1]]
+            first = self.available_seats.take_block(block_size)
+            if first is None:
+                self.block_waitlist.insert(item)
+                break
+            del self.block_requests[item[1]]
+            self._assign_block(item[2], first, block_size)
+            result.append((RESULT_BLOCK_RESERVED, item[2], first, first + block_size - 1) if self.records
+                          else f"User {item[2]} reserved seats {first}-{first + block_size - 1}")
+        return result
+
+    def _new_waitlist(self):
+        # Create a section or tier waitlist, recorded by the open transaction and the change feed
+        waitlist = self.waitlist_class()
+        if self.change_feed is not None:
+            self.change_feed.follow(waitlist)
+        if self.transaction is not None:
+            self.transaction.follow(waitlist)
+        return waitlist
+
+    def _add_section(self, section, tier, first, last):
+        # Give seats first..last to a section, creating its waitlists if they are new
+        self.available_seats.add_section(section, tier, first, last)
+        if section not in self.section_waitlists:
+            self.section_waitlists[section] = self._new_waitlist()
+        if tier and tier not in self.tier_waitlists:
+            self.tier_waitlists[tier] = self._new_waitlist()
+
+    def _section_waitlists(self):
+        # The per-section and per-tier waitlists
+        return [*self.section_waitlists.values(), *self.tier_waitlists.values()]
+
+    def _waitlists(self):
+        # Every waitlist: the general one, the block waitlist and the section and tier ones
+        return [self.waitlist, self.block_waitlist, *self.section_waitlists.values(), *self.tier_waitlists.values()]
+
+    def _waitlist_count(self):
+        # Number of waiting requests of every kind
+        count = len(self.waitlist) + len(self.block_waitlist)
+        if self.section_waitlists:
+            count += sum(map(len, self._section_waitlists()))
+        return count
+
+    def _waitlist_priority(self, priority):
+        # The key a priority is stored under in the waitlists at the current clock value
+        if self.aging_interval:
+            return priority * self.aging_interval - self.clock
+        return priority
+
+    def _effective_priority(self, stored):
+        # The current priority of a waitlist key, rounded down to whole points
+        if self.aging_interval:
+            return (stored + self.clock) // self.aging_interval
+        return stored
+
+    def _assign_seat(self, user_id, seat_id):
+        # Record a reservation in both the user and the seat index
+        self.reservations.insert(user_id, seat_id)
+        self.seat_index.insert(seat_id, user_id)
+
+    def _release_seat(self, user_id, seat_id):
+        # Remove a reservation from both the user and the seat index
+        self.reservations.delete(user_id)
+        self.seat_index.delete(seat_id)
+
+    def _use_segment_pool(self):
+        """
+        Move the free seats into SegmentTreeSeatPools, once block requests start.
+        MinHeap and SeatRangePool can only find a run of adjacent seats by sorting
+        or scanning every seat or run, the segment tree does it in O(log n); the
+        move costs one pass over the free runs. A pool replaced inside a
+        transaction is put back by Rollback, as for InitializeSection.
+        """
+        self.seat_pool = SegmentTreeSeatPool
+        if isinstance(self.available_seats, SectionedSeatPool):
+            self.available_seats.convert(SegmentTreeSeatPool)
+            return
+        pool = SegmentTreeSeatPool()
+        for first, last in self.available_seats.free_runs():
+            pool.insert_range(first, last)
+        self.available_seats = pool
+
+    def _assign_block(self, user_id, first, block_size):
+        # Record a block reservation: its first seat in the user index, every seat in the seat index
+        self.reservations.insert(user_id, first)
+        for seat_id in range(first, first + block_size):
+            self.seat_index.insert(seat_id, user_id)
+        if block_size > 1:
+            self.blocks[first] = block_size
+
+    def _release_block(self, user_id, first):
+        # Remove a block reservation and return its seats
+        seats = range(first, first + self.blocks.pop(first))
+        self.reservations.delete(user_id)
+        for seat_id in seats:
+            self.seat_index.delete(seat_id)
+        return seats
+
+SNAPSHOT_MAGIC = b"GTMS"
+SNAPSHOT_VERSION = 7
+# magic, version, last seat, next sequence, log offset, runs, waitlist entries, reservations,
+# seat index length, held blocks, block waitlist entries, logical clock, holds, aging interval,
+# section runs, section and tier waitlist entries, reservation tree layout bytes
+SNAPSHOT_HEADER = struct.Struct("<4sHqqqqqqqqqqqqqqq")
+
+def _write_column(f, column):
+    # Write an array in little-endian order
+    if sys.byteorder != "little":
+        column = array(column.typecode, column)
+        column.byteswap()
+    column.tofile(f)
+
+def _read_column(f, typecode, count):
+    # Read count little-endian items into an array
+    column = array(typecode)
+    column.fromfile(f, count)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column
+
+class CommandLog:
+    """
+    Append-only log of state-changing commands with group commit. Lines are
+    buffered and written with a single fsync once group_size lines are pending
+    or group_interval seconds have passed, so a crash loses at most one group.
+    Pass the offset replay_log returned as end so a line torn by the crash is
+    cut off instead of having the next command appended onto it.
+    """
+    def __init__(self, path, group_size=1024, group_interval=0.05, end=None):
+        if end is not None and os.path.exists(path) and os.path.getsize(path) > end:
+            os.truncate(path, end)
+        self.file = open(path, "ab")
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.pending = []
+        self.last_commit = time.monotonic()
+
+    def append(self, line):
+        # Queue one command line and commit the group if it is full or old enough.
+        self.pending.append(line.encode() + b"\n")
+        if (len(self.pending) >= self.group_size
+                or time.monotonic() - self.last_commit >= self.group_interval):
+            self.commit()
+
+    def commit(self):
+        # Write and fsync all pending lines.
+        if self.pending:
+            self.file.write(b"".join(self.pending))
+            self.pending.clear()
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        self.last_commit = time.monotonic()
+
+    def offset(self):
+        # Commit and return the byte offset of the end of the log.
+        self.commit()
+        return self.file.tell()
+
+    def close(self):
+        # Commit pending lines and close the file.
+        self.commit()
+        self.file.close()
+
+def replay_log(gator_tm, path, offset=0):
+    """
+    Re-run the commands logged after offset. A torn final line is ignored.
+    Args:
+        gator_tm (GatorTicketMaster): System to apply the commands to
+        path (str): Command log file
+        offset (int): Byte offset to start from, as stored in the snapshot
+    Returns: int: Byte offset just past the last complete line, for CommandLog's end
+    """
+    execute = CommandProcessor(gator_tm).execute
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            result = execute(raw.decode())
+            if result is not None and not isinstance(result, (str, tuple)):
+                for _ in result:
+                    pass
+            offset += len(raw)
+    return offset
+
+def abort_transaction(gator_tm, command_log=None):
+    """
+    Roll back a transaction that was never committed, such as one still open
+    at the end of a run or at the end of a replayed log. The Rollback is
+    logged too, so later replays of the same log close the transaction as well.
+    Args:
+        gator_tm (GatorTicketMaster): System that may have an open transaction
+        command_log (CommandLog): Log to record the Rollback in
+    """
+    if gator_tm.transaction is not None:
+        if command_log is not None:
+            command_log.append("Rollback()")
+        gator_tm.rollback()
+
+SEAT_POOLS = {"heap": MinHeap, "ranges": SeatRangePool, "segment": SegmentTreeSeatPool}
+RESERVATION_STORES = {"tree": RedBlackTree, "array": ArrayRedBlackTree, "dense": DenseReservationStore}
+WAITLISTS = {"heap": MaxHeap, "heapq": HeapqWaitlist}
+
+# Command name -> (GatorTicketMaster method, number of integer arguments)
+COMMANDS = {
+    'Initialize': ('initialize', 1),
+    'Available': ('available', 0),
+    'Reserve': ('reserve', 2),
+    'ReserveMany': ('reserve_many', 3),
+    'Cancel': ('cancel', 2),
+    'PrintReservations': ('print_reservations', 0),
+    'AddSeats': ('add_seats', 1),
+    'UpdatePriority': ('update_priority', 2),
+    'ExitWaitlist': ('exit_waitlist', 1),
+    'ReleaseSeats': ('release_seats', 2),
+    'SeatOwner': ('seat_owner', 1),
+    'ReservationOf': ('reservation_of', 1),
+    'Stats': ('stats', 0),
+    'WaitlistPosition': ('waitlist_position', 1),
+    'TopWaitlist': ('top_waitlist', 1),
+    'ReserveBlock': ('reserve_block', 3),
+    'Hold': ('hold', 3),
+    'ConfirmHold': ('confirm_hold', 1),
+    'InitializeSection': ('initialize_section', 3),
+    'ReserveSection': ('reserve_section', 3),
+    'ReserveTier': ('reserve_tier', 3),
+    'ReserveBest': ('reserve_best', 2),
+    'Begin': ('begin', 0),
+    'Commit': ('commit', 0),
+    'Rollback': ('rollback', 0),
+}
+
+# Commands that never change state, so they are left out of the command log
+READ_ONLY_COMMANDS = {'Available', 'PrintReservations', 'SeatOwner', 'ReservationOf', 'Stats',
+                      'WaitlistPosition', 'TopWaitlist'}
+
+# Commands that are logged like state-changing ones but do not advance the logical clock
+UNTIMED_COMMANDS = {'Begin', 'Commit', 'Rollback'}
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram in nanoseconds. Each power of two is split
+    into four buckets, so reported percentiles are within 25% of the true value.
+    """
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.max = 0
+
+    def record(self, ns):
+        # Add one sample.
+        e = ns.bit_length()
+        bucket = ns if e < 3 else (e - 2) * 4 + ((ns >> (e - 3)) & 3)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, fraction):
+        # Return the upper bound of the bucket holding the given fraction of samples.
+        if not self.count:
+            return 0
+        rank = max(1, int(fraction * self.count + 0.5))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                if bucket < 4:
+                    return bucket
+                e, m = bucket // 4 + 2, bucket % 4
+                return min(((5 + m) << (e - 3)) - 1, self.max)
+        return self.max
+
+class Instrumentation:
+    """
+    Optional per-command latency recording. attach() replaces the command methods
+    on one GatorTicketMaster instance with timed wrappers, which the API and the
+    dispatch table both pick up. Instances that are never attached run the plain
+    methods, so instrumentation costs nothing when it is off.
+    """
+    def __init__(self):
+        self.histograms = {}
+
+    def attach(self, gator_tm):
+        """
+        Start timing every command method of gator_tm except Stats.
+        Args:
+            gator_tm (GatorTicketMaster): The instance to instrument
+        """
+        for name, (method, _) in COMMANDS.items():
+            if method != 'stats':
+                setattr(gator_tm, method, self._timed(name, getattr(gator_tm, method)))
+        gator_tm.stream_reservations = self._timed('PrintReservations', gator_tm.stream_reservations)
+        gator_tm.instrumentation = self
+
+    def _timed(self, name, method):
+        # Wrap method so each call, including consuming a streamed result, is recorded under name.
+        # Only an iterator is wrapped; strings, records and lists are returned as they are.
+        histogram = self.histograms.setdefault(name, LatencyHistogram())
+        clock = time.perf_counter_ns
+
+        def timed(*args):
+            start = clock()
+            result = method(*args)
+            if hasattr(result, '__next__'):
+                return self._timed_stream(result, histogram, clock() - start)
+            histogram.record(clock() - start)
+            return result
+        return timed
+
+    @staticmethod
+    def _timed_stream(lines, histogram, elapsed):
+        # Count the time spent producing each line of a streamed result
+        clock = time.perf_counter_ns
+        iterator = iter(lines)
+        while True:
+            start = clock()
+            line = next(iterator, None)
+            elapsed += clock() - start
+            if line is None:
+                break
+            yield line
+        histogram.record(elapsed)
+
+    def report(self, records=False):
+        # Return one line, or one RESULT_LATENCY record, per command that has been called.
+        result = []
+        for name, histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            if records:
+                result.append((RESULT_LATENCY, list(COMMANDS).index(name), histogram.count,
+                               histogram.percentile(0.5), histogram.percentile(0.99), histogram.max))
+            else:
+                result.append(
+                    f"{name} : calls {histogram.count}, "
+                    f"p50 {histogram.percentile(0.5) / 1000:.1f} us, "
+                    f"p99 {histogram.percentile(0.99) / 1000:.1f} us, "
+                    f"max {histogram.max / 1000:.1f} us")
+        return result
+
+READ_BLOCK_SIZE = 1 << 20  # Characters read from the input per block
+OUTPUT_BATCH = 1 << 14  # Output pieces collected before each write
+# Result records packed per write. Unlike strings, the record tuples are tracked by the cycle
+# collector, and a small batch is freed before collections start promoting it.
+RECORD_BATCH = 1 << 9
+
+class CommandProcessor:
+    """
+    Parses command lines and runs them against a GatorTicketMaster.
+    The COMMANDS table is bound to the instance's methods once, so each line
+    costs one dictionary lookup instead of a chain of string comparisons.
+    Every state-changing command except Begin, Commit and Rollback first
+    advances the logical clock, and the messages of holds expiring on that
+    tick are put before its result.
+    With stream on, PrintReservations returns a generator over the live seat
+    index instead of a list; the caller must consume each result before
+    executing the next line, as process_input does.
+    """
+    def __init__(self, gator_tm, stream=False):
+        self.gator_tm = gator_tm
+        self.handlers = {name: (getattr(gator_tm, method), arity,
+                                name not in READ_ONLY_COMMANDS and name not in UNTIMED_COMMANDS)
+                         for name, (method, arity) in COMMANDS.items()}
+        if stream:
+            self.handlers['PrintReservations'] = (gator_tm.stream_reservations, 0, False)
+
+    def execute(self, line):
+        """
+        Parse and run a single command line.
+        Args:
+            line (str): A command such as "Reserve(3, 1)"
+        Returns the command result (a string or an iterable of lines, or with records on a
+            record or an iterable of records), or None for Quit
+        """
+        name, _, rest = line.strip().partition('(')
+        entry = self.handlers.get(name)
+        if entry is None:
+            if name == 'Quit':
+                return None
+            return (RESULT_UNKNOWN,) if self.gator_tm.records else "Unknown command"
+        handler, arity, ticks = entry
+        # Parse before ticking, so a malformed line raises without expiring any hold
+        if arity == 0:
+            args = ()
+        else:
+            args = rest.rstrip(')').split(',')
+            if arity == 1:
+                args = (int(args[0]),)
+            elif arity == 2:
+                args = (int(args[0]), int(args[1]))
+            else:
+                args = tuple(map(int, args[:arity]))
+        if ticks:
+            # GatorTicketMaster.tick, inlined: expiry work only runs while timers are pending
+            gator_tm = self.gator_tm
+            gator_tm.clock += 1
+            if gator_tm.hold_timers.count:
+                expired = gator_tm.expire_holds()
+                if expired:
+                    result = handler(*args)
+                    if isinstance(result, str):
+                        return '\n'.join(expired + [result])
+                    if isinstance(result, tuple):
+                        return expired + [result]
+                    return expired + list(result)
+        return handler(*args)
+
+def read_lines(f, block_size=READ_BLOCK_SIZE):
+    """
+    Yield the lines of a text file, reading it in large blocks.
+    Args:
+        f: File object opened in text mode
+        block_size (int): Number of characters to read at a time
+    """
+    tail = ''
+    while True:
+        block = f.read(block_size)
+        if not block:
+            break
+        lines = (tail + block).split('\n')
+        tail = lines.pop()
+        yield from lines
+    if tail:
+        yield tail
+
+RESULT_MAGIC = b"GTMR"
+RESULT_VERSION = 1
+# magic, version; then one frame per record
+RESULT_HEADER = struct.Struct("<4sH")
+# Opcode -> frame layout: the opcode byte followed by one int64 per field of its format
+RESULT_FRAMES = {opcode: struct.Struct("<B" + "q" * text.count("{")) for opcode, text in RESULT_FORMATS.items()}
+RESULT_FRAME_CODES = {opcode: frame.format[1:] for opcode, frame in RESULT_FRAMES.items()}
+# The fastest settings of each: the stream is compressed as fast as the commands run
+RESULT_COMPRESSION = {
+    "gzip": lambda path: gzip.open(path, "wb", compresslevel=1),
+    "lzma": lambda path: lzma.open(path, "wb", preset=0),
+}
+
+def open_results(path, compression=None):
+    """
+    Create a binary result stream and write its header.
+    Args:
+        path (str): File to write
+        compression (str): "gzip" or "lzma" to compress the stream, None to leave it plain
+    Returns: A binary file object for pack_results output
+    """
+    out = open(path, "wb") if compression is None else RESULT_COMPRESSION[compression](path)
+    out.write(RESULT_HEADER.pack(RESULT_MAGIC, RESULT_VERSION))
+    return out
+
+def pack_results(records):
+    # Encode result records as their fixed-width frames, with one struct call for the whole batch
+    codes = RESULT_FRAME_CODES
+    return struct.pack("<" + "".join([codes[record[0]] for record in records]),
+                       *itertools.chain.from_iterable(records))
+
+def read_results(path, block_size=READ_BLOCK_SIZE):
+    """
+    Yield the records of a binary result stream. Compression is detected from
+    the first bytes of the file.
+    Args:
+        path (str): File written through open_results
+        block_size (int): Number of bytes to decode at a time
+    """
+    with open(path, "rb") as f:
+        start = f.read(6)
+    if start.startswith(b"\x1f\x8b"):
+        opener = gzip.open
+    elif start.startswith(b"\xfd7zXZ\x00"):
+        opener = lzma.open
+    else:
+        opener = open
+    with opener(path, "rb") as f:
+        header = f.read(RESULT_HEADER.size)
+        if len(header) < RESULT_HEADER.size:
+            raise ValueError(f"{path} is not a GatorTicketMaster result stream")
+        magic, version = RESULT_HEADER.unpack(header)
+        if magic != RESULT_MAGIC or version != RESULT_VERSION:
+            raise ValueError(f"{path} is not a version {RESULT_VERSION} GatorTicketMaster result stream")
+        frames = RESULT_FRAMES
+        data = b""
+        while True:
+            block = f.read(block_size)
+            data += block
+            offset, end = 0, len(data)
+            while offset < end:
+                frame = frames.get(data[offset])
+                if frame is None:
+                    raise ValueError(f"{path} has an unknown result opcode {data[offset]}")
+                if offset + frame.size > end:
+                    break
+                yield frame.unpack_from(data, offset)
+                offset += frame.size
+            data = data[offset:]
+            if not block:
+                break
+        if data:
+            raise ValueError(f"{path} ends in a truncated result frame")
+
+def render_result(record):
+    """
+    Return the text line a result record stands for, exactly as text mode prints it.
+    Args:
+        record (tuple): (opcode, *integer fields)
+    Returns: str: The output line
+    """
+    opcode = record[0]
+    if opcode == RESULT_MEMORY:
+        return RESULT_FORMATS[opcode].format(record[1] / 1024)
+    if opcode == RESULT_LATENCY:
+        return RESULT_FORMATS[opcode].format(list(COMMANDS)[record[1]], record[2],
+                                             *(ns / 1000 for ns in record[3:]))
+    return RESULT_FORMATS[opcode].format(*record[1:])
+
+def process_input(input_file, output_file, gator_tm=None, command_log=None, compression=None):
+    """
+    Process commands from an input file and write results to an output file.
+    With gator_tm.records on, the results are written as a binary result stream
+    instead of text; read_results and render_result turn it back into the text.
+    Args:
+        input_file (str): Path to the input file containing commands
+        output_file (str): Path to the output file for writing results
+        gator_tm (GatorTicketMaster): System to run the commands on; a default one is created if omitted
+        command_log (CommandLog): Log that state-changing commands are appended to once they ran without error
+        compression (str): "gzip" or "lzma" to compress a binary result stream
+    """
+    if gator_tm is None:
+        gator_tm = GatorTicketMaster()  # Create an instance of GatorTicketMaster
+    execute = CommandProcessor(gator_tm, stream=True).execute  # Each result is written out before the next line
+    if command_log is not None:
+        run_command = execute
+
+        def execute(line):
+            # A line that raises is not logged, so replaying the log cannot fail on it
+            result = run_command(line)
+            line = line.strip()
+            name = line.partition('(')[0]
+            if name != 'Quit' and name not in READ_ONLY_COMMANDS:
+                command_log.append(line)
+            return result
+    records = gator_tm.records
+    if records:
+        single, terminated, blank, batch = tuple, (RESULT_TERMINATED,), (RESULT_BLANK,), RECORD_BATCH
+    else:
+        single, terminated, blank, batch = str, "Program Terminated!!", '', OUTPUT_BATCH
+    out = open_results(output_file, compression) if records else open(output_file, 'w')
+    with open(input_file, 'r') as f, out:
+        # Output lines or records are collected and written in large batches
+        pending = []
+        append = pending.append
+
+        def flush():
+            out.write(pack_results(pending) if records else '\n'.join(pending) + '\n')
+            pending.clear()
+
+        for line in read_lines(f):
+            result = execute(line)
+            if result is None:
+                append(terminated)
+                break
+            if isinstance(result, single):
+                append(result)
+            else:
+                # Stream multi-line results, flushing as they grow
+                written = False
+                for result_line in result:
+                    append(result_line)
+                    written = True
+                    if len(pending) >= batch:
+                        flush()
+                if not written:
+                    append(blank)
+            if len(pending) >= batch:
+                flush()
+        if pending:
+            flush()
+
+if __name__ == "__main__":
+    # Parse the input file name and the optional storage settings
+    parser = argparse.ArgumentParser(usage="python gatorTicketMaster.py <input_file> [options]")
+    parser.add_argument("input_file")
+    parser.add_argument("--seat-pool", choices=sorted(SEAT_POOLS), default="heap",
+                        help="free-seat store: one heap entry per seat, compressed seat ranges, or a segment "
+                             "tree that finds adjacent seats (used once ReserveBlock is called)")
+    parser.add_argument("--reservations", choices=sorted(RESERVATION_STORES), default="tree",
+                        help="reservation store: node-based or array-backed red black tree, or a dense "
+                             "array indexed by user id")
+    parser.add_argument("--waitlist", choices=sorted(WAITLISTS), default="heap",
+                        help="waitlist: tuple max heap, or packed int keys on the C heapq functions")
+    parser.add_argument("--aging", type=int, default=0, metavar="TICKS",
+                        help="raise waitlisted users' priority by one every TICKS state-changing commands")
+    parser.add_argument("--stats", action="store_true",
+                        help="record per-command latencies and print them to stderr at the end")
+    parser.add_argument("--snapshot", metavar="PATH",
+                        help="restore state from this snapshot if it exists and save a new one at the end")
+    parser.add_argument("--wal", metavar="PATH",
+                        help="append state-changing commands to this log and replay its tail on restore")
+    parser.add_argument("--output-format", choices=("text", "binary"), default="text",
+                        help="write result lines, or compact binary result records (see gatorDecode.py)")
+    parser.add_argument("--compress", choices=sorted(RESULT_COMPRESSION),
+                        help="compress the binary result records")
+    options = parser.parse_args()
+    if options.aging < 0:
+        parser.error("--aging must not be negative")
+    if options.compress and options.output_format != "binary":
+        parser.error("--compress needs --output-format binary")
+    records = options.output_format == "binary"
+    # Generate the output file name based on the input file name
+    output_file = options.input_file.split('.')[0] + "_output_file"
+    if records:
+        output_file += {None: ".bin", "gzip": ".bin.gz", "lzma": ".bin.xz"}[options.compress]
+    else:
+        output_file += ".txt"
+    structures = dict(seat_pool=SEAT_POOLS[options.seat_pool],
+                      reservation_store=RESERVATION_STORES[options.reservations],
+                      waitlist=WAITLISTS[options.waitlist],
+                      aging_interval=options.aging,
+                      records=records)
+    # Restart from the last snapshot plus the log tail, if there is one
+    log_offset = log_end = 0
+    if options.snapshot and os.path.exists(options.snapshot):
+        gator_tm, log_offset = GatorTicketMaster.load_snapshot(options.snapshot, **structures)
+    else:
+        gator_tm = GatorTicketMaster(**structures)
+    if options.wal and os.path.exists(options.wal):
+        log_end = replay_log(gator_tm, options.wal, log_offset)
+    command_log = CommandLog(options.wal, end=log_end) if options.wal else None
+    abort_transaction(gator_tm, command_log)
+    if options.stats:
+        Instrumentation().attach(gator_tm)
+     # Process the input file and generate the output
+    process_input(options.input_file, output_file, gator_tm, command_log, options.compress)
+    abort_transaction(gator_tm, command_log)
+    if options.snapshot:
+        gator_tm.save_snapshot(options.snapshot, command_log.offset() if command_log else 0)
+    if command_log is not None:
+        command_log.close()
+    if options.stats:
+        lines = gator_tm.stats()
+        print("\n".join(map(render_result, lines) if records else lines), file=sys.stderr)
+
+
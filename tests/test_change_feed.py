@@ -0,0 +1,131 @@
+import os
+import random
+import sys
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import ChangeFeed, CommandProcessor, GatorTicketMaster
+
+from test_gator_ticket_master import random_commands
+
+
+class Mirror:
+    # What a downstream reader rebuilds from the events alone
+    def __init__(self, gator_tm):
+        self.seats = dict(gator_tm.seat_index.items())
+        self.waiting = Counter(item[2] for waitlist in gator_tm._waitlists() for item in waitlist.items())
+        self.priorities = {}
+
+    def apply(self, events, sequence):
+        for seq, kind, key, value in events:
+            assert seq == sequence, (seq, sequence)
+            sequence += 1
+            if kind == 'assign':
+                assert key not in self.seats, (kind, key)
+                self.seats[key] = value
+            elif kind == 'release':
+                assert self.seats.pop(key) == value, (kind, key)
+            elif kind == 'join':
+                self.waiting[key] += 1
+                self.priorities[key] = value
+            elif kind == 'leave':
+                self.waiting[key] -= 1
+                assert self.waiting[key] >= 0, (kind, key)
+            else:
+                assert self.waiting[key] > 0, (kind, key)
+                self.priorities[key] = value
+        return sequence
+
+
+class ChangeFeedTest(unittest.TestCase):
+    def follow(self, lines, coalesce, batch):
+        # Run lines with a feed attached, polling every few commands, and check the mirror after each poll
+        gator_tm = GatorTicketMaster()
+        execute = CommandProcessor(gator_tm).execute
+        execute(lines[0])
+        feed = ChangeFeed(capacity=1 << 14, coalesce=coalesce)
+        feed.attach(gator_tm)
+        subscription = feed.subscribe()
+        mirror, sequence = Mirror(gator_tm), subscription.cursor
+        for start in range(1, len(lines), batch):
+            for line in lines[start:start + batch]:
+                result = execute(line)
+                if result is not None and not isinstance(result, str):
+                    list(result)
+            sequence = mirror.apply(subscription.poll(), sequence)
+            self.assertEqual(subscription.missed, 0)
+            self.assertEqual(mirror.seats, dict(gator_tm.seat_index.items()))
+            waiting = Counter(item[2] for waitlist in gator_tm._waitlists() for item in waitlist.items())
+            self.assertEqual(+mirror.waiting, waiting)
+        return gator_tm, mirror
+
+    def test_mirror_follows_every_command(self):
+        for seed in range(60):
+            rnd = random.Random(seed)
+            lines = random_commands(rnd, 120, transactions=True)
+            for coalesce in (False, True):
+                with self.subTest(seed=seed, coalesce=coalesce):
+                    self.follow(lines, coalesce, rnd.choice([1, 5, 40]))
+
+    def test_priorities_follow_the_waitlist(self):
+        for seed in range(40):
+            rnd = random.Random(seed)
+            lines = [f"Initialize({rnd.randint(1, 3)})"]
+            # A user may wait more than once, which leaves their priority ambiguous, so only
+            # users who hold and await nothing reserve; a probe system tracks who that is
+            probe = GatorTicketMaster()
+            execute = CommandProcessor(probe).execute
+            execute(lines[0])
+            for _ in range(100):
+                user, priority = rnd.randint(1, 10), rnd.randint(1, 4)
+                line = rnd.choice([f"Reserve({user}, {priority})"] * 3 + [
+                    f"UpdatePriority({user}, {priority})", f"ExitWaitlist({user})",
+                    f"Cancel({rnd.randint(1, 3)}, {user})"])
+                if line.startswith("Reserve") and (probe.reservations.search(user) is not None
+                                                   or probe.waitlist.contains(user)):
+                    line = f"UpdatePriority({user}, {priority})"
+                execute(line)
+                lines.append(line)
+            for coalesce in (False, True):
+                with self.subTest(seed=seed, coalesce=coalesce):
+                    gator_tm, mirror = self.follow(lines, coalesce, rnd.choice([1, 7]))
+                    self.assertEqual({user_id: mirror.priorities[user_id] for user_id in +mirror.waiting},
+                                     {item[2]: item[0] for item in gator_tm.waitlist.items()})
+
+    def test_feed_attached_inside_a_transaction_outlives_it(self):
+        for end in ("Commit()", "Rollback()"):
+            with self.subTest(end=end):
+                gator_tm = GatorTicketMaster()
+                execute = CommandProcessor(gator_tm).execute
+                for line in ("Initialize(2)", "Reserve(1, 1)", "Begin()"):
+                    execute(line)
+                feed = ChangeFeed()
+                feed.attach(gator_tm)
+                subscription = feed.subscribe()
+                mirror, sequence = Mirror(gator_tm), subscription.cursor
+                for line in ("Reserve(2, 1)", "Reserve(3, 1)", end, "Reserve(4, 2)", "Cancel(1, 1)"):
+                    execute(line)
+                mirror.apply(subscription.poll(), sequence)
+                self.assertEqual(mirror.seats, dict(gator_tm.seat_index.items()))
+                self.assertEqual(+mirror.waiting, Counter(item[2] for item in gator_tm.waitlist.items()))
+                feed.detach()
+                self.assertEqual([name for name in ("insert", "delete") if name in vars(gator_tm.seat_index)], [])
+
+    def test_overrun_subscriber_counts_missed_events(self):
+        gator_tm = GatorTicketMaster()
+        execute = CommandProcessor(gator_tm).execute
+        execute("Initialize(10)")
+        feed = ChangeFeed(capacity=4)
+        feed.attach(gator_tm)
+        subscription = feed.subscribe()
+        for user_id in range(1, 11):
+            execute(f"Reserve({user_id}, 1)")
+        events = subscription.poll()
+        self.assertEqual(subscription.missed, 6)
+        self.assertEqual(events, [(seq, 'assign', seq + 1, seq + 1) for seq in range(6, 10)])
+
+
+if __name__ == "__main__":
+    unittest.main()
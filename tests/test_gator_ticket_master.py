@@ -0,0 +1,303 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import (RESERVATION_STORES, SEAT_POOLS,
+                               WAITLISTS, CommandProcessor, DenseReservationStore, GatorTicketMaster, Instrumentation,
+                               MinHeap, SeatRangePool, SegmentTreeSeatPool, process_input)
+
+
+def run(lines, **options):
+    # Output lines of a command list, as process_input would write them
+    execute = CommandProcessor(GatorTicketMaster(**options)).execute
+    output = []
+    for line in lines:
+        result = execute(line)
+        if isinstance(result, str):
+            result = [result]
+        for message in result or ():
+            output.extend(message.split("\n"))
+    return output
+
+
+def random_commands(rnd, count, users=10, transactions=False):
+    # A random command list over a few users, so seats, waitlists, blocks, holds and sections all interact
+    lines = [f"Initialize({rnd.randint(1, 8)})"]
+    for _ in range(count):
+        user, priority, r = rnd.randint(1, users), rnd.randint(1, 4), rnd.randint
+        choices = [f"Reserve({user}, {priority})"] * 4 + [
+            f"Cancel({r(1, 12)}, {user})", f"AddSeats({r(1, 3)})", f"ExitWaitlist({user})",
+            f"UpdatePriority({user}, {priority})", f"ReleaseSeats({user}, {user + r(0, 3)})",
+            f"ReserveMany({user}, {user + r(0, 3)}, {priority})", f"ReserveBlock({user}, {r(1, 3)}, {priority})",
+            f"Hold({user}, {priority}, {r(1, 4)})", f"ConfirmHold({user})",
+            f"InitializeSection({r(1, 3)}, {r(1, 3)}, {r(1, 2)})", f"ReserveSection({user}, {r(1, 3)}, {priority})",
+            f"ReserveTier({user}, {r(1, 2)}, {priority})", f"ReserveBest({user}, {priority})",
+            "Available()", "PrintReservations()"]
+        if transactions:
+            choices += ["Begin()", "Commit()", "Rollback()"]
+        lines.append(rnd.choice(choices))
+    return lines
+
+
+def state(gator_tm):
+    # Everything a command can change, in a form that compares equal whatever the structures' layout
+    return (gator_tm.last_seat_number, gator_tm.next_sequence, list(gator_tm.seat_index.items()),
+            sorted(gator_tm.reservations.items()), list(gator_tm.available_seats.free_runs()),
+            sorted(gator_tm.waitlist.items()), sorted(gator_tm.block_waitlist.items()),
+            {section: sorted(w.items()) for section, w in gator_tm.section_waitlists.items()},
+            {tier: sorted(w.items()) for tier, w in gator_tm.tier_waitlists.items()},
+            dict(gator_tm.blocks), dict(gator_tm.block_requests), dict(gator_tm.holds))
+
+
+def combinations():
+    # Every seat pool, reservation store and waitlist combination
+    for seat_pool in SEAT_POOLS.values():
+        for reservation_store in RESERVATION_STORES.values():
+            for waitlist in WAITLISTS.values():
+                yield dict(seat_pool=seat_pool, reservation_store=reservation_store, waitlist=waitlist)
+
+
+class DuplicateBookingTest(unittest.TestCase):
+    def test_duplicate_reserves_on_a_full_venue(self):
+        lines = ["Initialize(4)", "Reserve(1, 1)", "Reserve(2, 1)", "Reserve(3, 1)", "Reserve(4, 1)",
+                 "Reserve(15, 3)", "Reserve(15, 5)", "Reserve(16, 2)", "Reserve(16, 4)", "Available()",
+                 "ReleaseSeats(15, 18)", "Available()", "ReleaseSeats(1, 2)", "PrintReservations()", "Available()"]
+        expected = ["4 Seats are made available for reservation",
+                    "User 1 reserved seat 1", "User 2 reserved seat 2",
+                    "User 3 reserved seat 3", "User 4 reserved seat 4",
+                    "User 15 is added to the waiting list", "User 15 is added to the waiting list",
+                    "User 16 is added to the waiting list", "User 16 is added to the waiting list",
+                    "Total Seats Available : 0, Waitlist : 4",
+                    "Reservations of the Users in the range [15, 18] are released",
+                    "Total Seats Available : 0, Waitlist : 2",
+                    "Reservations of the Users in the range [1, 2] are released",
+                    "User 15 reserved seat 1", "User 16 reserved seat 2",
+                    "[seat 1, user 15]", "[seat 2, user 16]", "[seat 3, user 3]", "[seat 4, user 4]",
+                    "Total Seats Available : 0, Waitlist : 0"]
+        for options in combinations():
+            with self.subTest(**{name: cls.__name__ for name, cls in options.items()}):
+                self.assertEqual(run(lines, **options), expected)
+
+    def test_duplicate_waiting_user_is_served_once_per_entry(self):
+        lines = ["Initialize(1)", "Reserve(1, 1)", "Reserve(2, 1)", "Reserve(2, 3)", "Cancel(1, 1)", "Available()"]
+        self.assertEqual(run(lines)[-4:], ["User 2 is added to the waiting list",
+                                           "User 1 canceled their reservation", "User 2 reserved seat 1",
+                                           "Total Seats Available : 0, Waitlist : 1"])
+
+    def test_batch_reassignment_after_repeated_reserves(self):
+        lines = ["Initialize(2)", "Reserve(1, 1)", "Reserve(2, 1)", "Reserve(3, 1)", "Reserve(4, 2)", "Reserve(3, 5)",
+                 "Reserve(5, 1)", "Reserve(4, 3)", "AddSeats(2)", "ReleaseSeats(1, 2)", "Available()"]
+        expected = ["User 3 is added to the waiting list", "User 5 is added to the waiting list",
+                    "User 4 is added to the waiting list", "Additional 2 Seats are made available for reservation",
+                    "User 3 reserved seat 3", "User 4 reserved seat 4",
+                    "Reservations of the Users in the range [1, 2] are released", "User 4 reserved seat 1",
+                    "User 3 reserved seat 2", "Total Seats Available : 0, Waitlist : 1"]
+        for options in combinations():
+            with self.subTest(**{name: cls.__name__ for name, cls in options.items()}):
+                self.assertEqual(run(lines, **options)[5:], expected)
+
+    def test_user_with_several_seats(self):
+        # Cancel and ReleaseSeats reach the reservation met first on the way down the tree
+        lines = ["Initialize(4)", "Reserve(1, 1)", "Reserve(1, 1)", "Reserve(1, 1)", "Cancel(2, 1)", "Cancel(1, 1)",
+                 "Reserve(2, 1)", "ReleaseSeats(1, 1)", "PrintReservations()", "ReleaseSeats(1, 2)", "Available()"]
+        expected = ["User 1 canceled their reservation", "User 1 has no reservation for seat 1",
+                    "User 2 reserved seat 2", "Reservations of the Users in the range [1, 1] are released",
+                    "[seat 1, user 1]", "[seat 2, user 2]",
+                    "Reservations of the Users in the range [1, 2] are released",
+                    "Total Seats Available : 4, Waitlist : 0"]
+        for options in combinations():
+            if options["reservation_store"] is DenseReservationStore:
+                continue
+            with self.subTest(**{name: cls.__name__ for name, cls in options.items()}):
+                self.assertEqual(run(lines, **options)[4:], expected)
+
+    def test_every_booking_command_books_a_seated_user_again(self):
+        commands = ["Reserve(1, 1)", "ReserveMany(1, 1, 1)", "ReserveBlock(1, 2, 1)", "ReserveSection(1, 1, 1)",
+                    "ReserveTier(1, 1, 1)", "ReserveBest(1, 1)", "Hold(1, 1, 5)"]
+        for command in commands:
+            with self.subTest(command=command):
+                gator_tm = GatorTicketMaster()
+                execute = CommandProcessor(gator_tm).execute
+                for line in ["InitializeSection(1, 4, 1)", "Reserve(1, 1)", command]:
+                    execute(line)
+                self.assertEqual([seat for user, seat in gator_tm.reservations.items() if user == 1][0], 1)
+                self.assertEqual(len(gator_tm.reservations), 2)
+
+    def test_hold_of_a_user_with_several_seats(self):
+        lines = ["Initialize(3)", "Reserve(1, 1)", "Hold(1, 1, 2)", "Hold(1, 1, 3)", "ConfirmHold(1)",
+                 "ExitWaitlist(9)", "ExitWaitlist(9)", "ExitWaitlist(9)", "Available()"]
+        self.assertEqual(run(lines)[4:], ["User 1 confirmed seat 2", "User 9 is not in waitlist",
+                                          "User 9 is not in waitlist", "User 1's hold on seat 3 expired",
+                                          "User 9 is not in waitlist", "Total Seats Available : 1, Waitlist : 0"])
+
+
+class StatsTest(unittest.TestCase):
+    def test_stats_counts_every_waiting_request(self):
+        lines = ["Initialize(2)", "Reserve(1, 1)", "Reserve(2, 1)", "Reserve(3, 1)", "ReserveBlock(4, 2, 1)"]
+        output = run(lines + ["Available()", "Stats()"])
+        self.assertEqual(output[5], "Total Seats Available : 0, Waitlist : 2")
+        self.assertEqual(output[7], output[5])
+
+
+class PrintReservationsTest(unittest.TestCase):
+    def test_result_is_a_snapshot(self):
+        gator_tm = GatorTicketMaster()
+        execute = CommandProcessor(gator_tm).execute
+        for line in ["Initialize(3)", "Reserve(1, 1)", "Reserve(2, 1)"]:
+            execute(line)
+        printed = execute("PrintReservations()")
+        execute("Cancel(1, 1)")
+        execute("Reserve(3, 1)")
+        self.assertEqual(printed, ["[seat 1, user 1]", "[seat 2, user 2]"])
+
+    def test_process_input_streams_the_same_lines(self):
+        lines = ["Initialize(3)", "Reserve(1, 1)", "Reserve(2, 1)", "PrintReservations()", "Cancel(1, 1)",
+                 "PrintReservations()"]
+        with tempfile.TemporaryDirectory() as tmp:
+            input_file, output_file = os.path.join(tmp, "input.txt"), os.path.join(tmp, "output.txt")
+            with open(input_file, "w") as f:
+                f.write("\n".join(lines) + "\n")
+            gator_tm = GatorTicketMaster()
+            Instrumentation().attach(gator_tm)
+            process_input(input_file, output_file, gator_tm)
+            with open(output_file) as f:
+                self.assertEqual(f.read().splitlines(), run(lines))
+        self.assertEqual(gator_tm.instrumentation.histograms["PrintReservations"].count, 2)
+
+    def test_instrumented_results_keep_their_types(self):
+        lines = ["Initialize(3)", "Reserve(1, 1)", "ReserveMany(2, 3, 1)", "Reserve(4, 1)", "PrintReservations()",
+                 "ReleaseSeats(1, 2)", "Available()"]
+        for records in (False, True):
+            with self.subTest(records=records):
+                plain, timed = GatorTicketMaster(records=records), GatorTicketMaster(records=records)
+                Instrumentation().attach(timed)
+                execute, execute_timed = CommandProcessor(plain).execute, CommandProcessor(timed).execute
+                for line in lines:
+                    result, timed_result = execute(line), execute_timed(line)
+                    self.assertIs(type(timed_result), type(result))
+                    self.assertEqual(timed_result, result)
+                self.assertEqual(timed.instrumentation.histograms["PrintReservations"].count, 1)
+        gator_tm = GatorTicketMaster()
+        Instrumentation().attach(gator_tm)
+        execute = CommandProcessor(gator_tm, stream=True).execute
+        execute("Initialize(2)")
+        lines = execute("PrintReservations()")
+        self.assertEqual(gator_tm.instrumentation.histograms["PrintReservations"].count, 0)
+        self.assertEqual(list(lines), [])
+        self.assertEqual(gator_tm.instrumentation.histograms["PrintReservations"].count, 1)
+
+
+class DenseStoreTest(unittest.TestCase):
+    def test_repeated_key_keeps_every_seat_in_both_modes(self):
+        store = DenseReservationStore()
+        for key in range(10):
+            store.insert(key, key)
+        store.insert(100000, 1)  # Far past the dense span: migrates to the tree
+        self.assertIsNotNone(store.tree)
+        store.insert(5, 50)
+        store.insert_many([(6, 60), (20, 2)])
+        self.assertEqual(list(store.items_between(5, 6)), [(5, 5), (5, 50), (6, 6), (6, 60)])
+        self.assertEqual(len(store), 14)
+        for key in range(10, 40000):  # Dense again: migrates back to the table
+            store.insert(key, key)
+        self.assertIsNone(store.tree)
+        self.assertEqual(list(store.items_between(5, 6)), [(5, 5), (5, 50), (6, 6), (6, 60)])
+        self.assertEqual(len(store), len(list(store.items_between(None, None))))
+        # A user's earliest seat is found and deleted first
+        store.delete(5)
+        store.delete_item(6, 6)
+        self.assertEqual((store.search(5), store.search(6), store.search(20)), (50, 60, 2))
+        self.assertEqual(store.delete_range(5, 21), [(5, 50), (6, 60)] + [(k, k) for k in range(7, 20)]
+                         + [(20, 2), (21, 21)])
+        self.assertEqual(list(store.items_between(20, 20)), [(20, 20)])
+
+
+def runs_of(seats):
+    # The sorted seats as (first, last) runs of adjacent seats
+    runs = []
+    for seat in sorted(seats):
+        if runs and runs[-1][1] == seat - 1:
+            runs[-1] = (runs[-1][0], seat)
+        else:
+            runs.append((seat, seat))
+    return runs
+
+
+class SeatRangePoolTest(unittest.TestCase):
+    def test_runs_move_into_the_tree_and_back(self):
+        modes = []
+        for seed in range(20):
+            rnd = random.Random(seed)
+            pool, free = SeatRangePool(), set()
+            pool.TREE_RUNS, pool.LIST_RUNS = 8, 4
+            last = 0
+            for _ in range(400):
+                op = rnd.random()
+                if op < 0.1 or not free:
+                    count = rnd.randint(1, 10)
+                    pool.insert_range(last + 1, last + count)
+                    free.update(range(last + 1, last + count + 1))
+                    last += count
+                elif op < 0.5:
+                    seat = rnd.randint(1, last)
+                    pool.insert(seat)
+                    free.add(seat)
+                elif op < 0.8:
+                    seat = min(free)
+                    free.remove(seat)
+                    self.assertEqual(pool.extract_min(), seat)
+                elif op < 0.9:
+                    seats = sorted(free)[:rnd.randint(1, 5)]
+                    free.difference_update(seats)
+                    self.assertEqual(pool.take_lowest(len(seats)), seats)
+                else:
+                    first, run_last = rnd.choice(runs_of(free))
+                    first = rnd.randint(first, run_last)
+                    run_last = rnd.randint(first, run_last)
+                    pool.discard_range(first, run_last)
+                    free.difference_update(range(first, run_last + 1))
+                modes.append(pool.tree is not None)
+                self.assertEqual(list(pool.free_runs()), runs_of(free))
+                self.assertEqual((len(pool), pool.runs()), (len(free), len(runs_of(free))))
+        # Both modes are exercised, with migrations in both directions
+        self.assertGreater(sum(a != b for a, b in zip(modes, modes[1:])), 20)
+
+
+class BlockPoolTest(unittest.TestCase):
+    def test_first_block_request_moves_to_the_segment_tree(self):
+        for seat_pool in SEAT_POOLS.values():
+            with self.subTest(seat_pool=seat_pool.__name__):
+                gator_tm = GatorTicketMaster(seat_pool=seat_pool)
+                execute = CommandProcessor(gator_tm).execute
+                for line in ["Initialize(10)", "Reserve(1, 1)", "Reserve(2, 1)", "Cancel(1, 1)", "Reserve(3, 1)"]:
+                    execute(line)
+                self.assertEqual(execute("ReserveBlock(4, 3, 1)"), "User 4 reserved seats 3-5")
+                self.assertIsInstance(gator_tm.available_seats, SegmentTreeSeatPool)
+                self.assertEqual(list(gator_tm.available_seats.free_runs()), [(6, 10)])
+
+    def test_sections_move_every_run(self):
+        gator_tm = GatorTicketMaster()
+        execute = CommandProcessor(gator_tm).execute
+        for line in ["InitializeSection(1, 3, 1)", "InitializeSection(2, 4, 2)", "ReserveSection(1, 2, 1)"]:
+            execute(line)
+        self.assertEqual(execute("ReserveBlock(2, 3, 1)"), "User 2 reserved seats 1-3")
+        self.assertTrue(all(isinstance(pool, SegmentTreeSeatPool) for pool in gator_tm.available_seats.pools))
+        self.assertEqual(execute("InitializeSection(3, 2, 1)"),
+                         "Section 3 with 2 seats (tier 1) is made available for reservation")
+        self.assertIsInstance(gator_tm.available_seats.pools[-1], SegmentTreeSeatPool)
+
+    def test_rollback_puts_the_pool_back(self):
+        gator_tm = GatorTicketMaster()
+        execute = CommandProcessor(gator_tm).execute
+        for line in ["Initialize(6)", "Reserve(1, 1)", "Begin()", "ReserveBlock(2, 2, 1)", "Rollback()"]:
+            execute(line)
+        self.assertIsInstance(gator_tm.available_seats, MinHeap)
+        self.assertEqual(execute("ReserveBlock(3, 5, 1)"), "User 3 reserved seats 2-6")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import CommandProcessor, GatorTicketMaster, TimerWheel
+
+from test_gator_ticket_master import run
+
+
+class TimerWheelTest(unittest.TestCase):
+    def test_fires_like_a_sorted_list(self):
+        for seed in range(20):
+            rnd = random.Random(seed)
+            wheel, pending, now = TimerWheel(), [], 0
+            for key in range(300):
+                if rnd.random() < 0.6:
+                    # Delays that land on every level, and some already in the past
+                    expiry = now + rnd.choice([rnd.randint(-5, 300), rnd.randint(256, 70000)])
+                    wheel.schedule(key, expiry)
+                    # A past expiry fires on the next tick, still reporting its own expiry
+                    pending.append((max(expiry, now + 1), expiry, key))
+                else:
+                    now += rnd.choice([1, rnd.randint(1, 300), rnd.randint(1, 5000)])
+                    due = sorted(timer[1:] for timer in pending if timer[0] <= now)
+                    pending = [timer for timer in pending if timer[0] > now]
+                    with self.subTest(seed=seed, now=now):
+                        self.assertEqual(sorted(wheel.advance(now)), due)
+                        self.assertEqual(len(wheel), len(pending))
+
+    def test_idle_clock_jumps(self):
+        wheel = TimerWheel(now=10)
+        self.assertEqual(wheel.advance(1 << 40), [])
+        self.assertEqual(wheel.time, 1 << 40)
+        wheel.schedule("a", wheel.time + 3)
+        self.assertEqual(wheel.advance(wheel.time + 2), [])
+        self.assertEqual(wheel.advance(wheel.time + 1), [((1 << 40) + 3, "a")])
+
+
+class HoldTest(unittest.TestCase):
+    def test_expired_hold_goes_to_the_waitlist(self):
+        lines = ["Initialize(1)", "Hold(1, 1, 2)", "Reserve(2, 3)", "Reserve(3, 1)", "Hold(4, 1, 1)", "Available()"]
+        self.assertEqual(run(lines)[1:], ["User 1 holds seat 1 for 2 commands", "User 2 is added to the waiting list",
+                                          "User 3 is added to the waiting list", "User 1's hold on seat 1 expired",
+                                          "User 2 reserved seat 1", "User 4 is added to the waiting list",
+                                          "Total Seats Available : 0, Waitlist : 2"])
+
+    def test_confirmed_hold_does_not_expire(self):
+        lines = ["Initialize(2)", "Hold(1, 1, 1)", "ConfirmHold(1)", "Reserve(2, 1)", "Reserve(3, 1)",
+                 "ConfirmHold(1)", "PrintReservations()"]
+        self.assertEqual(run(lines)[1:], ["User 1 holds seat 1 for 1 commands", "User 1 confirmed seat 1",
+                                          "User 2 reserved seat 2", "User 3 is added to the waiting list",
+                                          "User 1 has no hold to confirm", "[seat 1, user 1]", "[seat 2, user 2]"])
+
+    def test_malformed_line_keeps_the_hold(self):
+        # The line fails to parse before the clock moves, so the expiry is reported by the next command
+        execute = CommandProcessor(GatorTicketMaster()).execute
+        self.assertEqual([execute(line) for line in ("Initialize(1)", "Hold(1, 5, 1)", "Reserve(2, 1)")],
+                         ["1 Seats are made available for reservation", "User 1 holds seat 1 for 1 commands",
+                          "User 2 is added to the waiting list"])
+        with self.assertRaises(ValueError):
+            execute("Reserve(x, 1)")
+        self.assertEqual(execute("Available()"), "Total Seats Available : 0, Waitlist : 1")
+        self.assertEqual(execute("Reserve(3, 1)"), "User 1's hold on seat 1 expired\nUser 2 reserved seat 1\n"
+                                                   "User 3 is added to the waiting list")
+
+    def test_mass_expiry_on_one_tick(self):
+        # Later holds get shorter ttls, so all 500 run out on the same tick
+        lines = ["Initialize(500)"] + [f"Hold({user_id}, 1, {501 - user_id})" for user_id in range(1, 501)]
+        lines += ["Reserve(501, 1)", "Reserve(502, 1)", "Available()"]
+        output = run(lines)
+        self.assertEqual(output[501], "User 501 is added to the waiting list")
+        self.assertEqual(output[502:1002], [f"User {user_id}'s hold on seat {user_id} expired"
+                                            for user_id in range(1, 501)])
+        self.assertEqual(output[1002:], ["User 501 reserved seat 1", "User 502 reserved seat 2",
+                                         "Total Seats Available : 498, Waitlist : 0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorMultiEvent import EventRouter, process_events
+from gatorTicketMaster import process_input
+
+from test_gator_ticket_master import random_commands
+
+
+def with_event(event_id, line):
+    # "Reserve(3, 1)" -> "Reserve(evt, 3, 1)"
+    name, _, rest = line.partition('(')
+    return f"{name}({event_id}, {rest}" if rest != ')' else f"{name}({event_id})"
+
+
+def single_event(tmp, lines):
+    # Output of the lines run as one event by process_input
+    source, output = os.path.join(tmp, "single_in.txt"), os.path.join(tmp, "single_out.txt")
+    with open(source, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    process_input(source, output)
+    with open(output) as f:
+        return f.read().splitlines()
+
+
+class MultiEventTest(unittest.TestCase):
+    def test_each_event_matches_single_event_mode(self):
+        rnd = random.Random(7)
+        events = {f"evt{i}": random_commands(rnd, 150) for i in range(5)}
+        events["evt0"].insert(3, "Reserve(x, 1)")
+        merged = [(event_id, line) for event_id, lines in events.items() for line in lines]
+        rnd.shuffle(merged)
+        # Keep each event's own commands in order
+        cursors = dict.fromkeys(events, 0)
+        ordered = []
+        for event_id, _ in merged:
+            ordered.append(with_event(event_id, events[event_id][cursors[event_id]]))
+            cursors[event_id] += 1
+        with tempfile.TemporaryDirectory() as tmp:
+            source, output = os.path.join(tmp, "in.txt"), os.path.join(tmp, "out.txt")
+            with open(source, "w") as f:
+                f.write("\n".join(ordered + ["Quit()"]) + "\n")
+            process_events(source, output, 3, tmp)
+            for event_id, lines in events.items():
+                with open(os.path.join(tmp, f"{event_id}_output_file.txt")) as f:
+                    produced = f.read().splitlines()
+                valid = [line for line in lines if line != "Reserve(x, 1)"]
+                expected = single_event(tmp, valid)
+                if event_id == "evt0":
+                    expected.insert(len(single_event(tmp, valid[:3])), "Invalid command")
+                self.assertEqual(produced, expected, event_id)
+            with open(output) as f:
+                self.assertEqual(f.read().splitlines()[-1], "Program Terminated!!")
+
+    def test_worker_answers_quit_and_failures(self):
+        router = EventRouter(1)
+        try:
+            self.assertEqual(router.run_batch([("a", "Initialize(1)"), ("a", "Reserve(1)"), ("a", "Quit()")]),
+                             ["1 Seats are made available for reservation", "Invalid command",
+                              "Program Terminated!!"])
+        finally:
+            router.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorReplica import SeatMapPublisher, SeatMapReader
+from gatorTicketMaster import CommandProcessor, GatorTicketMaster
+
+
+class ReplicaTest(unittest.TestCase):
+    def setUp(self):
+        self.gator_tm = GatorTicketMaster()
+        self.execute = CommandProcessor(self.gator_tm).execute
+        self.publisher = SeatMapPublisher(self.gator_tm, f"gtm_test_{os.getpid()}", seat_capacity=16, user_capacity=16)
+        self.reader = SeatMapReader(self.publisher.name)
+
+    def tearDown(self):
+        self.reader.close()
+        self.publisher.close()
+
+    def assert_mirrored(self, users):
+        # The reader answers like the writer for every user and seat
+        self.publisher.publish()
+        for user_id in users:
+            line = f"ReservationOf({user_id})"
+            self.assertEqual(self.reader.execute(line), self.execute(line))
+        for seat_id in range(1, self.gator_tm.last_seat_number + 1):
+            self.assertEqual(self.reader.execute(f"SeatOwner({seat_id})"), self.execute(f"SeatOwner({seat_id})"))
+        self.assertEqual(self.reader.execute("Available()"), self.execute("Available()"))
+        self.assertEqual(self.reader.execute("PrintReservations()"), list(self.execute("PrintReservations()")))
+
+    def test_sparse_and_negative_user_ids(self):
+        users = [10 ** 15, -5, -(1 << 62), 0, 7, 1 << 40]
+        self.execute("Initialize(8)")
+        for user_id in users:
+            self.execute(f"Reserve({user_id}, 1)")
+        self.assert_mirrored(users + [8, -6])
+        self.assertLess(self.publisher.segment.shm.size, 1 << 16)
+        self.execute("Cancel(2, -5)")
+        self.assert_mirrored(users)
+
+    def test_churn_keeps_the_user_table_in_step(self):
+        rnd = random.Random(3)
+        users = [rnd.randrange(-(1 << 50), 1 << 50) for _ in range(300)]
+        self.execute("Initialize(200)")
+        for step in range(20):
+            for user_id in rnd.sample(users, 60):
+                self.execute(f"Reserve({user_id}, 1)")
+            for user_id in rnd.sample(users, 60):
+                seat = self.gator_tm.reservations.search(user_id)
+                if seat is not None:
+                    self.execute(f"Cancel({seat}, {user_id})")
+            self.assert_mirrored(users)
+        self.assertEqual(self.reader.execute("ReservationOf(-1)"), "Unknown command")
+
+
+if __name__ == "__main__":
+    unittest.main()
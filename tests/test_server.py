@@ -0,0 +1,78 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorServer import TicketServer
+from gatorTicketMaster import CommandLog, GatorTicketMaster, replay_log
+
+from test_gator_ticket_master import state
+
+
+class WriterTest(unittest.TestCase):
+    def replies(self, server, lines):
+        # Queue lines as one pipelined batch and return the writer's replies
+        async def main():
+            loop = asyncio.get_running_loop()
+            futures = [loop.create_future() for _ in lines]
+            for line, future in zip(lines, futures):
+                server.queue.put_nowait((line, future))
+            writer = asyncio.create_task(server.run_writer())
+            try:
+                return await asyncio.wait_for(asyncio.gather(*futures), 5)
+            finally:
+                writer.cancel()
+        return asyncio.run(main())
+
+    def test_replies_frame_multi_line_results(self):
+        server = TicketServer(GatorTicketMaster())
+        replies = self.replies(server, ["Initialize(1)", "Reserve(1, 1)", "Reserve(2, 1)", "Cancel(1, 1)", "Quit()"])
+        self.assertEqual(replies, [("1\n1 Seats are made available for reservation\n", False),
+                                   ("1\nUser 1 reserved seat 1\n", False),
+                                   ("1\nUser 2 is added to the waiting list\n", False),
+                                   ("2\nUser 1 canceled their reservation\nUser 2 reserved seat 1\n", False),
+                                   ("1\nProgram Terminated!!\n", True)])
+
+    def test_failing_command_is_answered(self):
+        server = TicketServer(GatorTicketMaster())
+        execute = server.execute
+
+        def failing(line):
+            if line == "Available()":
+                raise KeyError(42)
+            return execute(line)
+        server.execute = failing
+        replies = self.replies(server, ["Available()", "Reserve(x, 1)", "Initialize(2)"])
+        self.assertEqual(replies, [("1\nError: KeyError: 42\n", False), ("1\nInvalid command\n", False),
+                                   ("1\n2 Seats are made available for reservation\n", False)])
+
+    def test_transactions_are_refused(self):
+        server = TicketServer(GatorTicketMaster())
+        replies = self.replies(server, ["Initialize(1)", "Begin()", "Reserve(1, 1)", "Rollback()", "Available()"])
+        refused = ("1\nTransactions are not available in server mode\n", False)
+        self.assertEqual(replies[1], refused)
+        self.assertEqual(replies[3], refused)
+        self.assertEqual(replies[4], ("1\nTotal Seats Available : 0, Waitlist : 0\n", False))
+        self.assertIsNone(server.gator_tm.transaction)
+
+    def test_batches_are_logged_before_replying(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            wal = os.path.join(tmp, "commands.log")
+            command_log = CommandLog(wal, group_interval=3600)
+            server = TicketServer(GatorTicketMaster(), command_log=command_log)
+            lines = ["Initialize(2)", "Reserve(1, 1)", "Available()", "Reserve(x, 1)", "Begin()", "Reserve(2, 3)",
+                     "Cancel(1, 1)", "Quit()"]
+            self.replies(server, lines)
+            with open(wal, "rb") as f:
+                self.assertEqual(f.read(), b"Initialize(2)\nReserve(1, 1)\nReserve(2, 3)\nCancel(1, 1)\n")
+            command_log.close()
+            restored = GatorTicketMaster()
+            replay_log(restored, wal)
+            self.assertEqual(state(restored), state(server.gator_tm))
+
+
+if __name__ == "__main__":
+    unittest.main()
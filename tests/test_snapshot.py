@@ -0,0 +1,124 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import (CommandLog, CommandProcessor, GatorTicketMaster, READ_ONLY_COMMANDS, process_input,
+                               replay_log)
+
+from test_gator_ticket_master import combinations, random_commands, state
+
+
+def execute_all(execute, lines):
+    # Run lines and return their output, consuming streamed results
+    output = []
+    for line in lines:
+        result = execute(line)
+        output.append(result if isinstance(result, str) or result is None else list(result))
+    return output
+
+
+class SnapshotTest(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state.snap")
+            for seed in range(40):
+                rnd = random.Random(seed)
+                options = rnd.choice(list(combinations()))
+                aging_interval = rnd.choice([0, 3])
+                gator_tm = GatorTicketMaster(aging_interval=aging_interval, **options)
+                execute_all(CommandProcessor(gator_tm).execute, random_commands(rnd, rnd.randint(0, 60)))
+                gator_tm.save_snapshot(path, log_offset=seed)
+                loaded, log_offset = GatorTicketMaster.load_snapshot(path, **options)
+                with self.subTest(seed=seed, **{name: cls.__name__ for name, cls in options.items()}):
+                    self.assertEqual(log_offset, seed)
+                    self.assertEqual(state(loaded), state(gator_tm))
+                    self.assertEqual(loaded.holds, gator_tm.holds)
+                    self.assertEqual(loaded.reservations.layout(), gator_tm.reservations.layout())
+                    self.assertEqual((loaded.clock, loaded.aging_interval), (gator_tm.clock, aging_interval))
+                    # Both go on to answer the same commands the same way
+                    more = random_commands(rnd, 40)[1:]
+                    self.assertEqual(execute_all(CommandProcessor(loaded).execute, more),
+                                     execute_all(CommandProcessor(gator_tm).execute, more))
+
+    def test_snapshot_plus_log_tail(self):
+        rnd = random.Random(1)
+        first, tail = random_commands(rnd, 40), random_commands(rnd, 40)[1:]
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot, wal = os.path.join(tmp, "state.snap"), os.path.join(tmp, "commands.log")
+            gator_tm = GatorTicketMaster()
+            execute = CommandProcessor(gator_tm).execute
+            command_log = CommandLog(wal)
+            for lines in (first, tail):
+                for line in lines:
+                    if line.partition('(')[0] not in READ_ONLY_COMMANDS:
+                        command_log.append(line)
+                    execute_all(execute, [line])
+                if lines is first:
+                    gator_tm.save_snapshot(snapshot, command_log.offset())
+            command_log.close()
+            restored, log_offset = GatorTicketMaster.load_snapshot(snapshot)
+            replay_log(restored, wal, log_offset)
+        self.assertEqual(state(restored), state(gator_tm))
+
+    def test_torn_line_is_cut_off(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            wal = os.path.join(tmp, "commands.log")
+            with open(wal, "wb") as f:
+                f.write(b"Initialize(3)\nReserve(1, 1)\nReserve(2, 1")
+            for restart in range(2):
+                gator_tm = GatorTicketMaster()
+                command_log = CommandLog(wal, end=replay_log(gator_tm, wal))
+                execute = CommandProcessor(gator_tm).execute
+                command_log.append("Reserve(3, 1)")
+                execute("Reserve(3, 1)")
+                command_log.close()
+            with open(wal, "rb") as f:
+                self.assertEqual(f.read(), b"Initialize(3)\nReserve(1, 1)\nReserve(3, 1)\nReserve(3, 1)\n")
+            restored = GatorTicketMaster()
+            replay_log(restored, wal)
+            self.assertEqual(state(restored), state(gator_tm))
+
+    def test_failing_command_is_not_logged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source, output, wal = (os.path.join(tmp, name) for name in ("in.txt", "out.txt", "commands.log"))
+            with open(source, "w") as f:
+                f.write("Initialize(2)\nReserve(1, 1)\nReserve(2, 1)\nReserve(x, 1)\nReserve(3, 1)\n")
+            gator_tm, command_log = GatorTicketMaster(), CommandLog(wal)
+            with self.assertRaises(ValueError):
+                process_input(source, output, gator_tm, command_log)
+            command_log.close()
+            with open(wal, "rb") as f:
+                self.assertEqual(f.read(), b"Initialize(2)\nReserve(1, 1)\nReserve(2, 1)\n")
+            restored = GatorTicketMaster()
+            replay_log(restored, wal)
+            self.assertEqual(state(restored), state(gator_tm))
+
+    def test_failing_command_leaves_holds_alone(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source, output, wal = (os.path.join(tmp, name) for name in ("in.txt", "out.txt", "commands.log"))
+            with open(source, "w") as f:
+                f.write("Initialize(1)\nHold(1, 5, 1)\nReserve(2, 1)\nReserve(x, 1)\n")
+            gator_tm, command_log = GatorTicketMaster(), CommandLog(wal)
+            with self.assertRaises(ValueError):
+                process_input(source, output, gator_tm, command_log)
+            command_log.close()
+            restored = GatorTicketMaster()
+            replay_log(restored, wal)
+            self.assertEqual(state(restored), state(gator_tm))
+            self.assertEqual((gator_tm.clock, gator_tm.holds), (restored.clock, {1: 4}))
+
+    def test_rejects_other_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state.snap")
+            with open(path, "wb") as f:
+                f.write(b"not a snapshot")
+            with self.assertRaises(ValueError):
+                GatorTicketMaster.load_snapshot(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import CommandProcessor, GatorTicketMaster
+
+from test_gator_ticket_master import combinations, random_commands, state
+
+
+class TransactionTest(unittest.TestCase):
+    def test_rollback_restores_the_state_at_begin(self):
+        for seed in range(40):
+            rnd = random.Random(seed)
+            options = rnd.choice(list(combinations()))
+            gator_tm = GatorTicketMaster(**options)
+            execute = CommandProcessor(gator_tm).execute
+            for line in random_commands(rnd, rnd.randint(0, 30)):
+                list(execute(line) or ())
+            before = state(gator_tm)
+            execute("Begin()")
+            for line in random_commands(rnd, rnd.randint(1, 40))[1:]:
+                list(execute(line) or ())
+            execute("Rollback()")
+            with self.subTest(seed=seed, **{name: cls.__name__ for name, cls in options.items()}):
+                self.assertEqual(state(gator_tm), before)
+
+    def test_rollback_keeps_hold_expiries(self):
+        gator_tm = GatorTicketMaster()
+        execute = CommandProcessor(gator_tm).execute
+        for line in ["Initialize(3)", "Hold(1, 1, 3)", "Hold(2, 1, 50)"]:
+            execute(line)
+        holds = dict(gator_tm.holds)
+        execute("Begin()")
+        self.assertEqual(execute("ConfirmHold(2)"), "User 2 confirmed seat 2")
+        self.assertEqual(execute("Reserve(3, 1)"), "User 3 reserved seat 3")
+        self.assertEqual(execute("Reserve(4, 1)"), "User 1's hold on seat 1 expired\nUser 4 reserved seat 1")
+        execute("Rollback()")
+        self.assertEqual(gator_tm.holds, holds)
+        self.assertEqual(execute("Available()"), "Total Seats Available : 1, Waitlist : 0")
+        self.assertEqual(execute("Reserve(5, 1)"), "User 1's hold on seat 1 expired\nUser 5 reserved seat 1")
+        self.assertEqual(list(gator_tm.holds), [2])
+        self.assertEqual(len(gator_tm.hold_timers), 1)
+
+    def test_commit_keeps_the_changes(self):
+        gator_tm = GatorTicketMaster()
+        execute = CommandProcessor(gator_tm).execute
+        for line in ["Initialize(2)", "Begin()", "Reserve(1, 1)", "ReserveBlock(2, 1, 1)", "Commit()", "Rollback()"]:
+            result = execute(line)
+        self.assertEqual(result, "No transaction in progress")
+        self.assertEqual(execute("PrintReservations()"), ["[seat 1, user 1]", "[seat 2, user 2]"])
+
+
+if __name__ == "__main__":
+    unittest.main()
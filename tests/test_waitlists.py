@@ -0,0 +1,93 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from gatorTicketMaster import HeapqWaitlist, MaxHeap, RankedWaitlist
+
+from test_gator_ticket_master import run
+
+
+def drain(waitlist):
+    # Extract every item, highest priority first
+    return [waitlist.extract_max() for _ in range(len(waitlist))]
+
+
+class WaitlistDifferentialTest(unittest.TestCase):
+    def apply(self, rnd, waitlists, steps):
+        # Apply the same random operations, repeated users included, to every waitlist
+        # and check that they keep the same items
+        sequence = 0
+        for _ in range(steps):
+            user = rnd.randint(1, 12)
+            r = rnd.random()
+            if r < 0.35:
+                item = (rnd.randint(1, 5), sequence, user)
+                for waitlist in waitlists:
+                    waitlist.insert(item)
+                sequence += 1
+            elif r < 0.5:
+                items = [(rnd.randint(1, 5), sequence + i, rnd.randint(1, 12)) for i in range(rnd.randint(1, 8))]
+                for waitlist in waitlists:
+                    waitlist.insert_many(items)
+                sequence += len(items)
+            elif r < 0.65:
+                self.assertEqual(len({waitlist.extract_max() if waitlist else None for waitlist in waitlists}), 1)
+            elif r < 0.75:
+                item = (rnd.randint(1, 5), sequence, user)
+                self.assertEqual(len({waitlist.replace(user, item) for waitlist in waitlists}), 1)
+                sequence += 1
+            elif r < 0.82:
+                self.assertEqual(len({waitlist.remove(user) for waitlist in waitlists}), 1)
+            elif r < 0.88:
+                entries = waitlists[0].entries(user)
+                item = rnd.choice(entries) if entries else (1, sequence, user)
+                self.assertEqual(len({waitlist.discard(item) for waitlist in waitlists}), 1)
+            else:
+                skip = {user + 1}
+                self.assertEqual(len({tuple(waitlist.remove_range(user, user + 3, skip)) for waitlist in waitlists}), 1)
+            self.assertEqual(len({len(waitlist) for waitlist in waitlists}), 1)
+            self.assertEqual(len({waitlist.get(user) for waitlist in waitlists}), 1)
+            self.assertEqual(len({tuple(sorted(waitlist.entries(user))) for waitlist in waitlists}), 1)
+            if isinstance(waitlists[-1], RankedWaitlist):
+                waitlists[-1].position(user)  # Keeps the rank tree built and in step
+        drained = [drain(waitlist) for waitlist in waitlists]
+        for other in drained[1:]:
+            self.assertEqual(other, drained[0])
+
+    def test_heap_and_heapq_agree_with_repeated_users(self):
+        for seed in range(200):
+            with self.subTest(seed=seed):
+                self.apply(random.Random(seed), [MaxHeap(), HeapqWaitlist(), RankedWaitlist(MaxHeap())], 60)
+
+    def test_a_user_may_wait_more_than_once(self):
+        for waitlist in (MaxHeap(), HeapqWaitlist(), RankedWaitlist(HeapqWaitlist())):
+            with self.subTest(waitlist=type(waitlist).__name__):
+                waitlist.insert((1, 0, 7))
+                waitlist.insert((3, 1, 8))
+                waitlist.insert((5, 2, 7))
+                self.assertEqual(len(waitlist), 3)
+                self.assertEqual(waitlist.get(7), (5, 2, 7))
+                self.assertEqual(waitlist.remove(7), (5, 2, 7))
+                self.assertEqual(waitlist.remove_range(7, 8), [(1, 0, 7), (3, 1, 8)])
+                self.assertEqual(len(waitlist), 0)
+
+    def test_commands_agree_with_repeated_reserves(self):
+        for seed in range(50):
+            rnd = random.Random(seed)
+            lines = [f"Initialize({rnd.randint(1, 4)})"]
+            for _ in range(60):
+                user = rnd.randint(1, 8)
+                lines.append(rnd.choice([f"Reserve({user}, {rnd.randint(1, 4)})"] * 3 + [
+                    f"ReserveMany({user}, {user + rnd.randint(0, 3)}, {rnd.randint(1, 4)})",
+                    f"Cancel({rnd.randint(1, 6)}, {user})", f"ExitWaitlist({user})",
+                    f"UpdatePriority({user}, {rnd.randint(1, 4)})", f"ReleaseSeats({user}, {user + 2})",
+                    "AddSeats(1)", "Available()", "PrintReservations()"]))
+            with self.subTest(seed=seed):
+                self.assertEqual(run(lines, waitlist=HeapqWaitlist), run(lines, waitlist=MaxHeap))
+
+
+if __name__ == "__main__":
+    unittest.main()